@@ -0,0 +1,53 @@
+"""
+Benchmark aggregating a year of (extended hours) minute bars to intraday frequencies.
+
+Compares resampling each session with pandas (``resample_intraday``, what
+``Store.agg`` used to do) with the single-pass ``agg_intraday``::
+
+    python -m benchmarks.aggregation --years 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from pandas.testing import assert_frame_equal
+
+from benchmarks.universe import generate_bars, trading_days
+from fin_models.aggregation import agg_intraday, resample_intraday
+from fin_models.enums import Freq
+
+
+def timeit(fn, *args, repeat: int = 1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    bars = generate_bars(trading_days(args.years), Freq.min_1)
+    print(f"minute bars: {len(bars):,}")
+    print(f"{'freq':8s} {'resample':>10s} {'single-pass':>12s} {'speedup':>8s}")
+    for freq in [f for f in Freq if f < Freq.day]:
+        resample_time, expected = timeit(
+            resample_intraday, bars, freq, repeat=args.repeat
+        )
+        agg_time, result = timeit(agg_intraday, bars, freq, repeat=args.repeat)
+        assert_frame_equal(result, expected)
+        print(
+            f"{freq.value:8s} {resample_time:9.4f}s {agg_time:11.4f}s"
+            f" {resample_time / agg_time:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark the memory and disk usage of the "compact" storage profile.
+
+Writes a synthetic universe of minute bars to a default and a compact ``Store``,
+then compares the in-memory size of the frames returned by ``Store.get``, the size
+on disk, and the largest price error after rounding to ``PRICE_DECIMALS``::
+
+    python -m benchmarks.compact_profile --num-symbols 20 --num-bars 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchmarks.merge_overlap import make_bars
+from fin_models.compact import PRICE_COLUMNS, PRICE_DECIMALS
+from fin_models.enums import Freq
+from fin_models.store import Store
+
+
+def disk_usage(root_dir: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(dirpath, filename))
+        for dirpath, _, filenames in os.walk(root_dir)
+        for filename in filenames
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-symbols", type=int, default=20)
+    parser.add_argument("--num-bars", type=int, default=100_000)
+    parser.add_argument("--backend", default="pickle")
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}" for i in range(args.num_symbols)]
+    universe = {
+        symbol: make_bars(args.num_bars, seed=i).round(PRICE_DECIMALS)
+        for i, symbol in enumerate(symbols)
+    }
+
+    results = {}
+    for profile in ["default", "compact"]:
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, backend=args.backend, profile=profile)
+            for symbol, bars in universe.items():
+                store.write(symbol, Freq.min_1, bars)
+
+            data = store.get_many(symbols, Freq.min_1)
+            num_bytes = sum(
+                int(df.memory_usage(index=True, deep=True).sum()) for df in data.values()
+            )
+            max_error = max(
+                np.abs(
+                    df[list(PRICE_COLUMNS)].to_numpy(np.float64).round(PRICE_DECIMALS)
+                    - universe[symbol][list(PRICE_COLUMNS)].to_numpy()
+                ).max()
+                for symbol, df in data.items()
+            )
+            results[profile] = (num_bytes, disk_usage(tempdir), max_error)
+
+    print(f"symbols x bars:  {args.num_symbols:,} x {args.num_bars:,} ({args.backend})")
+    for profile, (num_bytes, disk_bytes, max_error) in results.items():
+        print(
+            f"{profile:8s} memory: {num_bytes / 2**20:8.1f} MiB"
+            f"  disk: {disk_bytes / 2**20:8.1f} MiB"
+            f"  max price error: {max_error:.1e}"
+        )
+    print(f"memory ratio:    {results['compact'][0] / results['default'][0]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare the results of two or more :mod:`benchmarks.store_suite` runs (e.g. for
+different storage backends), relative to the first::
+
+    python -m benchmarks.compare pickle.json parquet.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("results", nargs="+", help="JSON files saved by store_suite")
+    args = parser.parse_args()
+
+    runs = []
+    for filepath in args.results:
+        with open(filepath) as f:
+            data = json.load(f)
+        label = "/".join(
+            str(data["config"][key]) for key in ["backend", "layout", "profile"]
+        )
+        runs.append((label, {r["name"]: r for r in data["results"]}))
+
+    (base_label, base), *others = runs
+    print(
+        f"{'benchmark':32s} {base_label:>24s}"
+        + "".join(f" {label:>24s}" for label, _ in others)
+    )
+    for name, result in base.items():
+        row = f"{name:32s} {result['seconds']:>23.4f}s"
+        for _, other in others:
+            if name not in other:
+                row += f" {'-':>24s}"
+                continue
+            seconds = other[name]["seconds"]
+            row += f" {seconds:>14.4f}s ({result['seconds'] / seconds:5.2f}x)"
+        print(row)
+
+    print(
+        f"{'peak RSS (MiB)':32s} {_peak_rss(base):>24.1f}"
+        + "".join(f" {_peak_rss(other):>24.1f}" for _, other in others)
+    )
+
+
+def _peak_rss(results: dict[str, dict]) -> float:
+    return max(result["peak_rss_mb"] for result in results.values())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark the compression codecs of the storage backends on synthetic minute and
+daily bars (see :mod:`benchmarks.universe`).
+
+For each backend and codec (skipping those whose library is not installed), reports
+the compression ratio (relative to uncompressed pickles), and the best write and
+full read times (reads are from the page cache, so they measure decompression, not
+disk I/O)::
+
+    python -m benchmarks.compression --years 2
+    python -m benchmarks.compression --years 2 --profile compact
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from pandas.testing import assert_frame_equal
+
+from benchmarks.universe import generate_bars, trading_days
+from fin_models.backends import BACKENDS, get_backend
+from fin_models.compact import compact
+from fin_models.enums import Freq
+
+
+CODECS = [
+    ("default", None),
+    ("none", None),
+    ("lz4", None),
+    ("lz4", 9),
+    ("zstd", 1),
+    ("zstd", 3),
+    ("zstd", 9),
+    ("zstd", 19),
+]
+
+
+def best_time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def file_size(filepath: str) -> int:
+    # including the pickle backend's index
+    return sum(
+        os.path.getsize(path)
+        for path in [filepath, f"{filepath}.idx"]
+        if os.path.exists(path)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profile", choices=["default", "compact"], default="default")
+    args = parser.parse_args()
+
+    schedule = trading_days(args.years)
+    for freq in [Freq.min_1, Freq.day]:
+        bars = generate_bars(schedule, freq)
+        if args.profile == "compact":
+            bars = compact(bars)
+        print(f"\n{freq.name}: {len(bars):,} bars ({args.profile} profile)")
+        print(
+            f"{'backend':8s} {'codec':10s} {'size':>10s} {'ratio':>6s}"
+            f" {'write':>9s} {'read':>9s}"
+        )
+
+        baseline = None
+        for backend_name in BACKENDS:
+            for compression, level in CODECS:
+                try:
+                    backend = get_backend(backend_name, compression, level)
+                except ImportError as e:
+                    print(f"{backend_name:8s} {compression:10s} skipped ({e})")
+                    continue
+
+                with tempfile.TemporaryDirectory() as tempdir:
+                    filepath = os.path.join(tempdir, f"bars.{backend.extension}")
+                    write_time = best_time(
+                        lambda: backend.write(filepath, bars), args.repeat
+                    )
+                    read_time = best_time(lambda: backend.read(filepath), args.repeat)
+                    assert_frame_equal(backend.read(filepath), bars, check_freq=False)
+                    size = file_size(filepath)
+
+                if baseline is None:
+                    # uncompressed pickles
+                    baseline = size
+                codec = compression if level is None else f"{compression}:{level}"
+                print(
+                    f"{backend_name:8s} {codec:10s} {size / 2**20:8.2f}Mi"
+                    f" {baseline / size:5.2f}x {write_time:8.4f}s {read_time:8.4f}s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark merging new bars that overlap existing bars in ``Store.write``.
+
+Compares the previous per-timestamp Python loop with the vectorized
+``fin_models.store._merge_bars``::
+
+    python -m benchmarks.merge_overlap --num-bars 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pandas.testing import assert_frame_equal
+
+from fin_models.store import _merge_bars
+
+
+def make_bars(num_bars: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(
+        "2023-01-03 04:00",
+        periods=num_bars,
+        freq="min",
+        tz="America/New_York",
+        name="Epoch",
+    )
+    close = 100 + rng.standard_normal(num_bars).cumsum() * 0.05
+    return pd.DataFrame(
+        {
+            "Open": close + rng.standard_normal(num_bars) * 0.01,
+            "High": close + 0.05,
+            "Low": close - 0.05,
+            "Close": close,
+            "Volume": rng.integers(100, 100_000, num_bars),
+        },
+        index=index,
+    )
+
+
+def loop_merge(old: pd.DataFrame, bars: pd.DataFrame) -> pd.DataFrame:
+    """The original implementation from ``Store.write``."""
+    index_intersection = old.index.intersection(bars.index, sort=True)
+    if index_intersection.empty:
+        return pd.concat([old, bars])
+
+    existing = old.iloc[:old.index.get_loc(index_intersection[0])]  # fmt: skip
+    intersection_bars = []
+    for idx in index_intersection:
+        if bars.loc[idx]["Volume"] > old.loc[idx]["Volume"]:
+            intersection_bars.append(bars.loc[idx])
+        else:
+            intersection_bars.append(old.loc[idx])
+    intersection = pd.DataFrame(intersection_bars)
+    new = bars.iloc[bars.index.get_loc(index_intersection[-1]) + 1:]  # fmt: skip
+    return pd.concat([existing, intersection, new])
+
+
+def timeit(fn, *args, repeat: int = 1) -> tuple[float, pd.DataFrame]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-bars", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    old = make_bars(args.num_bars * 2, seed=1)
+    bars = make_bars(args.num_bars * 2, seed=2).iloc[args.num_bars :]
+    bars.index = old.index[args.num_bars :]
+
+    loop_time, expected = timeit(loop_merge, old, bars)
+    vectorized_time, result = timeit(_merge_bars, old, bars, repeat=args.repeat)
+
+    # the loop upcasts Volume to float and drops the index name; the values must match
+    assert_frame_equal(
+        result, expected, check_dtype=False, check_names=False, check_freq=False
+    )
+    print(f"overlapping bars: {args.num_bars:,}")
+    print(f"loop:             {loop_time:.3f}s")
+    print(f"vectorized:       {vectorized_time:.4f}s")
+    print(f"speedup:          {loop_time / vectorized_time:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
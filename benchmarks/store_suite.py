@@ -0,0 +1,232 @@
+"""
+Benchmark ``Store`` reads, aggregations, writes and metadata lookups on a synthetic
+universe (see :mod:`benchmarks.universe`), saving the results as JSON::
+
+    python -m benchmarks.store_suite --num-symbols 50 --years 2 -o pickle.json
+    python -m benchmarks.store_suite --num-symbols 50 --years 2 --backend parquet \\
+        -o parquet.json
+    python -m benchmarks.compare pickle.json parquet.json
+
+Each benchmark reports its best wall time (over ``--repeat`` runs), throughput in
+calls and bars per second, and the peak resident set size of the process so far.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.universe import generate_universe
+from fin_models.enums import Freq
+from fin_models.store import Store
+
+
+AGG_FREQS = {
+    Freq.min_1: [Freq.min_5, Freq.min_15, Freq.hour],
+    Freq.day: [Freq.week, Freq.month],
+}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+class Suite:
+    def __init__(self, repeat: int = 3):
+        self.repeat = repeat
+        self.results: list[dict[str, t.Any]] = []
+
+    def run(
+        self,
+        name: str,
+        fn: t.Callable[[], int | None],
+        calls: int,
+        repeat: int | None = None,
+        setup: t.Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Time `fn` (which performs `calls` operations and returns the number of bars
+        read or written), keeping the best of `repeat` runs.
+        """
+        best, num_bars = float("inf"), None
+        for _ in range(repeat or self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            num_bars = fn()
+            best = min(best, time.perf_counter() - start)
+
+        result = {
+            "name": name,
+            "seconds": best,
+            "calls": calls,
+            "calls_per_second": calls / best,
+            "bars": num_bars,
+            "bars_per_second": num_bars / best if num_bars else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        self.results.append(result)
+        bars_per_second = (
+            f"{result['bars_per_second']:>14,.0f} bars/s" if num_bars else " " * 21
+        )
+        print(
+            f"{name:32s} {best:9.4f}s {result['calls_per_second']:>12,.1f} calls/s"
+            f" {bars_per_second} {result['peak_rss_mb']:>9,.1f} MiB",
+            flush=True,
+        )
+
+
+def get_all(store: Store, symbols: list[str], freq: Freq, **kwargs) -> int:
+    return sum(len(store.get(symbol, freq, **kwargs)) for symbol in symbols)
+
+
+def write_all(store: Store, universe: dict[str, pd.DataFrame], freq: Freq) -> int:
+    for symbol, bars in universe.items():
+        store.write(symbol, freq, bars)
+    return sum(len(bars) for bars in universe.values())
+
+
+def list_symbols(store: Store, freq: Freq | None = None) -> None:
+    store.symbols(freq)
+
+
+def read_metadata(store: Store, symbols: list[str], freqs: list[Freq]) -> None:
+    for symbol in symbols:
+        for freq in freqs:
+            store.get_historical_metadata(symbol, freq)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-symbols", type=int, default=20)
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--backend", default="pickle")
+    parser.add_argument("--layout", default="single")
+    parser.add_argument("--profile", default="default")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="Save the results to this JSON file")
+    args = parser.parse_args()
+
+    config = dict(
+        num_symbols=args.num_symbols,
+        years=args.years,
+        backend=args.backend,
+        layout=args.layout,
+        profile=args.profile,
+        repeat=args.repeat,
+    )
+    print(json.dumps(config))
+    suite = Suite(repeat=args.repeat)
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        store = Store(
+            tempdir, backend=args.backend, layout=args.layout, profile=args.profile
+        )
+
+        for freq in [Freq.day, Freq.min_1]:
+            universe = generate_universe(args.num_symbols, args.years, freq)
+            symbols = list(universe)
+            # hold back the last day of bars to benchmark appends
+            cutoff = max(bars.index[-1].normalize() for bars in universe.values())
+            initial = {
+                symbol: bars.loc[: cutoff - pd.Timedelta(1)]
+                for symbol, bars in universe.items()
+            }
+            latest = {symbol: bars.loc[cutoff:] for symbol, bars in universe.items()}
+
+            def clear():
+                for symbol in symbols:
+                    store._delete_freq(symbol, freq)
+
+            suite.run(
+                f"write {freq.name}",
+                lambda: write_all(store, initial, freq),
+                calls=len(symbols),
+                setup=clear,
+            )
+            suite.run(
+                f"write {freq.name} (append)",
+                lambda: write_all(store, latest, freq),
+                calls=len(symbols),
+                repeat=1,
+            )
+
+            # rewrite the latest bars with higher volume, forcing a merge
+            overlap = {
+                symbol: bars.assign(Volume=bars["Volume"] + 1)
+                for symbol, bars in latest.items()
+            }
+            suite.run(
+                f"write {freq.name} (overlap)",
+                lambda: write_all(store, overlap, freq),
+                calls=len(symbols),
+                repeat=1,
+            )
+
+            suite.run(
+                f"get {freq.name}",
+                lambda: get_all(store, symbols, freq),
+                calls=len(symbols),
+            )
+            suite.run(
+                f"get {freq.name} (last 250)",
+                lambda: get_all(store, symbols, freq, last_n=250),
+                calls=len(symbols),
+            )
+            for to_freq in AGG_FREQS[freq]:
+                suite.run(
+                    f"get {freq.name} -> {to_freq.name}",
+                    lambda to_freq=to_freq: get_all(store, symbols, to_freq),
+                    calls=len(symbols),
+                )
+
+        suite.run(
+            "symbols",
+            lambda: list_symbols(store),
+            calls=1,
+            repeat=max(args.repeat, 10),
+        )
+        suite.run(
+            "symbols(freq)",
+            lambda: list_symbols(store, Freq.min_1),
+            calls=1,
+            repeat=max(args.repeat, 10),
+        )
+        suite.run(
+            "get_historical_metadata",
+            lambda: read_metadata(store, symbols, [Freq.min_1, Freq.day]),
+            calls=2 * len(symbols),
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                dict(
+                    config=config,
+                    environment=dict(
+                        python=platform.python_version(),
+                        platform=platform.platform(),
+                        pandas=pd.__version__,
+                        numpy=np.__version__,
+                    ),
+                    results=suite.results,
+                ),
+                f,
+                indent=2,
+            )
+        print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
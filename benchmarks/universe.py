@@ -0,0 +1,136 @@
+"""
+A generator of realistic synthetic OHLCV bars for benchmarking.
+
+Bars follow the NYSE trading calendar (including holidays and early closes):
+
+- minute bars cover extended hours (04:00 - 20:00), with sparse pre- and after-market
+  trading and a U-shaped intraday volume profile
+- daily bars are indexed at midnight America/New_York, like the stored vendor data
+
+Prices follow a geometric random walk, and each symbol gets its own (seeded) price
+level and volatility, so universes are reproducible::
+
+    from benchmarks.universe import generate_universe
+
+    universe = generate_universe(num_symbols=100, years=2, freq=Freq.min_1)
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from fin_models.calendar import Calendar
+from fin_models.enums import Freq
+
+
+# the timezone as set by the data vendors (pytz, in pandas 2)
+TZ = "America/New_York"
+
+MINUTES_PER_DAY = 16 * 60  # 04:00 to 20:00
+
+# the probability of a trade in a minute outside of regular trading hours
+EXTENDED_HOURS_ACTIVITY = 0.3
+
+
+def trading_days(years: float, end: str = "2023-12-29") -> pd.DataFrame:
+    """
+    Returns the extended-hours NYSE schedule for the `years` up to `end`.
+    """
+    start = pd.Timestamp(end) - pd.DateOffset(days=round(years * 365.25))
+    return Calendar("NYSE").schedule(start, end, include_extended=True)
+
+
+def generate_bars(
+    schedule: pd.DataFrame,
+    freq: Freq = Freq.min_1,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Generate bars at `freq` (either ``Freq.min_1`` or ``Freq.day``) for the trading
+    days in `schedule` (see :func:`trading_days`).
+    """
+    if freq not in {Freq.min_1, Freq.day}:
+        raise ValueError(f"Can only generate minute or daily bars (got {freq})")
+
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(5, 500)
+    volatility = rng.uniform(0.01, 0.04)  # daily
+
+    if freq == Freq.day:
+        index = pd.DatetimeIndex(schedule.index.tz_localize(TZ), name="Epoch").as_unit(
+            "ns"
+        )
+        returns = rng.normal(0, volatility, len(index))
+        volume = rng.lognormal(np.log(5e6), 0.5, len(index))
+        return _to_bars(
+            index, price * np.exp(np.cumsum(returns)), volatility, volume, rng
+        )
+
+    # every minute from 04:00 to 20:00, then only keep minutes within each day's
+    # schedule (early closes) and with (sparse, outside of regular hours) trading
+    pre, close, post = (
+        _utc_datetime64(schedule[k]) for k in ["pre", "market_close", "post"]
+    )
+    minutes = np.arange(MINUTES_PER_DAY)
+    epochs = pre[:, None] + minutes.astype("timedelta64[m]")[None, :]
+    regular = (minutes >= 330) & (minutes < 720)  # 09:30 to 16:00
+    active = (epochs < post[:, None]) & (
+        regular & (epochs < close[:, None])
+        | (rng.random(epochs.shape) < EXTENDED_HOURS_ACTIVITY)
+    )
+    index = pd.DatetimeIndex(epochs[active], name="Epoch").tz_localize("UTC")
+    index = index.tz_convert(TZ)
+
+    minute_volatility = volatility / np.sqrt(MINUTES_PER_DAY)
+    returns = rng.normal(0, minute_volatility, len(index))
+
+    # U-shaped volume: heavier around the open and the close
+    minute_of_day = np.broadcast_to(minutes, epochs.shape)[active]
+    u_shape = 1 + 4 * (np.abs(minute_of_day - 525) / 195) ** 4 * regular[minute_of_day]
+    volume = rng.lognormal(np.log(2e3), 1.0, len(index)) * u_shape
+    return _to_bars(
+        index, price * np.exp(np.cumsum(returns)), minute_volatility, volume, rng
+    )
+
+
+def generate_universe(
+    num_symbols: int,
+    years: float,
+    freq: Freq = Freq.min_1,
+    seed: int = 0,
+) -> dict[str, pd.DataFrame]:
+    """
+    Generate bars for `num_symbols` symbols (named ``SYM0``, ``SYM1``, ...).
+    """
+    schedule = trading_days(years)
+    return {
+        f"SYM{i}": generate_bars(schedule, freq, seed=seed + i)
+        for i in range(num_symbols)
+    }
+
+
+def _utc_datetime64(times: pd.Series) -> np.ndarray:
+    return times.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy("datetime64[ns]")
+
+
+def _to_bars(
+    index: pd.DatetimeIndex,
+    close: np.ndarray,
+    volatility: float,
+    volume: np.ndarray,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    close = np.round(close, 2)
+    open_ = np.round(np.concatenate([[close[0]], close[:-1]]), 2)
+    spread = np.abs(rng.normal(0, volatility, len(index))) * close
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.round(np.maximum(open_, close) + spread, 2),
+            "Low": np.round(np.maximum(np.minimum(open_, close) - spread, 0.01), 2),
+            "Close": close,
+            "Volume": np.maximum(volume, 1).astype(np.int64),
+        },
+        index=index,
+    )
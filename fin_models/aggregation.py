@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pandas.tseries.frequencies import to_offset
+
+from fin_models.enums import Freq
+
+
+RESAMPLE_COLUMNS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+}
+
+# the (local) start and end times of the pre-market, regular and after-hours sessions
+SESSIONS = (("04:00", "09:30"), ("09:30", "16:00"), ("16:00", "20:00"))
+
+_SESSION_BOUNDS = np.array(
+    [pd.Timedelta(f"{t}:00").value for t in [*(s[0] for s in SESSIONS), SESSIONS[-1][1]]]
+)
+_NS_PER_DAY = pd.Timedelta(days=1).value
+
+# see `get_origins`
+Origins = list[int | None]
+
+
+def aggregate(
+    df: pd.DataFrame, freq: Freq, origins: Origins | None = None
+) -> pd.DataFrame:
+    """
+    Aggregate bars to `freq` (see :meth:`Store.agg <fin_models.store.Store.agg>`).
+
+    Intraday bins are aligned on the first bar of each session, and daily bins on the
+    first bar, unless `origins` (see :func:`get_origins`) are given: e.g. to
+    aggregate new bars consistently with the bars aggregated before them.
+    """
+    if df.empty:
+        return df
+
+    # https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#offset-aliases
+    if freq < Freq.day:
+        return agg_intraday(df, freq, origins)
+
+    origin = origins[0] if origins and freq == Freq.day else None
+    agg_df = resample(df, freq, "start" if origin is None else _timestamp(origin, df))
+    if freq == Freq.week:
+        agg_df.index = agg_df.index - pd.Timedelta(days=6)
+    return agg_df
+
+
+def get_origins(df: pd.DataFrame, freq: Freq) -> Origins:
+    """
+    Returns what the bins of `freq` in :func:`aggregate` are aligned on: the epoch
+    (in nanoseconds) of the first bar of each session for intraday frequencies (None
+    for sessions without bars), or else of the first bar.
+    """
+    if freq >= Freq.day:
+        return [int(df.index[:1].as_unit("ns").asi8[0])] if len(df) else [None]
+
+    epochs, session = _sessions(df.index.as_unit("ns"))
+    return [
+        int(epochs[is_session.argmax()]) if is_session.any() else None
+        for is_session in (session == i for i in range(len(SESSIONS)))
+    ]
+
+
+class IncrementalAggregator:
+    """
+    Aggregates bars to `freq` as they arrive (e.g. from a live feed), aggregating only
+    the new bars and merging them into the latest (possibly partial) aggregated bar.
+    The aggregated bars are the same as when aggregating all of the bars at once.
+
+    To continue aggregating bars which were already aggregated, pass the `origins`
+    of those bars (see :func:`get_origins`) and their `latest` aggregated bar.
+    """
+
+    def __init__(
+        self,
+        freq: Freq,
+        origins: Origins | None = None,
+        latest: pd.DataFrame | None = None,
+    ):
+        self.freq = freq
+        self.origins = list(origins) if origins is not None else None
+        self.latest = latest if latest is not None and not latest.empty else None
+
+    def update(self, bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregate `bars`, which must be newer than the bars of previous updates.
+        Returns the aggregated bars which changed: the latest aggregated bar (if the
+        new bars are in its bin) followed by any new aggregated bars.
+        """
+        if not bars.index.is_monotonic_increasing:
+            bars = bars.sort_index()
+        new_origins = get_origins(bars, self.freq)
+        if self.origins is None:
+            self.origins = new_origins
+        else:
+            self.origins = [
+                origin if origin is not None else new_origin
+                for origin, new_origin in zip(self.origins, new_origins)
+            ]
+
+        agg_df = aggregate(bars, self.freq, self.origins)
+        if agg_df.empty or self.latest is None:
+            pass
+        elif agg_df.index[0] < self.latest.index[-1]:
+            raise ValueError("Can only aggregate bars newer than the previous bars.")
+        elif agg_df.index[0] == self.latest.index[-1]:
+            agg_df = pd.concat(
+                [_merge_bins(self.latest.iloc[-1:], agg_df.iloc[:1]), agg_df.iloc[1:]]
+            )
+        if not agg_df.empty:
+            self.latest = agg_df.iloc[-1:]
+        return agg_df
+
+
+def agg_intraday(
+    df: pd.DataFrame, freq: Freq, origins: Origins | None = None
+) -> pd.DataFrame:
+    """
+    Aggregate bars to an intraday `freq` separately for each trading session (see
+    :data:`SESSIONS`), dropping bars outside of extended hours. The bins of each
+    session are aligned on its first bar (like resampling with ``origin="start"``),
+    or on its given origin (see :func:`get_origins`).
+
+    Returns the same bars as :func:`resample_intraday`, in a single pass: every bar
+    is labeled with its session and bin (the bins are contiguous runs of the sorted
+    bars), and the bins are reduced with ``np.ufunc.reduceat``. Bars with missing
+    values fall back to :func:`resample_intraday`.
+    """
+    if (
+        df.empty
+        or not isinstance(df.index, pd.DatetimeIndex)
+        or not set(RESAMPLE_COLUMNS).issubset(df.columns)
+    ):
+        return resample_intraday(df, freq, origins)
+
+    values = {column: df[column].to_numpy() for column in RESAMPLE_COLUMNS}
+    if any(
+        v.dtype.kind not in "iuf" or (v.dtype.kind == "f" and np.isnan(v).any())
+        for v in values.values()
+    ):
+        return resample_intraday(df, freq, origins)
+
+    index = df.index.as_unit("ns")
+    if not index.is_monotonic_increasing:
+        order = index.argsort(kind="stable")
+        index = index[order]
+        values = {column: v[order] for column, v in values.items()}
+
+    epochs, session = _sessions(index)
+    in_session = session >= 0
+    if not in_session.all():
+        epochs, session = epochs[in_session], session[in_session]
+        values = {column: v[in_session] for column, v in values.items()}
+    if not len(epochs):
+        return resample_intraday(df, freq, origins)
+
+    # label each bar with the start of its bin, aligned on the session's origin
+    session_origins = np.zeros(len(SESSIONS), dtype=np.int64)
+    for i in range(len(SESSIONS)):
+        is_session = session == i
+        if origins is not None and origins[i] is not None:
+            session_origins[i] = origins[i]
+        elif is_session.any():
+            session_origins[i] = epochs[is_session.argmax()]
+    origin = session_origins[session]
+    freq_ns = to_offset(freq.value).nanos
+    bins = origin + (epochs - origin) // freq_ns * freq_ns
+
+    is_start = np.empty(len(bins), dtype=bool)
+    is_start[0] = True
+    np.not_equal(bins[1:], bins[:-1], out=is_start[1:])
+    is_start[1:] |= session[1:] != session[:-1]
+    starts = np.flatnonzero(is_start)
+    ends = np.append(starts[1:], len(bins)) - 1
+
+    columns = {}
+    for column, how in RESAMPLE_COLUMNS.items():
+        v = values[column]
+        if how == "first":
+            columns[column] = v[starts]
+        elif how == "last":
+            columns[column] = v[ends]
+        elif how == "max":
+            columns[column] = np.maximum.reduceat(v, starts)
+        elif how == "min":
+            columns[column] = np.minimum.reduceat(v, starts)
+        else:
+            columns[column] = np.add.reduceat(v, starts).astype(v.dtype, copy=False)
+
+    labels = bins[starts]
+    if (np.diff(labels) < 0).any():
+        order = np.argsort(labels, kind="stable")
+        labels = labels[order]
+        columns = {column: v[order] for column, v in columns.items()}
+
+    agg_index = pd.DatetimeIndex(labels.view("M8[ns]"), name=df.index.name)
+    if index.tz is not None:
+        agg_index = agg_index.tz_localize("UTC").tz_convert(index.tz)
+    return pd.DataFrame(columns, index=agg_index.as_unit(df.index.unit))
+
+
+def resample_intraday(
+    df: pd.DataFrame, freq: Freq, origins: Origins | None = None
+) -> pd.DataFrame:
+    """
+    Aggregate bars to an intraday `freq` by resampling each session with pandas (the
+    reference implementation of :func:`agg_intraday`).
+    """
+    return pd.concat(
+        [
+            resample(
+                df.between_time(start, end, inclusive="left"),
+                freq,
+                "start"
+                if origins is None or origins[i] is None
+                else _timestamp(origins[i], df),
+            )
+            for i, (start, end) in enumerate(SESSIONS)
+        ]
+    ).sort_index()
+
+
+def resample(
+    df: pd.DataFrame, freq: Freq, origin: pd.Timestamp | str = "start"
+) -> pd.DataFrame:
+    resample_freq = {
+        Freq.month: "MS",
+        Freq.quarter: "QS",
+        Freq.year: "YS",
+    }.get(freq, freq.value)
+    return df.resample(resample_freq, origin=origin).apply(RESAMPLE_COLUMNS).dropna()
+
+
+def _sessions(index: pd.DatetimeIndex) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the epochs (in nanoseconds) of a sorted nanosecond `index`, and the
+    session of each (or -1 if outside of extended hours).
+    """
+    epochs = index.asi8
+    wall_times = index.tz_localize(None).asi8 if index.tz is not None else epochs
+    session = np.searchsorted(_SESSION_BOUNDS, wall_times % _NS_PER_DAY, side="right") - 1
+    session[session == len(SESSIONS)] = -1
+    return epochs, session
+
+
+def _timestamp(epoch: int, df: pd.DataFrame) -> pd.Timestamp:
+    ts = pd.Timestamp(epoch)
+    return ts.tz_localize("UTC").tz_convert(df.index.tz) if df.index.tz else ts
+
+
+def _merge_bins(latest: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge two single-row DataFrames of aggregated bars in the same bin.
+    """
+    merged = {}
+    for column, how in RESAMPLE_COLUMNS.items():
+        a, b = latest[column].iloc[0], new[column].iloc[0]
+        merged[column] = [
+            {"first": a, "last": b, "max": max(a, b), "min": min(a, b), "sum": a + b}[how]
+        ]
+    return pd.DataFrame(merged, index=new.index).astype(new.dtypes.to_dict())
@@ -64,6 +64,29 @@ def bars_since_previous_high(df: pd.DataFrame) -> int:
     return len(df) - df.index.get_loc(most_recent_higher_ts) - 1
 
 
+def bars_since_previous_high_rolling(df: pd.DataFrame) -> pd.Series:
+    """
+    :func:`bars_since_previous_high` for every bar, in one pass.
+
+    Keeps a stack of the bars not (yet) closed above by a later bar, whose closes
+    are therefore strictly decreasing: the most recent higher bar is the top of the
+    stack once the bars closing at or below the current close are popped.
+    """
+    closes = df.Close.to_numpy()
+    result = np.zeros(len(closes), dtype=np.int64)
+    stack: list[int] = []
+    for i, close in enumerate(closes):
+        if np.isnan(close):
+            # nothing is higher than a missing close, nor is it higher than later bars
+            continue
+        while stack and not closes[stack[-1]] > close:
+            stack.pop()
+        if stack:
+            result[i] = i - stack[-1]
+        stack.append(i)
+    return pd.Series(result, index=df.index)
+
+
 def macd_divergence(df: pd.DataFrame):
     """
     macd, macd_signal, histogram = ta.MACD(df.Close)
@@ -94,6 +117,18 @@ def is_expanding_volume(df: pd.DataFrame, num_bars: int = 3) -> bool:
     return (df.index[-num_bars:] == df.Volume[-num_bars:].sort_values().index).all()
 
 
+def is_expanding_volume_rolling(df: pd.DataFrame, num_bars: int = 3) -> pd.Series:
+    """
+    :func:`is_expanding_volume` for every bar: whether the volume did not decrease
+    over the `num_bars` bars ending at it.
+    """
+    if num_bars <= 1:
+        return pd.Series(True, index=df.index)
+    # the first bar has no prior volume (and a window including it is too short)
+    increases = (df.Volume.diff() >= 0).astype(int)
+    return increases.rolling(num_bars - 1).sum() == num_bars - 1
+
+
 def is_expanding_bodies(
     df: pd.DataFrame, num_bars: int = 3, bullish: bool = True
 ) -> bool:
@@ -112,6 +147,26 @@ def is_expanding_bodies(
     return is_advancing and bodies_expanding
 
 
+def is_expanding_bodies_rolling(
+    df: pd.DataFrame, num_bars: int = 3, bullish: bool = True
+) -> pd.Series:
+    """
+    :func:`is_expanding_bodies` for every bar (over fewer bars at the start of
+    `df`, like it).
+    """
+    bodies = df.Close - df.Open
+    sign = 1 if bullish else -1
+    result = (sign * bodies).rolling(num_bars, min_periods=1).min() >= 0
+    if num_bars <= 1:
+        return result
+
+    # the closes and bodies must not move against the direction between two bars
+    # of the window (the first bar has no previous one to compare with)
+    reversals = (sign * df.Close.diff() < 0) | (sign * bodies.diff() < 0)
+    num_reversals = reversals.astype(int).rolling(num_bars - 1, min_periods=1).sum()
+    return result & (num_reversals == 0)
+
+
 def is_crossed(
     df: pd.DataFrame,
     *,
@@ -132,6 +187,29 @@ def is_crossed(
     return intraday_cross or overnight_cross
 
 
+def is_crossed_rolling(
+    df: pd.DataFrame,
+    *,
+    column: str = None,
+    value: int | float = None,
+) -> pd.Series:
+    """
+    :func:`is_crossed` for every bar (False for the first bar, which has no prior
+    close to cross overnight from).
+    """
+    if column is None and value is None:
+        raise TypeError("One of `column` or `value` is required to be passed.")
+    elif column and column not in df.columns:
+        raise ValueError(f"The column {column!r} is missing from `df`.")
+
+    value = df[column] if column else value
+    intraday_cross = (df.Open < value) & (value < df.Close)
+    overnight_cross = (df.Close.shift() < value) & (value < df.Open)
+    result = intraday_cross | overnight_cross
+    result.iloc[:1] = False
+    return result
+
+
 def num_bars_since_ts(df: pd.DataFrame, ts: pd.Timestamp):
     return len(df) - df.index.get_loc(ts) - 1
 
@@ -222,6 +300,32 @@ def volume_sum_of_prior_days(df: pd.DataFrame) -> int:
     return prior_days
 
 
+def volume_sum_of_prior_days_rolling(df: pd.DataFrame) -> pd.Series:
+    """
+    :func:`volume_sum_of_prior_days` for every bar.
+
+    The volume of the `k` bars before bar `i` is ``cumsum[i] - cumsum[i - k]``, so
+    the fewest prior bars summing to at least its volume are found by a binary
+    search of the (non-decreasing) cumulative volumes for ``cumsum[i] - volume``.
+    """
+    volumes = df.Volume.to_numpy()
+    positions = np.arange(len(volumes))
+    # cumsum[i] is the volume of the bars before bar `i`
+    cumsum = np.concatenate([[0], np.cumsum(volumes)])[:-1]
+    # the latest bar from which summing up to bar `i` reaches its volume
+    # (or -1 if even all the prior bars do not)
+    start = np.searchsorted(cumsum, cumsum - volumes, side="right") - 1
+    prior_days = positions - np.minimum(start, positions)
+    # all the prior bars are summed when their volume is not reached
+    prior_days = np.where(start < 0, positions, prior_days)
+
+    # the previous bar's volume must not be higher
+    previous = np.concatenate([[np.nan], volumes[:-1]])
+    result = np.where(previous > volumes, 0, prior_days)
+    result[:1] = 0
+    return pd.Series(result, index=df.index)
+
+
 def is_trading_safe(df):
     return len(df) > 3 and median_volume(df) > 200_000
 
@@ -254,6 +358,20 @@ def crossed_ma(df: pd.DataFrame, ma: int = 200, within_bars: int = 1):
     return False
 
 
+def crossed_ma_rolling(
+    df: pd.DataFrame, ma: int = 200, within_bars: int = 1
+) -> pd.Series:
+    """
+    :func:`crossed_ma` for every bar: whether the close crossed above the SMA in any
+    of the `within_bars` bars ending at it.
+    """
+    sma = ta.SMA(df.Close, timeperiod=ma)
+    crosses = (df.Close.shift() < sma) & (sma < df.Close)
+    result = crosses.astype(int).rolling(within_bars, min_periods=1).max() > 0
+    result.iloc[: ma - 1] = False
+    return result
+
+
 def gapped_ma(df: pd.DataFrame, ma: int = 200):
     if len(df) < ma:
         return False
@@ -0,0 +1,558 @@
+from __future__ import annotations
+
+import importlib
+import os
+import pickle
+import struct
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from fin_models.file_utils import atomic_open
+
+
+class Backend:
+    """
+    Base class for the on-disk file format used by :class:`~fin_models.store.Store`.
+
+    Writes must be atomic (see :func:`~fin_models.file_utils.atomic_open`), so that
+    concurrent readers never observe a partially written file.
+
+    Backends read and write a single DataFrame of bars (indexed by a sorted,
+    timezone-aware DatetimeIndex) to a single file. ``read`` accepts optional
+    ``columns``, an inclusive ``start``/``end`` range and ``last_n`` (return only the
+    last N bars of the range); formats that support it should avoid reading data
+    outside of the requested selection.
+    """
+
+    name: str
+    extension: str
+    compression: str = "default"
+    compression_level: int | None = None
+
+    def read(
+        self,
+        filepath: str,
+        columns: t.Sequence[str] | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def write(self, filepath: str, df: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def delete(self, filepath: str) -> None:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    def append(self, filepath: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Append `df` (with bars strictly newer than those stored) to an existing file.
+
+        Returns the appended bars, as written (in the timezone of the stored bars).
+        Formats that cannot append in place (the default) rewrite the file with the
+        concatenated data.
+        """
+        existing = self.read(filepath)
+        df = _to_timezone_of(df, existing)
+        self.write(filepath, pd.concat([existing, df]))
+        return df
+
+
+class PickleBackend(Backend):
+    """
+    The original storage format, pickled in chunks of `chunk_size` bars.
+
+    The chunks are written one after another to the same file, along with a sidecar
+    index (``<file>.idx``) of each chunk's first and last timestamps and byte range,
+    so that date range and ``last_n`` reads only deserialize the chunks they overlap.
+    Files with a single chunk are identical to those written by ``DataFrame.to_pickle``,
+    and files without a (valid) index are read in full.
+
+    With a `compression` codec (see :data:`CODECS`), each chunk is compressed
+    separately (and prefixed with the codec and its compressed size). Reads detect
+    compressed chunks, so files written with any codec can be read.
+
+    Appends only deserialize the last chunk, which is rewritten with the new bars if
+    it is not full; the bytes of the earlier chunks are copied to the new file as
+    they are. Like writes, appends are atomic.
+    """
+
+    name = "pickle"
+    extension = "pickle"
+
+    def __init__(
+        self,
+        chunk_size: int = 50_000,
+        compression: str = "default",
+        compression_level: int | None = None,
+    ):
+        self.chunk_size = chunk_size
+        self.compression = compression
+        self.compression_level = compression_level
+        self._codec = get_codec(compression)
+
+    def read(
+        self,
+        filepath: str,
+        columns: t.Sequence[str] | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame:
+        index = self._read_index(filepath)
+        if index is None:
+            df = _read_pickles(filepath)
+            if columns is not None:
+                df = df[list(columns)]
+            return tail(slice_range(df, start, end), last_n)
+
+        chunks = _select_chunks(index[:, 0], index[:, 1], start, end)
+
+        def read_chunk(i: int) -> pd.DataFrame:
+            with open(filepath, "rb") as f:
+                f.seek(index[i, 2])
+                df = _loads_chunk(f.read(index[i, 3] - index[i, 2]))
+            if columns is not None:
+                df = df[list(columns)]
+            return slice_range(df, start, end)
+
+        return _read_parts(read_chunk, chunks or [0], last_n, empty=not chunks)
+
+    def write(self, filepath: str, df: pd.DataFrame) -> None:
+        if df.empty:
+            with atomic_open(filepath) as f:
+                df.to_pickle(f)
+            self._delete_index(filepath)
+            return
+
+        with atomic_open(filepath) as f:
+            index = self._write_chunks(f, df)
+            # remove the old index before replacing the data, so that in between
+            # readers fall back to reading the whole (new) file
+            self._delete_index(filepath)
+        self._write_index(filepath, index)
+
+    def append(self, filepath: str, df: pd.DataFrame) -> pd.DataFrame:
+        index = self._read_index(filepath)
+        if df.empty or index is None:
+            return super().append(filepath, df)
+
+        # only the last chunk is read, and rewritten with the new bars if it is not
+        # full (so that appending a few bars at a time does not add tiny chunks)
+        offset = index[-1, 2]
+        with open(filepath, "rb") as src:
+            src.seek(offset)
+            last_chunk = _loads_chunk(src.read(index[-1, 3] - offset))
+            df = _to_timezone_of(df, last_chunk)
+            if len(last_chunk) < self.chunk_size:
+                index, bars = index[:-1], pd.concat([last_chunk, df])
+            else:
+                offset, bars = index[-1, 3], df
+
+            src.seek(0)
+            with atomic_open(filepath) as f:
+                _copy_bytes(src, f, offset)
+                new_index = self._write_chunks(f, bars)
+                self._delete_index(filepath)
+        self._write_index(filepath, [*index.tolist(), *new_index])
+        return df
+
+    def delete(self, filepath: str) -> None:
+        super().delete(filepath)
+        self._delete_index(filepath)
+
+    def _write_chunks(self, f: t.IO[bytes], df: pd.DataFrame) -> list[tuple[int, ...]]:
+        """
+        Write `df` in chunks from the current position of `f`. Returns their rows of
+        the chunk index.
+        """
+        index = []
+        for lo in range(0, len(df), self.chunk_size):
+            chunk = df.iloc[lo : lo + self.chunk_size]
+            offset = f.tell()
+            if self._codec is None:
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                _dump_compressed(chunk, f, self._codec, self.compression_level)
+            index.append((*chunk.index[[0, -1]].asi8, offset, f.tell()))
+        return index
+
+    def _write_index(self, filepath: str, index: list) -> None:
+        with atomic_open(_index_path(filepath)) as f:
+            np.save(f, np.array(index, dtype=np.int64))
+
+    def _read_index(self, filepath: str) -> np.ndarray | None:
+        """
+        Returns the ``[first_ns, last_ns, start_offset, end_offset]`` rows of the
+        chunk index, or None if it does not exist or does not match the data file.
+        """
+        try:
+            with open(_index_path(filepath), "rb") as f:
+                index = np.load(f)
+        except FileNotFoundError:
+            return None
+        if not len(index) or index[-1, 3] != os.path.getsize(filepath):
+            return None
+        return index
+
+    def _delete_index(self, filepath: str) -> None:
+        if os.path.exists(_index_path(filepath)):
+            os.remove(_index_path(filepath))
+
+
+class ParquetBackend(Backend):
+    """
+    Columnar storage using Apache Parquet (requires ``pyarrow``).
+
+    Only the requested columns are read, and row groups are skipped entirely when
+    their index statistics fall outside of the requested date range.
+    """
+
+    name = "parquet"
+    extension = "parquet"
+
+    def __init__(
+        self,
+        row_group_size: int = 50_000,
+        compression: str = "default",
+        compression_level: int | None = None,
+    ):
+        """
+        The `compression` is one of :data:`COMPRESSIONS` (by default, pyarrow's
+        default codec, snappy), using pyarrow's implementation of the codecs.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression {compression!r} (expected one of {COMPRESSIONS})"
+            )
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.compression_level = compression_level
+
+    def read(
+        self,
+        filepath: str,
+        columns: t.Sequence[str] | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame:
+        pq = _import_parquet()
+        pf = pq.ParquetFile(filepath)
+        index_col = pf.schema_arrow.pandas_metadata["index_columns"][0]
+        row_groups = _select_row_groups(pf, index_col, start, end)
+
+        def read_row_groups(row_groups: list[int]) -> pd.DataFrame:
+            table = pf.read_row_groups(
+                row_groups,
+                columns=[*columns, index_col] if columns is not None else None,
+                use_pandas_metadata=True,
+            )
+            return slice_range(table.to_pandas(), start, end)
+
+        if last_n is None:
+            return read_row_groups(row_groups)
+        return _read_parts(
+            lambda i: read_row_groups([i]),
+            row_groups or [0],
+            last_n,
+            empty=not row_groups,
+        )
+
+    def write(self, filepath: str, df: pd.DataFrame) -> None:
+        with atomic_open(filepath) as f:
+            df.to_parquet(
+                f,
+                engine="pyarrow",
+                row_group_size=self.row_group_size,
+                **(
+                    {}
+                    if self.compression == "default"
+                    else dict(
+                        compression=None
+                        if self.compression == "none"
+                        else self.compression,
+                        compression_level=self.compression_level,
+                    )
+                ),
+            )
+
+
+BACKENDS: dict[str, type[Backend]] = {
+    PickleBackend.name: PickleBackend,
+    ParquetBackend.name: ParquetBackend,
+}
+
+
+def get_backend(
+    backend: Backend | str,
+    compression: str = "default",
+    compression_level: int | None = None,
+) -> Backend:
+    if isinstance(backend, Backend):
+        return backend
+    try:
+        backend_cls = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage backend {backend!r} (expected one of {list(BACKENDS)})"
+        )
+    if compression_level is not None and compression in ("default", "none"):
+        raise ValueError(
+            f"A compression level requires a compression codec (got {compression!r})"
+        )
+    return backend_cls(compression=compression, compression_level=compression_level)
+
+
+class Codec:
+    """
+    A compression codec for the chunks of :class:`PickleBackend` files, identified
+    in the files by its (single byte) `id`.
+    """
+
+    name: str
+    id: bytes
+    module: str
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def _import(self):
+        try:
+            return importlib.import_module(self.module)
+        except ImportError as e:
+            package = self.module.split(".")[0]
+            raise ImportError(
+                f"The {self.name} compression requires {package}: `pip install {package}`"
+            ) from e
+
+
+class LZ4Codec(Codec):
+    name = "lz4"
+    id = b"l"
+    module = "lz4.frame"
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        return self._import().compress(data, compression_level=level or 0)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._import().decompress(data)
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+    id = b"z"
+    module = "zstandard"
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        zstd = self._import()
+        return zstd.ZstdCompressor(level=3 if level is None else level).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._import().ZstdDecompressor().decompress(data)
+
+
+CODECS: dict[str, Codec] = {codec.name: codec for codec in [LZ4Codec(), ZstdCodec()]}
+
+# "default" is the backend's default: uncompressed pickles, or snappy for parquet
+COMPRESSIONS = ("default", "none", *CODECS)
+
+
+def get_codec(compression: str) -> Codec | None:
+    """
+    Returns the codec for `compression` (one of :data:`COMPRESSIONS`), or None for
+    uncompressed data, checking that its library is installed.
+    """
+    if compression in {"default", "none"}:
+        return None
+    try:
+        codec = CODECS[compression]
+    except KeyError:
+        raise ValueError(
+            f"Unknown compression {compression!r} (expected one of {COMPRESSIONS})"
+        )
+    codec._import()
+    return codec
+
+
+def slice_range(
+    df: pd.DataFrame,
+    start: pd.Timestamp | None = None,
+    end: pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """
+    Return the rows of `df` (with a sorted index) between `start` and `end`, inclusive.
+    """
+    if start is None and end is None:
+        return df
+    lo = 0 if start is None else df.index.searchsorted(start, side="left")
+    hi = len(df) if end is None else df.index.searchsorted(end, side="right")
+    return df.iloc[lo:hi]
+
+
+def tail(df: pd.DataFrame, last_n: int | None = None) -> pd.DataFrame:
+    """
+    Return the last `last_n` rows of `df` (or all of them if `last_n` is None).
+    """
+    return df if last_n is None else df.iloc[max(len(df) - last_n, 0) :]
+
+
+def _read_parts(
+    read_part: t.Callable[[int], pd.DataFrame],
+    parts: list[int],
+    last_n: int | None = None,
+    empty: bool = False,
+) -> pd.DataFrame:
+    """
+    Read and concatenate the (sorted) parts of a file. With `last_n`, parts are read
+    from the last one backwards until enough rows have been read. If `empty`, `parts`
+    must be a single part which is only read for its columns and dtypes.
+    """
+    if empty:
+        return read_part(parts[0]).iloc[:0]
+
+    frames, num_rows = [], 0
+    for part in reversed(parts) if last_n is not None else parts:
+        df = read_part(part)
+        frames.append(df)
+        num_rows += len(df)
+        if last_n is not None and num_rows >= last_n:
+            break
+    if last_n is not None:
+        frames.reverse()
+    return tail(pd.concat(frames) if len(frames) > 1 else frames[0], last_n)
+
+
+def _select_chunks(
+    first: np.ndarray,
+    last: np.ndarray,
+    start: pd.Timestamp | None,
+    end: pd.Timestamp | None,
+) -> list[int]:
+    """
+    Returns the indices of the sorted, non-overlapping ``[first, last]`` (UTC
+    nanosecond) ranges which overlap ``[start, end]``.
+    """
+    lo = 0 if start is None else int(np.searchsorted(last, start.value, side="left"))
+    hi = len(first) if end is None else int(np.searchsorted(first, end.value, "right"))
+    return list(range(lo, hi))
+
+
+def _select_row_groups(
+    pf,
+    index_col: str,
+    start: pd.Timestamp | None,
+    end: pd.Timestamp | None,
+) -> list[int]:
+    num_row_groups = pf.metadata.num_row_groups
+    if start is None and end is None:
+        return list(range(num_row_groups))
+
+    col_idx = pf.schema_arrow.get_field_index(index_col)
+    row_groups = []
+    for i in range(num_row_groups):
+        stats = pf.metadata.row_group(i).column(col_idx).statistics
+        if stats is not None and stats.has_min_max:
+            if start is not None and stats.max < start:
+                continue
+            if end is not None and stats.min > end:
+                continue
+        row_groups.append(i)
+    return row_groups
+
+
+def _to_timezone_of(df: pd.DataFrame, existing: pd.DataFrame) -> pd.DataFrame:
+    if existing.index.tz is not None and df.index.tz is not None:
+        # equivalent timezones from different libraries (e.g. pytz and zoneinfo)
+        # would otherwise concatenate to an object index
+        return df.tz_convert(existing.index.tz)
+    return df
+
+
+def _copy_bytes(src: t.IO[bytes], dst: t.IO[bytes], size: int) -> None:
+    while size > 0:
+        data = src.read(min(size, 1 << 20))
+        if not data:
+            raise EOFError("unexpected end of file")
+        dst.write(data)
+        size -= len(data)
+
+
+def _index_path(filepath: str) -> str:
+    return f"{filepath}.idx"
+
+
+def _read_pickles(filepath: str) -> pd.DataFrame:
+    """
+    Read all of the pickled chunks in a file, one after another.
+    """
+    frames = []
+    size = os.path.getsize(filepath)
+    with open(filepath, "rb") as f:
+        while not frames or f.tell() < size:
+            frames.append(_load_chunk(f))
+    return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+
+# the header of compressed chunks: a magic prefix (pickles start with the PROTO
+# opcode, b"\x80"), the codec's id and the compressed size
+_CHUNK_HEADER = struct.Struct("!3scQ")
+_CHUNK_MAGIC = b"FMZ"
+
+
+def _dump_compressed(
+    df: pd.DataFrame, f: t.IO[bytes], codec: Codec, level: int | None
+) -> None:
+    data = codec.compress(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL), level)
+    f.write(_CHUNK_HEADER.pack(_CHUNK_MAGIC, codec.id, len(data)))
+    f.write(data)
+
+
+def _load_chunk(f: t.IO[bytes]) -> pd.DataFrame:
+    """
+    Read the (possibly compressed) pickled chunk at the current position of `f`.
+    """
+    start = f.tell()
+    header = f.read(_CHUNK_HEADER.size)
+    if not header.startswith(_CHUNK_MAGIC):
+        f.seek(start)
+        return pickle.load(f)
+
+    _, codec_id, size = _CHUNK_HEADER.unpack(header)
+    return pickle.loads(_get_codec_by_id(codec_id).decompress(f.read(size)))
+
+
+def _loads_chunk(data: bytes) -> pd.DataFrame:
+    """
+    Unpickle a (possibly compressed) chunk.
+    """
+    if not data.startswith(_CHUNK_MAGIC):
+        return pickle.loads(data)
+
+    _, codec_id, _ = _CHUNK_HEADER.unpack_from(data)
+    compressed = memoryview(data)[_CHUNK_HEADER.size :]
+    return pickle.loads(_get_codec_by_id(codec_id).decompress(compressed))
+
+
+def _get_codec_by_id(codec_id: bytes) -> Codec:
+    for codec in CODECS.values():
+        if codec.id == codec_id:
+            return codec
+    raise ValueError(f"Unknown compression codec {codec_id!r}")
+
+
+def _import_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "The parquet storage backend requires pyarrow: `pip install pyarrow`"
+        ) from e
+    return pq
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+import typing as t
+
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class LRUCache:
+    """
+    A thread-safe, least-recently-used cache of DataFrames with a memory budget.
+
+    Keys are tuples whose first element is the symbol, so that all entries for a
+    symbol can be invalidated at once. Each entry also stores a `version` (e.g. file
+    modification times); a lookup with a different version is treated as a miss.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[t.Hashable, pd.DataFrame, int]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple, version: t.Hashable) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, version: t.Hashable, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (version, df, size)
+            self.num_bytes += size
+            while self.num_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, symbol: str | None = None) -> None:
+        """
+        Remove all entries for `symbol`, or all entries if `symbol` is None.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if symbol is None or key[0] == symbol:
+                    self._pop(key)
+
+    def _pop(self, key: tuple) -> None:
+        _, _, size = self._entries.pop(key)
+        self.num_bytes -= size
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import typing as t
+
+import pandas as pd
+
+from fin_models.dataclasses import HistoricalMetadata
+from fin_models.enums import Freq
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS historical_metadata (
+    symbol TEXT NOT NULL,
+    freq TEXT NOT NULL,
+    first_bar_utc INTEGER NOT NULL,
+    latest_bar_utc INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume INTEGER NOT NULL,
+    timezone TEXT NOT NULL,
+    num_rows INTEGER,
+    num_bytes INTEGER,
+    updated_ns INTEGER NOT NULL,
+    PRIMARY KEY (symbol, freq)
+) WITHOUT ROWID
+"""
+
+COLUMNS = (
+    "freq",
+    "first_bar_utc",
+    "latest_bar_utc",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "timezone",
+    "num_rows",
+    "num_bytes",
+)
+
+
+class Catalog:
+    """
+    A single-file SQLite catalog of the :class:`HistoricalMetadata` for every symbol
+    and frequency in a :class:`~fin_models.store.Store`.
+
+    Each thread uses its own connection, and the database uses write-ahead logging so
+    that readers in other processes do not block on (or observe partial) writes. If
+    `read_only`, the (existing) database is opened in read-only mode.
+    """
+
+    def __init__(self, filepath: str, read_only: bool = False):
+        self.filepath = filepath
+        self.read_only = read_only
+        self._local = threading.local()
+        if not read_only:
+            with self._connection() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(SCHEMA)
+
+    def get(self, symbol: str, freq: Freq) -> HistoricalMetadata | None:
+        row = (
+            self._connection()
+            .execute(
+                f"SELECT {', '.join(COLUMNS)} FROM historical_metadata"
+                " WHERE symbol = ? AND freq = ?",
+                (symbol.upper(), freq.value),
+            )
+            .fetchone()
+        )
+        return _to_historical_metadata(row) if row else None
+
+    def get_all(self, freq: Freq) -> dict[str, HistoricalMetadata]:
+        rows = self._connection().execute(
+            f"SELECT symbol, {', '.join(COLUMNS)} FROM historical_metadata"
+            " WHERE freq = ? ORDER BY symbol",
+            (freq.value,),
+        )
+        return {symbol: _to_historical_metadata(row) for symbol, *row in rows}
+
+    def has(self, symbol: str, freq: Freq) -> bool:
+        return bool(
+            self._connection()
+            .execute(
+                "SELECT 1 FROM historical_metadata WHERE symbol = ? AND freq = ?",
+                (symbol.upper(), freq.value),
+            )
+            .fetchone()
+        )
+
+    def freqs(self, symbol: str) -> set[Freq]:
+        rows = self._connection().execute(
+            "SELECT freq FROM historical_metadata WHERE symbol = ?",
+            (symbol.upper(),),
+        )
+        return {Freq(freq) for (freq,) in rows}
+
+    def symbols(self, freq: Freq | None = None) -> list[str]:
+        if freq is None:
+            rows = self._connection().execute(
+                "SELECT DISTINCT symbol FROM historical_metadata ORDER BY symbol"
+            )
+        else:
+            rows = self._connection().execute(
+                "SELECT symbol FROM historical_metadata WHERE freq = ? ORDER BY symbol",
+                (freq.value,),
+            )
+        return [symbol for (symbol,) in rows]
+
+    def version(self, symbol: str, freq: Freq) -> int | None:
+        """
+        Returns the time (in nanoseconds) the entry for `symbol` and `freq` was last
+        written, or None if there is no entry.
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT updated_ns FROM historical_metadata WHERE symbol = ? AND freq = ?",
+                (symbol.upper(), freq.value),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def put(self, symbol: str, data: HistoricalMetadata) -> None:
+        self.put_many([(symbol, data)])
+
+    def put_many(self, items: t.Iterable[tuple[str, HistoricalMetadata]]) -> None:
+        """
+        Write the metadata for many symbols in a single transaction.
+        """
+        updated_ns = time.time_ns()
+        with self._connection() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO historical_metadata"
+                f" (symbol, {', '.join(COLUMNS)}, updated_ns)"
+                f" VALUES ({', '.join('?' * (len(COLUMNS) + 2))})",
+                [
+                    (
+                        symbol.upper(),
+                        data.freq.value,
+                        data.first_bar_utc.value,
+                        data.latest_bar_utc.value,
+                        float(data.Open),
+                        float(data.High),
+                        float(data.Low),
+                        float(data.Close),
+                        int(data.Volume),
+                        data.timezone,
+                        data.num_rows,
+                        data.num_bytes,
+                        updated_ns,
+                    )
+                    for symbol, data in items
+                ],
+            )
+
+    def delete(self, symbol: str, freq: Freq | None = None) -> None:
+        with self._connection() as conn:
+            if freq is None:
+                conn.execute(
+                    "DELETE FROM historical_metadata WHERE symbol = ?",
+                    (symbol.upper(),),
+                )
+            else:
+                conn.execute(
+                    "DELETE FROM historical_metadata WHERE symbol = ? AND freq = ?",
+                    (symbol.upper(), freq.value),
+                )
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM historical_metadata")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.read_only:
+                conn = sqlite3.connect(
+                    f"file:{self.filepath}?mode=ro", uri=True, timeout=60
+                )
+            else:
+                conn = sqlite3.connect(self.filepath, timeout=60)
+            self._local.conn = conn
+        return conn
+
+
+def _to_historical_metadata(row: tuple) -> HistoricalMetadata:
+    (
+        freq,
+        first_bar_utc,
+        latest_bar_utc,
+        open_,
+        high,
+        low,
+        close,
+        volume,
+        timezone,
+        num_rows,
+        num_bytes,
+    ) = row
+    return HistoricalMetadata(
+        freq=Freq(freq),
+        first_bar_utc=pd.Timestamp(first_bar_utc, tz="UTC"),
+        latest_bar_utc=pd.Timestamp(latest_bar_utc, tz="UTC"),
+        Open=open_,
+        High=high,
+        Low=low,
+        Close=close,
+        Volume=volume,
+        timezone=timezone,
+        num_rows=num_rows,
+        num_bytes=num_bytes,
+    )
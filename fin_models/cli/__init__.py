@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from .groups import main, yahoo
+from .groups import main, store_group, yahoo
+from .store import compact_command, migrate_command, serve_command
 from .symbols import symbols_command
 from .sync import sync_command
 from .yahoo import most_actives
@@ -11,3 +11,8 @@ def main():
 @main.group()
 def yahoo():
     """Commands for Yahoo! Finance"""
+
+
+@main.group("store")
+def store_group():
+    """Commands for managing the local data store"""
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import click
+
+from fin_models.backends import BACKENDS, COMPRESSIONS
+from fin_models.config import Config
+from fin_models.migrate import migrate
+from fin_models.server import serve
+from fin_models.store import LAYOUTS, PROFILES
+
+from .groups import store_group
+
+
+root_dir_option = click.option(
+    "--root-dir",
+    type=click.Path(file_okay=False, exists=True),
+    default=Config.SYMBOL_DATA_DIR,
+    help=f"The store's root directory (default {Config.SYMBOL_DATA_DIR})",
+)
+workers_option = click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of worker processes (default the number of CPUs)",
+)
+
+
+@store_group.command("migrate")
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKENDS)),
+    default=None,
+    help="Storage backend to convert to (default unchanged)",
+)
+@click.option(
+    "--layout",
+    type=click.Choice(LAYOUTS),
+    default=None,
+    help="Layout to convert to (default unchanged)",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILES),
+    default=None,
+    help="Storage profile to convert to (default unchanged)",
+)
+@click.option(
+    "--compression",
+    type=click.Choice(COMPRESSIONS),
+    default=None,
+    help="Compression codec to convert to (default unchanged)",
+)
+@click.option(
+    "--compression-level",
+    type=int,
+    default=None,
+    help="Compression level of the codec (default the codec's default)",
+)
+@root_dir_option
+@workers_option
+def migrate_command(
+    backend: str | None = None,
+    layout: str | None = None,
+    profile: str | None = None,
+    compression: str | None = None,
+    compression_level: int | None = None,
+    root_dir: str = Config.SYMBOL_DATA_DIR,
+    workers: int | None = None,
+):
+    """
+    Convert all symbols in the store to another on-disk format
+
+    Stop other readers and writers until the migration finishes. If interrupted,
+    rerun the same command to resume it.
+    """
+    _run(
+        root_dir,
+        backend=backend,
+        layout=layout,
+        profile=profile,
+        compression=compression,
+        compression_level=compression_level,
+        workers=workers,
+    )
+
+
+@store_group.command("compact")
+@click.option(
+    "--symbols",
+    type=str,
+    default=None,
+    help="Optional list of symbols to compact (default all)",
+)
+@root_dir_option
+@workers_option
+def compact_command(
+    symbols: str | None = None,
+    root_dir: str = Config.SYMBOL_DATA_DIR,
+    workers: int | None = None,
+):
+    """
+    Rewrite symbols in the store re-sorted and without duplicate bars
+    """
+    if symbols:
+        symbols = [symbol.strip().upper() for symbol in symbols.split(",")]
+    _run(root_dir, symbols=symbols, workers=workers)
+
+
+@store_group.command("serve")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=Config.STORE_SOCKET,
+    help=f"The Unix socket to listen on (default {Config.STORE_SOCKET})",
+)
+@click.option(
+    "--cache-size",
+    type=int,
+    default=1024,
+    help="Memory budget of the cache, in MiB (default 1024)",
+)
+@root_dir_option
+def serve_command(
+    socket_path: str = Config.STORE_SOCKET,
+    cache_size: int = 1024,
+    root_dir: str = Config.SYMBOL_DATA_DIR,
+):
+    """
+    Serve the store to local processes (see RemoteStore)
+    """
+    try:
+        print(f"Serving {root_dir} on {socket_path}")
+        serve(socket_path, root_dir, cache_size=cache_size * 2**20)
+    except (ImportError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    except KeyboardInterrupt:
+        pass
+
+
+def _run(root_dir: str, workers: int | None = None, **kwargs):
+    count = 0
+
+    def progress(symbol: str, report: dict):
+        nonlocal count
+        count += 1
+        rows = sum(freq["rows"] for freq in report["freqs"].values())
+        duplicates = sum(
+            freq["source_rows"] - freq["rows"] for freq in report["freqs"].values()
+        )
+        print(f"{symbol} ({count}): {rows} bars ({duplicates} duplicates removed)")
+
+    try:
+        reports = migrate(root_dir, max_workers=workers, progress=progress, **kwargs)
+    except (ImportError, RuntimeError, ValueError) as e:
+        raise click.ClickException(str(e))
+    print(f"Rewrote {len(reports)} symbols")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 
 from datetime import timedelta
@@ -66,7 +67,6 @@ def sync_command(
 
     FIXME:
         - how to handle delisted symbols?
-        - on splits, handle refetching all stored frequencies
     """
     types = polygon.normalize_ticker_types(types)
     end = to_ts(end, default=nyse.get_latest_trading_date_schedule()["market_close"])
@@ -100,8 +100,15 @@ def init_or_update(
         )
 
     for split in polygon.get_splits(dt=end):
-        # FIXME handle re-fetching all stored frequencies?
-        store._delete_all(symbol=split["ticker"])
+        # the splits of every ticker in the market, not only the stored ones
+        if not store.has(split["ticker"], Freq[-1]):
+            continue
+        # adjust the stored history like the (split-adjusted) bars we fetch
+        store.apply_split(
+            split["ticker"],
+            ratio=split["split_to"] / split["split_from"],
+            execution_date=split["execution_date"],
+        )
 
     symbol_start_dates = {}
     for symbol in symbols:
@@ -119,15 +126,29 @@ def init_or_update(
             )
             for symbol in symbols
         ]
+        loop = asyncio.get_event_loop()
+
+        def report(data: dict[str, pd.DataFrame]) -> None:
+            nonlocal count
+            for symbol, df in data.items():
+                count += 1
+                print(f"{symbol} ({count} / {len(symbols)}): Added {len(df)} bars")
+
+        writing = None
         for url_batch in chunk(urls, 200):
+            # (the loop also runs the previous batch's writes while downloading)
             successes, errors, exceptions = bulk_download(url_batch)
+            if writing is not None:
+                report(loop.run_until_complete(writing))
+            data = {}
             for resp in successes:
-                count += 1
-                df = polygon.json_to_df(resp.json)
                 m = polygon.HISTORY_URL_REGEX.match(resp.url)
-                symbol = m.groupdict()["symbol"]
-                store.write(symbol, freq, df)
-                print(f"{symbol} ({count} / {len(symbols)}): Added {len(df)} bars")
+                data[m.groupdict()["symbol"]] = polygon.json_to_df(resp.json)
+            # write the batch concurrently, on the store's I/O threads, while the
+            # next batch downloads
+            writing = loop.create_task(store.awrite_many(data, freq))
+        if writing is not None:
+            report(loop.run_until_complete(writing))
 
     elif freq == Freq.min_1:
         for symbol in symbols:
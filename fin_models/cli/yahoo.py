@@ -54,7 +54,7 @@ def _init_daily_with_yahoo(symbols: str | None = None):
             if df is None:
                 return symbol, "Invalid Data"
             click.echo(f"Writing {symbol}")
-            store.write(symbol, Freq.day, df)
+            await store.awrite(symbol, Freq.day, df)
 
     async def dl_all(symbols):
         errors = []
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+
+# compact prices are guaranteed to round-trip to this many decimal places
+PRICE_DECIMALS = 4
+
+VOLUME_DTYPES = (np.dtype("u4"), np.dtype("u8"))
+
+
+def compact(df: pd.DataFrame, decimals: int = PRICE_DECIMALS) -> pd.DataFrame:
+    """
+    Return `df` with narrow dtypes: float32 prices and uint32 volume.
+
+    Each column is only narrowed if no information is lost: prices must be equal to
+    the original prices when both are rounded to `decimals` decimal places (float32
+    has ~7 significant digits, so this holds for prices up to ~$1,000 with the default
+    4 decimals), and volumes must be non-negative integers. Otherwise the column is
+    widened instead (prices stay float64, volume becomes uint64 if it fits).
+
+    The timezone-aware DatetimeIndex is kept as-is; pandas already stores it as int64
+    UTC nanoseconds and only converts to local time when fields are accessed.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if column in PRICE_COLUMNS:
+            columns[column] = _compact_prices(values, decimals)
+        elif column == "Volume":
+            columns[column] = _compact_volume(values)
+        else:
+            columns[column] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _compact_prices(values: np.ndarray, decimals: int) -> np.ndarray:
+    if values.dtype == np.float32 or values.dtype.kind not in "fiu":
+        return values
+
+    narrow = values.astype(np.float32)
+    if np.array_equal(
+        np.round(narrow.astype(np.float64), decimals),
+        np.round(values.astype(np.float64), decimals),
+        equal_nan=True,
+    ):
+        return narrow
+    return values.astype(np.float64)
+
+
+def _compact_volume(values: np.ndarray) -> np.ndarray:
+    if (
+        values.dtype == VOLUME_DTYPES[0]
+        or values.dtype.kind not in "fiu"
+        or not len(values)
+    ):
+        return values
+
+    if values.dtype.kind == "f" and not (
+        np.isfinite(values).all() and (values == np.round(values)).all()
+    ):
+        return values
+
+    lo, hi = values.min(), values.max()
+    if lo < 0:
+        return values
+    for dtype in VOLUME_DTYPES:
+        if hi <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values
@@ -6,6 +6,8 @@ import os
 class Config:
     DATA_DIR: str = os.path.expanduser("~/.fin-models-data")
     SYMBOLS_DATA_FILEPATH = os.path.join(DATA_DIR, "symbols.json")
+    SYMBOL_DATA_DIR = os.path.join(DATA_DIR, "symbol-data")
+    STORE_SOCKET = os.path.join(DATA_DIR, "store.sock")
 
     DATABASE_URI: str = "{engine}://{user}:{pw}@{host}:{port}/{db}".format(
         engine=os.getenv("SQLALCHEMY_DATABASE_ENGINE", "postgresql+psycopg2"),
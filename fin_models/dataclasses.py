@@ -50,6 +50,12 @@ class CompanyDetails:
     weighted_shares_outstanding: int | None = None
 
 
+@dataclass(kw_only=True)
+class Split:
+    execution_date: date
+    ratio: float  # new shares per old share (e.g. 4 for a 4-for-1 split)
+
+
 @dataclass(kw_only=True)
 class HistoricalMetadata:
     freq: Freq
@@ -61,6 +67,8 @@ class HistoricalMetadata:
     Close: float
     Volume: float
     timezone: str = "America/New_York"
+    num_rows: int | None = None
+    num_bytes: int | None = None
 
     @property
     def first_bar_utc(self) -> pd.Timestamp:
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import json
+import os
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from fin_models.calendar import Calendar
+from fin_models.file_utils import FileLocks, atomic_open
+
+
+DTYPES = {
+    "Open": np.dtype("f8"),
+    "High": np.dtype("f8"),
+    "Low": np.dtype("f8"),
+    "Close": np.dtype("f8"),
+    "Volume": np.dtype("u8"),
+}
+
+# how many symbol rows / trading days to allocate at a time
+SYMBOLS_CHUNK_SIZE = 1024
+DAYS_HORIZON = pd.DateOffset(years=2)
+
+
+class DenseDailyMatrices:
+    """
+    Memory-mapped ``[symbol_id, trading_day_index]`` matrices of daily bars.
+
+    Each column is stored in its own file (``close.f8``, ``volume.u8``, ...) in
+    row-major order, so a symbol's history is contiguous and a date range across all
+    symbols is a zero-copy (strided) view. Trading days come from the exchange
+    calendar, from `start` (or the first bar written, if earlier) until some time
+    after the latest bar written. Symbol ids are assigned in the order symbols are
+    first written (persisted in ``symbols.json``). Missing prices are NaN and missing
+    volume is 0.
+
+    Updates hold an exclusive file lock, and reload the symbols and dates first if
+    another process has changed them, so multiple processes can update the matrices.
+    If `read_only`, the (existing) matrices are mapped read-only and cannot be updated.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        calendar: Calendar | str = "NYSE",
+        start: str = "2000-01-01",
+        read_only: bool = False,
+    ):
+        self.root_dir = root_dir
+        self.calendar = (
+            Calendar(exchange=calendar) if isinstance(calendar, str) else calendar
+        )
+        self.read_only = read_only
+        if read_only:
+            self._locks = FileLocks(self.root_dir, read_only=True)
+            self.symbols: list[str] = []
+            self._symbol_ids: dict[str, int] = {}
+            self._matrices: dict[str, np.memmap] = {}
+            self._state: tuple[int | None, int | None] = (None, None)
+            with self._locks.shared("matrices"):
+                self._refresh()
+            return
+
+        os.makedirs(self.root_dir, exist_ok=True)
+        self._locks = FileLocks(self.root_dir)
+
+        self.symbols = []
+        self._symbol_ids = {}
+        self._matrices = {}
+        self._state = (None, None)
+        with self._locks.exclusive("matrices"):
+            if not os.path.exists(self._dates_path):
+                self._save_dates(
+                    self._trading_days(start, pd.Timestamp.today() + DAYS_HORIZON)
+                )
+            self._refresh()
+
+    def matrix(self, column: str = "Close") -> np.ndarray:
+        """
+        Returns the memory-mapped ``[symbol_id, trading_day_index]`` matrix for a
+        column (a read-only view, trimmed to the symbols with data).
+        """
+        view = self._open(column)[: len(self.symbols)]
+        view.flags.writeable = False
+        return view
+
+    def get(
+        self,
+        column: str = "Close",
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        symbols: t.Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Returns a DataFrame of trading dates by symbol for the given column.
+
+        Without `symbols`, the DataFrame wraps a view of the memory-mapped data
+        (selecting `symbols` requires a copy).
+        """
+        # (mapped while locked, so that the matrices are not resized meanwhile)
+        with self._locks.shared("matrices"):
+            self._refresh()
+            lo = 0 if start is None else self.dates.searchsorted(_to_date(start))
+            hi = (
+                len(self.dates)
+                if end is None
+                else self.dates.searchsorted(_to_date(end), side="right")
+            )
+            matrix = self.matrix(column)
+            if symbols is None:
+                symbols = self.symbols
+            else:
+                matrix = matrix[[self._symbol_ids[symbol] for symbol in symbols]]
+            return pd.DataFrame(
+                matrix[:, lo:hi].T,
+                index=self.dates[lo:hi],
+                columns=pd.Index(symbols, name="Symbol"),
+                copy=False,
+            )
+
+    def update(self, symbol: str, df: pd.DataFrame) -> None:
+        """
+        Write the daily bars in `df` into the matrices. Bars on dates that are not
+        trading days (according to the calendar) are ignored.
+        """
+        if df.empty:
+            return
+
+        with self._locks.exclusive("matrices"):
+            self._refresh()
+            dates = pd.DatetimeIndex(df.index.date)
+            if dates[0] < self.dates[0] or dates[-1] > self.dates[-1]:
+                self._extend_dates(
+                    min(dates[0], self.dates[0]),
+                    max(dates[-1] + DAYS_HORIZON, self.dates[-1]),
+                )
+
+            positions = self.dates.get_indexer(dates)
+            valid = positions >= 0
+            positions = positions[valid]
+
+            symbol_id = self._symbol_id(symbol.upper())
+            for column, dtype in DTYPES.items():
+                if column in df.columns:
+                    values = df[column].to_numpy()[valid]
+                    if dtype.kind == "u":
+                        values = np.nan_to_num(values)
+                    self._open(column)[symbol_id, positions] = values.astype(dtype)
+            self.flush()
+
+    def clear(self, symbol: str) -> None:
+        """
+        Mark all of the data for `symbol` as missing.
+        """
+        with self._locks.exclusive("matrices"):
+            self._refresh()
+            symbol_id = self._symbol_ids.get(symbol.upper())
+            if symbol_id is None:
+                return
+
+            for column, dtype in DTYPES.items():
+                self._open(column)[symbol_id] = _missing(dtype)
+            self.flush()
+
+    def flush(self) -> None:
+        for matrix in self._matrices.values():
+            matrix.flush()
+
+    def _symbol_id(self, symbol: str) -> int:
+        if symbol in self._symbol_ids:
+            return self._symbol_ids[symbol]
+
+        symbol_id = len(self.symbols)
+        if symbol_id >= self._capacity():
+            self._resize(symbol_id + SYMBOLS_CHUNK_SIZE, len(self.dates))
+
+        self.symbols.append(symbol)
+        self._symbol_ids[symbol] = symbol_id
+        with atomic_open(self._symbols_path, "w") as f:
+            json.dump(self.symbols, f)
+        self._state = self._current_state()
+        return symbol_id
+
+    def _capacity(self) -> int:
+        filepath = self._matrix_path("Close")
+        if not os.path.exists(filepath):
+            return 0
+        return os.path.getsize(filepath) // (len(self.dates) * DTYPES["Close"].itemsize)
+
+    def _extend_dates(self, start: pd.Timestamp, end: pd.Timestamp) -> None:
+        dates = self._trading_days(start, end)
+        self._resize(self._capacity(), len(dates), dates.searchsorted(self.dates[0]))
+        self._save_dates(dates)
+        self._state = self._current_state()
+
+    def _save_dates(self, dates: pd.DatetimeIndex) -> None:
+        self.dates = dates
+        with atomic_open(self._dates_path) as f:
+            np.save(f, self.dates.values)
+
+    def _refresh(self) -> None:
+        """
+        Reload the symbols and dates if they were changed (by another process) since
+        they were last loaded, re-opening the matrices (which may have been resized).
+        """
+        state = self._current_state()
+        if state == self._state:
+            return
+
+        if os.path.exists(self._symbols_path):
+            with open(self._symbols_path) as f:
+                self.symbols = json.load(f)
+        self._symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.dates = pd.DatetimeIndex(np.load(self._dates_path), name="Date")
+        self._matrices.clear()
+        self._state = state
+
+    def _current_state(self) -> tuple[int | None, int | None]:
+        return _mtime_ns(self._symbols_path), _mtime_ns(self._dates_path)
+
+    def _resize(self, num_symbols: int, num_days: int, day_offset: int = 0) -> None:
+        """
+        Grow the matrices to ``[num_symbols, num_days]``, filling new cells as missing.
+        The existing days are moved `day_offset` days later (for days added before
+        them).
+        """
+        old_symbols, old_days = self._capacity(), len(self.dates)
+        for column, dtype in DTYPES.items():
+            filepath = self._matrix_path(column)
+            old = self._matrices.pop(column, None)
+            if old is not None:
+                old.flush()
+                del old
+
+            if num_days == old_days:
+                # row-major, so adding symbol rows only appends to the file
+                matrix = _memmap(filepath, dtype, (num_symbols, num_days))
+                matrix[old_symbols:] = _missing(dtype)
+            else:
+                old_data = None
+                if old_symbols:
+                    old_data = np.array(
+                        np.memmap(
+                            filepath, dtype=dtype, mode="r", shape=(old_symbols, old_days)
+                        )
+                    )
+                    os.remove(filepath)
+                matrix = _memmap(filepath, dtype, (num_symbols, num_days))
+                matrix[:] = _missing(dtype)
+                if old_data is not None:
+                    matrix[:old_symbols, day_offset : day_offset + old_days] = old_data
+            matrix.flush()
+            self._matrices[column] = matrix
+
+    def _open(self, column: str) -> np.memmap:
+        if column not in self._matrices and self.read_only:
+            self._matrices[column] = np.memmap(
+                self._matrix_path(column),
+                dtype=DTYPES[column],
+                mode="r",
+                shape=(self._capacity(), len(self.dates)),
+            )
+        elif column not in self._matrices:
+            if self._capacity() == 0:
+                self._resize(SYMBOLS_CHUNK_SIZE, len(self.dates))
+            else:
+                self._matrices[column] = _memmap(
+                    self._matrix_path(column),
+                    DTYPES[column],
+                    (self._capacity(), len(self.dates)),
+                )
+        return self._matrices[column]
+
+    def _trading_days(self, start, end) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.calendar.schedule(start, end).index, name="Date")
+
+    def _matrix_path(self, column: str) -> str:
+        return os.path.join(
+            self.root_dir,
+            f"{column.lower()}.{DTYPES[column].kind}{DTYPES[column].itemsize}",
+        )
+
+    @property
+    def _symbols_path(self) -> str:
+        return os.path.join(self.root_dir, "symbols.json")
+
+    @property
+    def _dates_path(self) -> str:
+        return os.path.join(self.root_dir, "dates.npy")
+
+
+def _memmap(filepath: str, dtype: np.dtype, shape: tuple[int, int]) -> np.memmap:
+    """
+    Open a writeable memory map, creating or growing the file as needed.
+    """
+    num_bytes = shape[0] * shape[1] * dtype.itemsize
+    with open(filepath, "ab") as f:
+        if f.tell() < num_bytes:
+            f.truncate(num_bytes)
+    return np.memmap(filepath, dtype=dtype, mode="r+", shape=shape)
+
+
+def _mtime_ns(filepath: str) -> int | None:
+    try:
+        return os.stat(filepath).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _to_date(dt: str | pd.Timestamp) -> pd.Timestamp:
+    return pd.Timestamp(pd.Timestamp(dt).date())
+
+
+def _missing(dtype: np.dtype):
+    return np.nan if dtype.kind == "f" else 0
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+import typing as t
+import uuid
+
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover (Windows)
+    fcntl = None
+
+
+@contextlib.contextmanager
+def atomic_open(filepath: str, mode: str = "wb") -> t.Iterator[t.IO]:
+    """
+    Open a temporary file next to `filepath` for writing, and atomically rename it
+    to `filepath` once the block exits successfully (readers observe either the old
+    or the new file, never a partially written one). On error, the temporary file is
+    removed and `filepath` is left untouched.
+    """
+    tmp_path = f"{filepath}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def hold_shared_lock(filepath: str) -> int:
+    """
+    Create (if needed) and take a shared lock on the file at `filepath`. Returns the
+    open file descriptor, which holds the lock until it is closed.
+    """
+    fd = os.open(filepath, os.O_RDWR | os.O_CREAT)
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_SH)
+    return fd
+
+
+def try_lock_exclusive(filepath: str) -> int | None:
+    """
+    Take an exclusive lock on the file at `filepath` without blocking. Returns the
+    open file descriptor holding the lock, or None if another file descriptor (in
+    any process) holds a lock on it, or if locks are not supported.
+    """
+    if fcntl is None:
+        return None
+    try:
+        fd = os.open(filepath, os.O_RDWR)
+    except FileNotFoundError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+class FileLocks:
+    """
+    Advisory, reentrant reader/writer locks keyed by name (e.g. symbol), backed by
+    ``flock`` on lock files in `lock_dir`, so they are honored across threads and
+    processes.
+
+    A thread that already holds a lock may acquire it again (an exclusive lock also
+    satisfies shared requests). Upgrading a shared lock to exclusive is not
+    supported. Where ``fcntl`` is unavailable, locks are no-ops.
+
+    If `read_only`, no directories or lock files are created: only shared locks can
+    be acquired, and only on lock files which already exist (a missing lock file
+    means no writer has locked that name yet).
+    """
+
+    def __init__(self, lock_dir: str, read_only: bool = False):
+        self.lock_dir = lock_dir
+        self.read_only = read_only
+        self._local = threading.local()
+        if not read_only:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def shared(self, name: str) -> t.ContextManager[None]:
+        return self._lock(name, exclusive=False)
+
+    def exclusive(self, name: str) -> t.ContextManager[None]:
+        return self._lock(name, exclusive=True)
+
+    @contextlib.contextmanager
+    def _lock(self, name: str, exclusive: bool) -> t.Iterator[None]:
+        held: dict[str, tuple[int, bool, int]] = self._held()
+        if name in held:
+            fd, is_exclusive, depth = held[name]
+            if exclusive and not is_exclusive:
+                raise RuntimeError(f"Cannot upgrade the shared lock on {name!r}")
+            held[name] = (fd, is_exclusive, depth + 1)
+            try:
+                yield
+            finally:
+                held[name] = (fd, is_exclusive, depth)
+            return
+
+        filepath = os.path.join(self.lock_dir, f"{name}.lock")
+        if self.read_only:
+            if exclusive:
+                raise RuntimeError(f"Cannot lock {name!r} exclusively (read-only)")
+            try:
+                fd = os.open(filepath, os.O_RDONLY)
+            except FileNotFoundError:
+                yield
+                return
+        else:
+            fd = os.open(filepath, os.O_RDWR | os.O_CREAT)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            held[name] = (fd, exclusive, 1)
+            try:
+                yield
+            finally:
+                del held[name]
+        finally:
+            os.close(fd)  # also releases the lock
+
+    def _held(self) -> dict[str, tuple[int, bool, int]]:
+        if not hasattr(self._local, "held"):
+            self._local.held = {}
+        return self._local.held
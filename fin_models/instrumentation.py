@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+import typing as t
+
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+from fin_models.backends import Backend
+
+
+# called with the name of each instrumented operation, its duration (in seconds) and
+# its counters (e.g. ``{"rows_returned": 390}``)
+Observer = t.Callable[[str, float, dict[str, int]], None]
+
+
+class StoreStats:
+    """
+    Thread-safe counters of the calls made to an instrumented
+    :class:`~fin_models.store.Store` (see its `stats` and `observer` arguments): the
+    number of calls and total duration of each operation, and the sum of each
+    counter (bytes read and written, rows returned, source frequencies probed).
+
+    Durations are inclusive: e.g. the duration of a ``get`` includes reading its
+    source bars (``read_file``) and aggregating them (``agg``).
+    """
+
+    def __init__(self, observer: Observer | None = None):
+        self.observer = observer
+        self.calls: Counter[str] = Counter()
+        self.seconds: defaultdict[str, float] = defaultdict(float)
+        self.counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def timed(
+        self,
+        name: str,
+        fn: t.Callable,
+        count: t.Callable[[t.Any], dict[str, int]] | None = None,
+    ) -> t.Callable:
+        """
+        Wrap `fn` to record its calls as `name`, with the counters returned by
+        `count` for its result.
+        """
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self.record(
+                name,
+                time.perf_counter() - start,
+                count(result) if count is not None else {},
+            )
+            return result
+
+        return wrapper
+
+    def record(self, name: str, seconds: float, counters: dict[str, int]) -> None:
+        with self._lock:
+            self.calls[name] += 1
+            self.seconds[name] += seconds
+            self.counters.update(counters)
+        if self.observer is not None:
+            self.observer(name, seconds, counters)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "seconds": dict(self.seconds),
+                **{
+                    counter: self.counters[counter]
+                    for counter in [
+                        "bytes_read",
+                        "bytes_written",
+                        "rows_returned",
+                        "source_freq_probes",
+                    ]
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.seconds.clear()
+            self.counters.clear()
+
+
+class InstrumentedBackend(Backend):
+    """
+    Records the file reads (``read_file``) and writes (``write_file`` and
+    ``append_file``) of another backend in `stats`: bytes read are the in-memory size
+    of the bars read, and bytes written the size of the files written (or for
+    appends, how much they grew).
+    """
+
+    def __init__(self, backend: Backend, stats: StoreStats):
+        self.backend = backend
+        self.name = backend.name
+        self.extension = backend.extension
+        self.compression = backend.compression
+        self.compression_level = backend.compression_level
+        self.read = stats.timed("read_file", backend.read, _count_read)
+        self.delete = backend.delete
+        self._stats = stats
+
+    def write(self, filepath: str, df: pd.DataFrame) -> None:
+        start = time.perf_counter()
+        self.backend.write(filepath, df)
+        self._record("write_file", start, os.path.getsize(filepath))
+
+    def append(self, filepath: str, df: pd.DataFrame) -> pd.DataFrame:
+        old_size = os.path.getsize(filepath)
+        start = time.perf_counter()
+        df = self.backend.append(filepath, df)
+        self._record("append_file", start, os.path.getsize(filepath) - old_size)
+        return df
+
+    def _record(self, name: str, start: float, bytes_written: int) -> None:
+        self._stats.record(
+            name, time.perf_counter() - start, {"bytes_written": bytes_written}
+        )
+
+
+def _count_read(df: pd.DataFrame) -> dict[str, int]:
+    return {"bytes_read": int(df.memory_usage(index=True).sum())}
@@ -0,0 +1,302 @@
+"""
+Rewrite every symbol in a store, re-sorted and deduplicated, optionally converting it
+to another on-disk format (backend, layout, profile and/or compression).
+
+Symbols are rewritten in parallel worker processes into a staging directory
+(``.migrate`` in the root directory), verified against the source data, and then
+swapped in one at a time while holding the symbol's lock, so each symbol is either
+entirely in its old or its new format. Interrupted migrations resume from the
+symbols which were not yet swapped in.
+
+Readers of a store being converted to another format should be stopped until the
+migration finishes (the new settings are only saved once every symbol is converted).
+Compacting a store in its current format is safe while it is in use.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import typing as t
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from fin_models.enums import Freq
+from fin_models.file_utils import FileLocks, atomic_open
+from fin_models.store import Store, read_settings, save_settings
+
+
+MIGRATION_DIR = ".migrate"
+
+
+def migrate(
+    root_dir: str,
+    backend: str | None = None,
+    layout: str | None = None,
+    profile: str | None = None,
+    compression: str | None = None,
+    compression_level: int | None = None,
+    symbols: t.Iterable[str] | None = None,
+    max_workers: int | None = None,
+    progress: t.Callable[[str, dict], None] | None = None,
+) -> list[dict]:
+    """
+    Rewrite all (or the given) symbols of the store at `root_dir`, converting them to
+    the given `backend`, `layout`, `profile` and/or `compression` (by default, the
+    store's current format is kept). Returns a report for each symbol, also passed to
+    `progress` as each symbol finishes.
+
+    Only a whole store can be converted to another format. Once every symbol has
+    been rewritten, the new format is saved as the store's settings, and its dense
+    matrices (if any) are rebuilt. The catalog (if any) is updated as each symbol
+    is swapped in.
+    """
+    source_settings = Store(root_dir, read_only=True).settings
+    target_settings = {
+        "backend": backend or source_settings["backend"],
+        "layout": layout or source_settings["layout"],
+        "profile": profile or source_settings["profile"],
+        "compression": compression or source_settings["compression"],
+        "compression_level": compression_level
+        if compression or compression_level is not None
+        else source_settings["compression_level"],
+    }
+    Store(root_dir, read_only=True, **target_settings)  # validate the target format
+    if symbols is not None and target_settings != source_settings:
+        raise ValueError("Cannot convert only some symbols to another format.")
+
+    state_dir = os.path.join(root_dir, MIGRATION_DIR)
+    os.makedirs(os.path.join(state_dir, "done"), exist_ok=True)
+    _check_state(state_dir, source_settings, target_settings)
+
+    # including symbols moved aside by an interrupted swap
+    old_dir = os.path.join(state_dir, "old")
+    all_symbols = sorted(
+        {
+            dir_entry.name
+            for dir_entry in os.scandir(root_dir)
+            if dir_entry.is_dir() and not dir_entry.name.startswith(".")
+        }.union(os.listdir(old_dir) if os.path.isdir(old_dir) else [])
+    )
+    if symbols is not None:
+        requested = {symbol.upper() for symbol in symbols}
+        all_symbols = [symbol for symbol in all_symbols if symbol in requested]
+
+    reports, errors = [], {}
+    todo = []
+    for symbol in all_symbols:
+        report = _load_report(state_dir, "done", symbol)
+        if report is None:
+            todo.append(symbol)
+        else:
+            reports.append(report)
+            if progress is not None:
+                progress(symbol, report)
+
+    catalog = os.path.exists(os.path.join(root_dir, "catalog.sqlite"))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                migrate_symbol,
+                root_dir,
+                symbol,
+                source_settings,
+                target_settings,
+                catalog,
+            ): symbol
+            for symbol in todo
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                errors[symbol] = e
+                continue
+            reports.append(report)
+            if progress is not None:
+                progress(symbol, report)
+
+    if errors:
+        raise RuntimeError(
+            f"Failed to migrate {len(errors)} symbols (rerun to resume): "
+            + ", ".join(f"{symbol} ({e!r})" for symbol, e in sorted(errors.items()))
+        )
+
+    if symbols is None:
+        save_settings(root_dir, {**read_settings(root_dir), **target_settings})
+    if os.path.exists(os.path.join(root_dir, ".dense")):
+        Store(root_dir, dense=True).rebuild_dense()
+    shutil.rmtree(state_dir)
+    return sorted(reports, key=lambda report: report["symbol"])
+
+
+def migrate_symbol(
+    root_dir: str,
+    symbol: str,
+    source_settings: dict[str, t.Any],
+    target_settings: dict[str, t.Any],
+    catalog: bool = False,
+) -> dict:
+    """
+    Rewrite one symbol into the staging directory, verify it, and swap it in (and
+    if the store has a `catalog`, update its entries).
+
+    For each frequency, the report has the number of rows read from the source
+    (``source_rows``), the number of rows written (``rows``, without duplicates)
+    and a checksum of the written data.
+    """
+    state_dir = os.path.join(root_dir, MIGRATION_DIR)
+    staging_dir = os.path.join(state_dir, "staging")
+    staged_path = os.path.join(staging_dir, symbol)
+    old_path = os.path.join(state_dir, "old", symbol)
+    live_path = os.path.join(root_dir, symbol)
+
+    with FileLocks(os.path.join(root_dir, ".locks")).exclusive(symbol):
+        if os.path.exists(old_path):
+            # interrupted while swapping in the (already verified) staged copy
+            if not os.path.exists(live_path):
+                os.replace(staged_path, live_path)
+            if catalog:
+                _update_catalog(root_dir, symbol, target_settings)
+            return _finish(state_dir, symbol)
+
+        shutil.rmtree(staged_path, ignore_errors=True)
+        source = Store(root_dir, read_only=True, catalog=catalog, **source_settings)
+        staging = Store(staging_dir, **target_settings)
+
+        freqs = {}
+        for freq in Freq:
+            if not source.has_freq(symbol, freq):
+                continue
+            df = source._read(symbol, freq)
+            if df.empty:
+                continue
+
+            expected = staging._compact(dedupe(df))
+            staging.write(symbol, freq, expected)
+            metadata = source.get_historical_metadata(symbol, freq)
+            if metadata is not None:
+                # keep the first bar reported by the vendor (maybe before the data)
+                staged_metadata = staging.get_historical_metadata(symbol, freq)
+                staging._write_historical_metadata(
+                    symbol,
+                    freq,
+                    expected,
+                    metadata.first_bar_utc,
+                    num_rows=staged_metadata.num_rows,
+                    num_bytes=staged_metadata.num_bytes,
+                )
+
+            written = staging._read(symbol, freq)
+            if len(written) != len(expected):
+                raise ValueError(
+                    f"{symbol} {freq.name}: wrote {len(written)} rows"
+                    f" (expected {len(expected)})"
+                )
+            digest = checksum(written)
+            if digest != checksum(expected):
+                raise ValueError(f"{symbol} {freq.name}: the checksums do not match")
+            freqs[freq.name] = dict(
+                source_rows=len(df), rows=len(written), checksum=digest
+            )
+
+        os.makedirs(staged_path, exist_ok=True)
+        for filename in ["company-details.json", "splits.json"]:
+            filepath = os.path.join(live_path, filename)
+            if os.path.exists(filepath):
+                shutil.copy2(filepath, staged_path)
+
+        os.makedirs(os.path.join(state_dir, "verified"), exist_ok=True)
+        with atomic_open(_report_path(state_dir, "verified", symbol), "w") as f:
+            json.dump(dict(symbol=symbol, freqs=freqs), f)
+
+        os.makedirs(os.path.dirname(old_path), exist_ok=True)
+        os.replace(live_path, old_path)
+        os.replace(staged_path, live_path)
+        if catalog:
+            _update_catalog(root_dir, symbol, target_settings)
+        return _finish(state_dir, symbol)
+
+
+def dedupe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return `df` sorted by its index, keeping only the bar with the highest volume for
+    each timestamp (like :meth:`Store.write <fin_models.store.Store.write>` does when
+    merging overlapping bars).
+    """
+    if df.index.is_monotonic_increasing and not df.index.has_duplicates:
+        return df
+    order = np.lexsort((df["Volume"].to_numpy(), df.index.asi8))
+    df = df.iloc[order]
+    return df[~df.index.duplicated(keep="last")]
+
+
+def checksum(df: pd.DataFrame) -> str:
+    """
+    Returns a checksum of the index, columns and values of `df`.
+    """
+    hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest = hashlib.sha256(hashes.tobytes())
+    digest.update(json.dumps([str(column) for column in df.columns]).encode())
+    return digest.hexdigest()
+
+
+def _check_state(
+    state_dir: str,
+    source_settings: dict[str, t.Any],
+    target_settings: dict[str, t.Any],
+) -> None:
+    """
+    Save the settings of a new migration, or check that they match those of the
+    migration being resumed.
+    """
+    filepath = os.path.join(state_dir, "settings.json")
+    settings = dict(source=source_settings, target=target_settings)
+    if not os.path.exists(filepath):
+        with atomic_open(filepath, "w") as f:
+            json.dump(settings, f)
+        return
+
+    with open(filepath) as f:
+        pending = json.load(f)
+    if pending != settings:
+        raise RuntimeError(
+            f"A migration from {pending['source']} to {pending['target']} is in"
+            " progress; rerun it with the same settings to resume it."
+        )
+
+
+def _update_catalog(
+    root_dir: str, symbol: str, target_settings: dict[str, t.Any]
+) -> None:
+    # (the swapped in symbol is in the target format, even if the store's settings
+    # are only saved once the migration finishes)
+    store = Store(root_dir, catalog=True, **target_settings)
+    store._rebuild_catalog_entries(symbol)
+
+
+def _finish(state_dir: str, symbol: str) -> dict:
+    os.replace(
+        _report_path(state_dir, "verified", symbol),
+        _report_path(state_dir, "done", symbol),
+    )
+    shutil.rmtree(os.path.join(state_dir, "old", symbol))
+    return _load_report(state_dir, "done", symbol)
+
+
+def _report_path(state_dir: str, kind: str, symbol: str) -> str:
+    return os.path.join(state_dir, kind, f"{symbol}.json")
+
+
+def _load_report(state_dir: str, kind: str, symbol: str) -> dict | None:
+    try:
+        with open(_report_path(state_dir, kind, symbol)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
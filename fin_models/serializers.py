@@ -6,7 +6,12 @@ import pandas as pd
 
 from marshmallow import Schema, fields, post_load
 
-from fin_models.dataclasses import Address, CompanyDetails, HistoricalMetadata
+from fin_models.dataclasses import (
+    Address,
+    CompanyDetails,
+    HistoricalMetadata,
+    Split,
+)
 from fin_models.enums import Freq
 
 
@@ -83,3 +88,13 @@ class HistoricalMetadataSerializer(BaseSerializer):
     Low = fields.Float()
     Close = fields.Float()
     Volume = fields.Integer()
+
+    num_rows = fields.Integer(required=False, allow_none=True)
+    num_bytes = fields.Integer(required=False, allow_none=True)
+
+
+class SplitSerializer(BaseSerializer):
+    __model__ = Split
+
+    execution_date = fields.Date()
+    ratio = fields.Float()
@@ -0,0 +1,316 @@
+"""
+A local data server, sharing one in-memory cache of a store between the processes
+on a machine (e.g. joblib workers, notebooks and strategy runners), instead of each
+process reading and deserializing the same files.
+
+The server (``fin store serve``) reads from a :class:`~fin_models.store.Store` with
+an LRU cache, and answers requests over a Unix socket: bars are sent as Arrow IPC
+streams, which a :class:`RemoteStore` client maps back into DataFrames without
+deserializing them (requires ``pyarrow``).
+
+Each message is a length-prefixed frame: requests are a JSON object with the name
+and keyword arguments of a :class:`~fin_models.store.Store` read method, and
+responses are a JSON header (the result, or an error) followed by one Arrow IPC
+frame per DataFrame.
+"""
+
+from __future__ import annotations
+
+import builtins
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import typing as t
+
+from datetime import datetime
+
+import pandas as pd
+
+from fin_models.config import Config
+from fin_models.dataclasses import CompanyDetails, HistoricalMetadata, Split
+from fin_models.date_utils import DateType
+from fin_models.enums import Freq
+from fin_models.serializers import (
+    CompanyDetailsSerializer,
+    HistoricalMetadataSerializer,
+    SplitSerializer,
+)
+from fin_models.store import Store, _to_panel
+
+
+_LENGTH = struct.Struct("!Q")
+
+
+class StoreServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Serves the read methods of `store` on the Unix socket at `socket_path` (see
+    :func:`serve`), with a thread per client connection.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, store: Store):
+        self.store = store
+        super().__init__(socket_path, _RequestHandler)
+
+
+def serve(
+    socket_path: str = Config.STORE_SOCKET,
+    root_dir: str | None = None,
+    cache_size: int = 2**30,
+) -> None:
+    """
+    Serve the store at `root_dir` on `socket_path` (until interrupted), caching up
+    to `cache_size` bytes of bars in memory.
+    """
+    _import_pyarrow()
+    if os.path.exists(socket_path):
+        with contextlib.suppress(ConnectionError), socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(socket_path)
+            raise RuntimeError(f"A server is already listening on {socket_path!r}")
+        os.remove(socket_path)  # left over from a server which did not shut down
+
+    server = StoreServer(socket_path, Store(root_dir, cache_size=cache_size))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)
+
+
+class RemoteStore:
+    """
+    A client of a :class:`StoreServer`, with the same read methods as
+    :class:`~fin_models.store.Store`. Each thread (and process) has its own
+    connection to the server.
+
+    :param zero_copy: Whether to return DataFrames backed directly by the received
+        Arrow buffers (without copying them into pandas blocks). Their values are
+        read-only.
+    """
+
+    def __init__(self, socket_path: str = Config.STORE_SOCKET, zero_copy: bool = False):
+        self.socket_path = socket_path
+        self.zero_copy = zero_copy
+        self._local = threading.local()
+
+    def get(
+        self,
+        symbol: str,
+        freq: Freq = Freq.day,
+        columns=("Open", "High", "Low", "Close", "Volume"),
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame | None:
+        _, frames = self._request(
+            "get",
+            symbol=symbol,
+            freq=freq.name,
+            columns=list(columns),
+            start=_isoformat(start),
+            end=_isoformat(end),
+            last_n=last_n,
+        )
+        return frames[0] if frames else None
+
+    def get_many(
+        self,
+        symbols: t.Iterable[str],
+        freq: Freq = Freq.day,
+        columns=("Open", "High", "Low", "Close", "Volume"),
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+        last_n: int | None = None,
+        panel: bool = False,
+    ) -> dict[str, pd.DataFrame] | pd.DataFrame:
+        symbols, frames = self._request(
+            "get_many",
+            symbols=list(symbols),
+            freq=freq.name,
+            columns=list(columns),
+            start=_isoformat(start),
+            end=_isoformat(end),
+            last_n=last_n,
+        )
+        data = dict(zip(symbols, frames))
+        return _to_panel(data, columns) if panel else data
+
+    def get_company_details(self, symbol: str) -> CompanyDetails | None:
+        result, _ = self._request("get_company_details", symbol=symbol)
+        return CompanyDetailsSerializer().load(result) if result is not None else None
+
+    def get_splits(self, symbol: str) -> list[Split]:
+        result, _ = self._request("get_splits", symbol=symbol)
+        return SplitSerializer(many=True).load(result)
+
+    def get_historical_metadata(
+        self, symbol: str, freq: Freq = Freq.day
+    ) -> HistoricalMetadata | None:
+        result, _ = self._request(
+            "get_historical_metadata", symbol=symbol, freq=freq.name
+        )
+        if result is None:
+            return None
+        return HistoricalMetadataSerializer().load(result)
+
+    def get_latest_dt(self, symbol: str, freq: Freq) -> datetime | None:
+        result, _ = self._request("get_latest_dt", symbol=symbol, freq=freq.name)
+        return pd.Timestamp(result) if result is not None else None
+
+    def has(self, symbol: str, freq: Freq = Freq.day) -> bool:
+        result, _ = self._request("has", symbol=symbol, freq=freq.name)
+        return result
+
+    def has_freq(self, symbol: str, freq: Freq) -> bool:
+        result, _ = self._request("has_freq", symbol=symbol, freq=freq.name)
+        return result
+
+    def symbols(self, freq: Freq | None = None) -> list[str]:
+        result, _ = self._request("symbols", freq=freq.name if freq else None)
+        return result
+
+    def close(self) -> None:
+        sock = self._socket(connect=False)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _request(self, method: str, **kwargs) -> tuple[t.Any, list[pd.DataFrame]]:
+        sock = self._socket()
+        try:
+            _send_frame(sock, json.dumps(dict(method=method, kwargs=kwargs)).encode())
+            header = json.loads(_recv_frame(sock))
+            buffers = [_recv_frame(sock) for _ in range(header["frames"])]
+        except BaseException:
+            # the connection is in an unknown state
+            self.close()
+            raise
+
+        if "error" in header:
+            # re-raise the builtin exceptions raised by the store (e.g. ValueError)
+            error_type = getattr(builtins, header["type"], None)
+            if isinstance(error_type, type) and issubclass(error_type, Exception):
+                raise error_type(header["error"])
+            raise RemoteError(f"{header['type']}: {header['error']}")
+        return header["result"], [self._to_pandas(buffer) for buffer in buffers]
+
+    def _to_pandas(self, buffer: bytearray) -> pd.DataFrame:
+        pa = _import_pyarrow()
+        table = pa.ipc.open_stream(pa.py_buffer(buffer)).read_all()
+        return table.to_pandas(split_blocks=True) if self.zero_copy else table.to_pandas()
+
+    def _socket(self, connect: bool = True) -> socket.socket | None:
+        # connections are not shared with forked processes
+        sock, pid = getattr(self._local, "sock", None), getattr(self._local, "pid", None)
+        if sock is not None and pid == os.getpid():
+            return sock
+        if not connect:
+            return None
+        sock = socket.socket(socket.AF_UNIX)
+        sock.connect(self.socket_path)
+        self._local.sock, self._local.pid = sock, os.getpid()
+        return sock
+
+
+class RemoteError(Exception):
+    """
+    An error raised by the server while handling a request.
+    """
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    server: StoreServer
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request = json.loads(_recv_frame(self.request))
+            except (ConnectionError, EOFError):
+                return
+
+            try:
+                result, frames = _call(self.server.store, **request)
+                header = dict(result=result, frames=len(frames))
+            except Exception as e:
+                header, frames = dict(error=str(e), type=type(e).__name__, frames=0), []
+
+            _send_frame(self.request, json.dumps(header).encode())
+            for df in frames:
+                _send_frame(self.request, _to_arrow(df))
+
+
+def _call(store: Store, method: str, kwargs: dict) -> tuple[t.Any, list[pd.DataFrame]]:
+    if kwargs.get("freq") is not None:
+        kwargs["freq"] = Freq[kwargs["freq"]]
+
+    if method == "get":
+        df = store.get(**kwargs)
+        return None, [df] if df is not None else []
+    elif method == "get_many":
+        data = store.get_many(**kwargs)
+        return list(data), list(data.values())
+    elif method == "get_company_details":
+        details = store.get_company_details(**kwargs)
+        return CompanyDetailsSerializer().dump(details) if details else None, []
+    elif method == "get_splits":
+        return SplitSerializer(many=True).dump(store.get_splits(**kwargs)), []
+    elif method == "get_historical_metadata":
+        metadata = store.get_historical_metadata(**kwargs)
+        return HistoricalMetadataSerializer().dump(metadata) if metadata else None, []
+    elif method == "get_latest_dt":
+        dt = store.get_latest_dt(**kwargs)
+        return dt.isoformat() if dt is not None else None, []
+    elif method in {"has", "has_freq", "symbols"}:
+        return getattr(store, method)(**kwargs), []
+    raise ValueError(f"Unknown method {method!r}")
+
+
+def _to_arrow(df: pd.DataFrame):
+    pa = _import_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _send_frame(sock: socket.socket, data) -> None:
+    data = memoryview(data)
+    sock.sendall(_LENGTH.pack(data.nbytes))
+    sock.sendall(data)
+
+
+def _recv_frame(sock: socket.socket) -> bytearray:
+    (length,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    return _recv_exactly(sock, length)
+
+
+def _recv_exactly(sock: socket.socket, length: int) -> bytearray:
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    while view:
+        num_bytes = sock.recv_into(view)
+        if not num_bytes:
+            raise EOFError("The connection was closed")
+        view = view[num_bytes:]
+    return buffer
+
+
+def _isoformat(dt: DateType | str | None) -> str | None:
+    return dt.isoformat() if hasattr(dt, "isoformat") else dt
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError(
+            "The store server requires pyarrow: `pip install pyarrow`"
+        ) from e
+    return pa
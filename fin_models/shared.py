@@ -0,0 +1,227 @@
+"""
+Share the bars of a universe of symbols between worker processes, loading them from
+the store once into shared memory instead of in every worker.
+
+The bars of all symbols are concatenated into a few shared memory blocks: one for
+the timestamps, and one ``[column, bar]`` matrix per dtype. Workers attach to the
+blocks by name and get DataFrames which are (read-only) views of them.
+"""
+
+from __future__ import annotations
+
+import sys
+import typing as t
+import uuid
+
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from fin_models.date_utils import DateType
+from fin_models.enums import Freq
+
+
+if t.TYPE_CHECKING:
+    from fin_models.store import Store
+
+
+@dataclass(frozen=True)
+class UniverseSpec:
+    """
+    What workers need to attach to a :class:`SharedUniverse`: the names of its
+    shared memory blocks and how the bars are laid out in them.
+    """
+
+    name: str
+    symbols: tuple[str, ...]
+    # the bars of ``symbols[i]`` are ``offsets[i]:offsets[i + 1]``
+    offsets: tuple[int, ...]
+    # the dtype and columns of each ``[column, bar]`` matrix
+    blocks: tuple[tuple[str, tuple[str, ...]], ...]
+    columns: tuple[str, ...]
+    tz: str | None
+    index_name: str | None
+
+    @property
+    def num_bars(self) -> int:
+        return self.offsets[-1]
+
+    def block_name(self, i: int | None = None) -> str:
+        return f"{self.name}-index" if i is None else f"{self.name}-{i}"
+
+
+class SharedUniverse:
+    """
+    The bars of many symbols in shared memory (see :meth:`create`), which processes
+    attach to with :meth:`attach` (or by unpickling it, e.g. when passed as an
+    argument to a ``multiprocessing`` or joblib worker).
+
+    The process which created the universe owns the shared memory, which is freed
+    when it is closed (e.g. on leaving its ``with`` block). On Python < 3.13, only
+    processes started by the owner (which share its resource tracker) should attach,
+    or else the memory is freed when they exit.
+    """
+
+    def __init__(self, spec: UniverseSpec, owner: bool = False):
+        self.spec = spec
+        self._owner = owner
+        self._positions = {symbol: i for i, symbol in enumerate(spec.symbols)}
+        self._memory = [
+            _shared_memory(spec.block_name(i), create=owner, size=size)
+            for i, size in [
+                (None, spec.num_bars * 8),
+                *(
+                    (i, spec.num_bars * len(columns) * np.dtype(dtype).itemsize)
+                    for i, (dtype, columns) in enumerate(spec.blocks)
+                ),
+            ]
+        ]
+        self._index = _view(self._memory[0], np.int64, (spec.num_bars,), owner)
+        self._blocks = [
+            _view(memory, dtype, (len(columns), spec.num_bars), owner)
+            for memory, (dtype, columns) in zip(self._memory[1:], spec.blocks)
+        ]
+
+    @classmethod
+    def create(
+        cls,
+        store: Store,
+        symbols: t.Iterable[str] | None = None,
+        freq: Freq = Freq.day,
+        columns=("Open", "High", "Low", "Close", "Volume"),
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+    ) -> SharedUniverse:
+        """
+        Load the bars of all (or the given) symbols from `store` into shared memory.
+        """
+        symbols = store.symbols(freq) if symbols is None else list(symbols)
+        data = store.get_many(symbols, freq, columns, start=start, end=end)
+        frames = list(data.values())
+
+        dtypes = {
+            column: np.result_type(*(df[column].dtype for df in frames))
+            if frames
+            else np.dtype(np.float64)
+            for column in columns
+        }
+        blocks: dict[str, list[str]] = {}
+        for column, dtype in dtypes.items():
+            blocks.setdefault(dtype.str, []).append(column)
+
+        index = frames[0].index if frames else pd.DatetimeIndex([])
+        spec = UniverseSpec(
+            name=f"fin-{uuid.uuid4().hex[:12]}",
+            symbols=tuple(data),
+            offsets=tuple(np.cumsum([0, *(len(df) for df in frames)]).tolist()),
+            blocks=tuple((dtype, tuple(names)) for dtype, names in blocks.items()),
+            columns=tuple(columns),
+            tz=str(index.tz) if index.tz is not None else None,
+            index_name=index.name,
+        )
+
+        universe = cls(spec, owner=True)
+        try:
+            for df, lo, hi in zip(frames, spec.offsets, spec.offsets[1:]):
+                universe._index[lo:hi] = df.index.as_unit("ns").asi8
+                for block, (_, names) in zip(universe._blocks, spec.blocks):
+                    for i, column in enumerate(names):
+                        block[i, lo:hi] = df[column].to_numpy()
+        except BaseException:
+            universe.close()
+            raise
+        for array in [universe._index, *universe._blocks]:
+            array.flags.writeable = False
+        _attached[spec.name] = universe
+        return universe
+
+    @classmethod
+    def attach(cls, spec: UniverseSpec) -> SharedUniverse:
+        """
+        Attach to the universe described by `spec` (once per process).
+        """
+        universe = _attached.get(spec.name)
+        if universe is None:
+            universe = _attached[spec.name] = cls(spec)
+        return universe
+
+    def __reduce__(self):
+        return SharedUniverse.attach, (self.spec,)
+
+    def __enter__(self) -> SharedUniverse:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._positions
+
+    def __len__(self) -> int:
+        return len(self.spec.symbols)
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self.spec.symbols)
+
+    def get(self, symbol: str) -> pd.DataFrame | None:
+        """
+        Returns the bars of `symbol` (or None), as a read-only view of the shared
+        memory (only the index is copied).
+        """
+        i = self._positions.get(symbol.upper())
+        if i is None:
+            return None
+
+        lo, hi = self.spec.offsets[i], self.spec.offsets[i + 1]
+        index = pd.DatetimeIndex(
+            self._index[lo:hi].view("M8[ns]"), name=self.spec.index_name
+        )
+        if self.spec.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.spec.tz)
+        df = pd.concat(
+            [
+                pd.DataFrame(block[:, lo:hi].T, index=index, columns=names, copy=False)
+                for block, (_, names) in zip(self._blocks, self.spec.blocks)
+            ],
+            axis=1,
+            copy=False,
+        )
+        if tuple(df.columns) != self.spec.columns:
+            df = df[list(self.spec.columns)]  # (copies) when the dtypes are interleaved
+        return df
+
+    def close(self) -> None:
+        """
+        Detach from the shared memory, freeing it if this process created it. The
+        DataFrames returned by :meth:`get` must be deleted first.
+        """
+        _attached.pop(self.spec.name, None)
+        self._index = None
+        self._blocks = []
+        memory = self._memory
+        self._memory = []
+        for block in memory:
+            if self._owner:
+                block.unlink()
+            block.close()
+
+
+# the universes attached to by this process (see `SharedUniverse.attach`)
+_attached: dict[str, SharedUniverse] = {}
+
+
+def _shared_memory(name: str, create: bool, size: int) -> SharedMemory:
+    # zero-sized shared memory is not supported
+    size = max(size, 1)
+    if create or sys.version_info < (3, 13):
+        return SharedMemory(name, create=create, size=size if create else 0)
+    return SharedMemory(name, track=False)
+
+
+def _view(memory: SharedMemory, dtype, shape: tuple[int, ...], writable: bool):
+    array = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+    array.flags.writeable = writable
+    return array
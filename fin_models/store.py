@@ -1,57 +1,492 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import json
 import os
 import shutil
+import typing as t
+import uuid
+import weakref
 
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
 
+import numpy as np
 import pandas as pd
 
+from fin_models.aggregation import (
+    RESAMPLE_COLUMNS,
+    IncrementalAggregator,
+    aggregate,
+    get_origins,
+)
+from fin_models.backends import Backend, get_backend, slice_range, tail
+from fin_models.cache import LRUCache
+from fin_models.catalog import Catalog
+from fin_models.compact import PRICE_COLUMNS, compact
 from fin_models.config import Config
-from fin_models.dataclasses import CompanyDetails, HistoricalMetadata
+from fin_models.dataclasses import CompanyDetails, HistoricalMetadata, Split
+from fin_models.date_utils import EASTERN_TZ, DateType
+from fin_models.dense import DenseDailyMatrices
 from fin_models.enums import Freq
+from fin_models.file_utils import (
+    FileLocks,
+    atomic_open,
+    hold_shared_lock,
+    try_lock_exclusive,
+)
+from fin_models.instrumentation import InstrumentedBackend, Observer, StoreStats
 from fin_models.serializers import (
     CompanyDetailsSerializer,
     HistoricalMetadataSerializer,
+    SplitSerializer,
 )
 
 
-RESAMPLE_COLUMNS = {
-    "Open": "first",
-    "High": "max",
-    "Low": "min",
-    "Close": "last",
-    "Volume": "sum",
+LAYOUTS = ("single", "monthly")
+
+PROFILES = ("default", "compact")
+
+# the on-disk format of a store, which can be saved in its root directory
+SETTINGS_FILENAME = "store.json"
+DEFAULT_SETTINGS = {
+    "backend": "pickle",
+    "layout": "single",
+    "profile": "default",
+    "compression": "default",
+    "compression_level": None,
+    # whether the historical metadata is in the catalog (instead of JSON files)
+    "catalog": False,
+}
+
+SNAPSHOTS_DIR = ".snapshots"
+
+# the approximate number of minutes in a bar of each frequency (in extended hours
+# trading, for intraday bars), used to estimate how many source bars to read for
+# ``last_n`` aggregated bars
+_FREQ_MINUTES = {
+    Freq.min_1: 1,
+    Freq.min_2: 2,
+    Freq.min_5: 5,
+    Freq.min_10: 10,
+    Freq.min_15: 15,
+    Freq.min_30: 30,
+    Freq.hour: 60,
+    Freq.day: 960,
+    Freq.week: 960 * 5,
+    Freq.month: 960 * 21,
+    Freq.quarter: 960 * 63,
+    Freq.year: 960 * 252,
 }
 
 
 class Store:
     # FIXME: take parametrized data vendor and trading calendar?
-    def __init__(self, _root_dir: str | None = None):
-        self._root_dir = _root_dir or os.path.join(Config.DATA_DIR, "symbol-data")
-        os.makedirs(self._root_dir, exist_ok=True)
+    def __init__(
+        self,
+        _root_dir: str | None = None,
+        backend: Backend | str | None = None,
+        layout: str | None = None,
+        cache_size: int = 0,
+        materialize: t.Iterable[Freq] = (),
+        catalog: bool | None = None,
+        dense: bool = False,
+        profile: str | None = None,
+        read_only: bool = False,
+        io_workers: int = 4,
+        stats: bool = False,
+        observer: Observer | None = None,
+        compression: str | None = None,
+        compression_level: int | None = None,
+    ):
+        """
+        :param backend: The on-disk file format, either "pickle" (the default) or
+            "parquet" (columnar, reads only the requested columns and date range).
+        :param layout: Either "single" (the default, one file per symbol and frequency)
+            or "monthly" (intraday frequencies are partitioned into one file per
+            calendar month, so appends only rewrite the partitions they touch).
+        :param cache_size: The memory budget, in bytes, of an in-process LRU cache for
+            the results of :meth:`get` (disabled by default). Entries are invalidated
+            when the underlying files are modified.
+        :param materialize: Frequencies to persist to disk the first time they are
+            aggregated from a finer source frequency (e.g. ``[Freq.min_5, Freq.week]``).
+            Later requests read the persisted bars until the source data changes.
+        :param catalog: Whether to keep the historical metadata for all symbols in a
+            single SQLite catalog (``catalog.sqlite`` in the root directory) instead of
+            per-symbol JSON files. Existing stores are cataloged on first use, after
+            which every store on the root directory uses the catalog (by default,
+            whether it is cataloged is saved in ``store.json``).
+        :param dense: Whether to maintain memory-mapped ``[symbol, trading day]``
+            matrices of the daily bars (in ``.dense`` in the root directory) for fast
+            cross-sectional reads with :meth:`cross_section`.
+        :param profile: Either "default" (bars are stored as written) or "compact"
+            (bars are written, and aggregated, with float32 prices and uint32 volume
+            whenever that is lossless; see :func:`fin_models.compact.compact`).
+
+            The `backend`, `layout`, `profile` and `compression` default to the
+            settings saved in ``store.json`` in the root directory (see
+            :func:`save_settings`, e.g. by ``fin store migrate``), if any.
+        :param read_only: Whether to open the store without side effects: nothing is
+            created or written on disk (writes raise an error), and which symbols and
+            frequencies exist is read once into a snapshot (see :meth:`refresh`)
+            instead of being checked on the filesystem for every lookup.
+        :param io_workers: The number of threads reading and writing files for the
+            asynchronous methods (:meth:`aget`, :meth:`awrite`, ...), started on
+            first use.
+        :param stats: Whether to count the calls to, and time, the operations of the
+            store (see :meth:`stats`). Stores are not instrumented by default, at no
+            cost.
+        :param observer: A function to call with the name, duration (in seconds) and
+            counters of each instrumented operation (implies `stats`).
+        :param compression: The codec to compress written files with: "lz4" or "zstd"
+            (which require the ``lz4`` or ``zstandard`` packages), "none", or "default"
+            (uncompressed pickles, or the default codec of parquet). Files written with
+            any codec can be read.
+        :param compression_level: The codec's compression level (by default, the
+            codec's default level).
+        """
+        self._root_dir = _root_dir or Config.SYMBOL_DATA_DIR
+        settings = {**DEFAULT_SETTINGS, **read_settings(self._root_dir)}
+        backend = backend if backend is not None else settings["backend"]
+        layout = layout if layout is not None else settings["layout"]
+        profile = profile if profile is not None else settings["profile"]
+        if compression is None:
+            compression = settings["compression"]
+            if compression_level is None:
+                # (the saved level is only meant for the saved codec)
+                compression_level = settings["compression_level"]
+        catalog_path = os.path.join(self._root_dir, "catalog.sqlite")
+        # (stores cataloged before the setting was saved have only the catalog file)
+        is_cataloged = settings["catalog"] or os.path.exists(catalog_path)
+        if catalog is None:
+            catalog = is_cataloged
+        elif is_cataloged and not catalog:
+            raise ValueError(
+                f"The store {self._root_dir!r} keeps its metadata in a catalog"
+                " (its JSON metadata is not up to date)."
+            )
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout {layout!r} (expected one of {LAYOUTS})")
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile!r} (expected one of {PROFILES})")
+
+        self._backend = get_backend(backend, compression, compression_level)
+        self._layout = layout
+        self._cache = LRUCache(cache_size) if cache_size else None
+        self._materialize = frozenset(materialize)
+        self._profile = profile
+        self._read_only = read_only
+        self._listing: dict[str, frozenset[Freq]] | None = None
+        self._snapshot_lock: weakref.finalize | None = None
+        self._write_hooks: list[t.Callable[[str, Freq, pd.DataFrame], None]] = []
+        self._io_workers = io_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: dict[str, asyncio.Task] = {}
+        self._stats = None
+        if stats or observer is not None:
+            self._instrument(StoreStats(observer))
+        if not read_only:
+            os.makedirs(self._root_dir, exist_ok=True)
+        self._locks = FileLocks(os.path.join(self._root_dir, ".locks"), read_only)
+
+        self._catalog = None
+        if catalog:
+            is_new = not os.path.exists(catalog_path)
+            if is_new and read_only:
+                raise RuntimeError(f"The catalog {catalog_path!r} does not exist.")
+            self._catalog = Catalog(catalog_path, read_only)
+            if is_new:
+                self.rebuild_catalog()
+            if not settings["catalog"] and not read_only:
+                # so that stores opened without `catalog` do not read (or write) the
+                # JSON metadata, which is no longer updated
+                save_settings(
+                    self._root_dir, {**read_settings(self._root_dir), "catalog": True}
+                )
+
+        self._dense = None
+        if dense:
+            dense_dir = os.path.join(self._root_dir, ".dense")
+            is_new = not os.path.exists(dense_dir)
+            if is_new and read_only:
+                raise RuntimeError(f"The dense matrices {dense_dir!r} do not exist.")
+            self._dense = DenseDailyMatrices(dense_dir, read_only=read_only)
+            if is_new:
+                self.rebuild_dense()
+
+    def __enter__(self) -> Store:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release a snapshot (see :meth:`snapshot`), so that it can be garbage collected,
+        and shut down the I/O threads once the running asynchronous reads and writes
+        finish. Those queued behind them (for the same symbol) then fail: use
+        :meth:`aclose` to wait for them too.
+        """
+        if self._snapshot_lock is not None:
+            self._snapshot_lock()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def aclose(self) -> None:
+        """
+        Like :meth:`close`, but first wait for every pending asynchronous read and
+        write (including those started while waiting).
+        """
+        while pending := [task for task in self._pending.values() if not task.done()]:
+            await asyncio.wait(pending)
+        self.close()
+
+    def stats(self, reset: bool = False) -> dict:
+        """
+        Returns the number of calls to (``calls``) and the total duration in seconds
+        of (``seconds``) each instrumented operation: ``get``, ``agg``, ``write``,
+        ``write_metadata``, ``source_freq`` (finding which stored frequency to read
+        for a :meth:`get`), and ``read_file``/``write_file``/``append_file``. Also
+        returns the bytes read and written (see
+        :class:`~fin_models.instrumentation.InstrumentedBackend`), the rows returned
+        by :meth:`get`, the stored frequencies probed by ``source_freq``
+        (``source_freq_probes``), and the hits and misses of the cache (if any).
+
+        Optionally reset the counters after reading them.
+        """
+        if self._stats is None:
+            raise RuntimeError("This store was not created with `stats=True`.")
+        stats = self._stats.to_dict()
+        if self._cache is not None:
+            stats.update(cache_hits=self._cache.hits, cache_misses=self._cache.misses)
+        if reset:
+            self._stats.reset()
+        return stats
+
+    def _instrument(self, stats: StoreStats) -> None:
+        """
+        Replace the instrumented methods (and backend) of this store with wrappers
+        recording their calls in `stats`.
+        """
+        self._stats = stats
+        self._backend = InstrumentedBackend(self._backend, stats)
+        self.get = stats.timed("get", self.get, _count_rows)
+        self.agg = stats.timed("agg", self.agg)
+        self.write = stats.timed("write", self.write)
+        self._write_historical_metadata = stats.timed(
+            "write_metadata", self._write_historical_metadata
+        )
+        find_source_freq = stats.timed(
+            "source_freq",
+            self._find_source_freq,
+            lambda result: {"source_freq_probes": result[1]},
+        )
+        self._get_source_freq = lambda symbol, freq: find_source_freq(symbol, freq)[0]
+
+    @property
+    def settings(self) -> dict[str, t.Any]:
+        """
+        The on-disk format of the store (its backend, layout, profile and compression).
+        """
+        return {
+            "backend": self._backend.name,
+            "layout": self._layout,
+            "profile": self._profile,
+            "compression": self._backend.compression,
+            "compression_level": self._backend.compression_level,
+        }
 
     def get(
         self,
         symbol: str,
         freq: Freq = Freq.day,
         columns=("Open", "High", "Low", "Close", "Volume"),
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+        last_n: int | None = None,
     ) -> pd.DataFrame | None:
         """
-        Return all historical data for the given symbol at the requested frequency.
+        Return historical data for the given symbol at the requested frequency.
+
+        Optionally limit the returned bars to those between `start` and `end`
+        (inclusive), and/or to the last `last_n` bars. Naive datetimes are assumed to
+        be America/New_York, and an `end` date (without a time) includes all bars on
+        that date. Bars outside of the requested window are not read from disk
+        (except for the partial chunks, row groups or partitions it overlaps).
         """
-        source_freq = self._get_source_freq(symbol, freq)
-        if not source_freq:
-            return None
+        start, end = _to_bounds(start, end)
+        _validate_last_n(last_n)
+        with self._locks.shared(symbol.upper()):
+            source_freq = self._get_source_freq(symbol, freq)
+            if not source_freq:
+                return None
+
+            if self._cache is None:
+                return self._get(symbol, source_freq, freq, columns, start, end, last_n)
+
+            key = (symbol.upper(), source_freq, freq, tuple(columns), start, end, last_n)
+            version = self._version(symbol, source_freq)
+            df = self._cache.get(key, version)
+            if df is None:
+                df = self._get(symbol, source_freq, freq, columns, start, end, last_n)
+                if df is None:
+                    return None
+                self._cache.put(key, version, df)
+            return df.copy()
+
+    def _get(
+        self,
+        symbol: str,
+        source_freq: Freq,
+        freq: Freq,
+        columns: t.Sequence[str],
+        start: pd.Timestamp | None,
+        end: pd.Timestamp | None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame | None:
+        if source_freq != freq and freq in self._materialize:
+            return self._get_materialized(
+                symbol, source_freq, freq, columns, start, end, last_n
+            )
+
+        if source_freq == freq:
+            df = self._read(
+                symbol, source_freq, columns=columns, start=start, end=end, last_n=last_n
+            )
+        elif last_n is not None and _is_suffix_stable(freq):
+            df = _agg_last_n(
+                lambda n: self._read(
+                    symbol, source_freq, columns=columns, start=start, end=end, last_n=n
+                ),
+                source_freq,
+                freq,
+                last_n,
+            )
+        else:
+            df = self._read(symbol, source_freq, columns=columns, start=start, end=end)
+            df = tail(self.agg(df, freq), last_n)
 
-        df = pd.read_pickle(self._path(symbol, source_freq))
         if df.empty:
             return None
+        return df if source_freq == freq else self._compact(df)
 
-        df = df[list(columns)]
-        if source_freq == freq or df.empty:
-            return df
-        return self.agg(df, freq)
+    def _get_materialized(
+        self,
+        symbol: str,
+        source_freq: Freq,
+        freq: Freq,
+        columns: t.Sequence[str],
+        start: pd.Timestamp | None,
+        end: pd.Timestamp | None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame | None:
+        """
+        Read aggregated bars persisted to disk, (re)materializing them first if they
+        are missing or the source data has changed since they were written.
+        """
+        filepath = self._derived_path(symbol, freq)
+        source_version = [source_freq.value, *self._version(symbol, source_freq)]
+        if self._derived_source_version(symbol, freq) == source_version:
+            df = self._backend.read(
+                filepath, columns=columns, start=start, end=end, last_n=last_n
+            )
+        else:
+            source_df = self._read(symbol, source_freq, RESAMPLE_COLUMNS)
+            df = self._compact(self.agg(source_df, freq))
+            if not self._read_only:
+                _makedirs(filepath)
+                self._backend.write(filepath, df)
+                self._write_derived_metadata(
+                    symbol, freq, source_version, get_origins(source_df, freq)
+                )
+            df = tail(slice_range(df[list(columns)], start, end), last_n)
+        return None if df.empty else df
+
+    def get_many(
+        self,
+        symbols: t.Iterable[str],
+        freq: Freq = Freq.day,
+        columns=("Open", "High", "Low", "Close", "Volume"),
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+        last_n: int | None = None,
+        panel: bool = False,
+        max_workers: int | None = None,
+    ) -> dict[str, pd.DataFrame] | pd.DataFrame:
+        """
+        Return historical data for many symbols, reading files concurrently.
+
+        By default returns a dictionary of symbol to DataFrame (symbols without data
+        are omitted). If `panel` is true, returns a single wide DataFrame with
+        ``(symbol, column)`` MultiIndex columns aligned on a common DatetimeIndex.
+        """
+        symbols = list(symbols)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = executor.map(
+                lambda symbol: self.get(
+                    symbol, freq, columns, start=start, end=end, last_n=last_n
+                ),
+                symbols,
+            )
+            data = {symbol: df for symbol, df in zip(symbols, frames) if df is not None}
+
+        return _to_panel(data, columns) if panel else data
+
+    async def aget(
+        self,
+        symbol: str,
+        freq: Freq = Freq.day,
+        columns=("Open", "High", "Low", "Close", "Volume"),
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame | None:
+        """
+        Like :meth:`get`, but reads on the store's I/O threads instead of blocking the
+        event loop. Asynchronous reads and writes of the same symbol run one at a
+        time, in the order they were started (so a read observes the writes started
+        before it).
+        """
+        return await self._run_in_executor(
+            symbol, self.get, symbol, freq, columns, start, end, last_n
+        )
+
+    async def aget_many(
+        self,
+        symbols: t.Iterable[str],
+        freq: Freq = Freq.day,
+        columns=("Open", "High", "Low", "Close", "Volume"),
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+        last_n: int | None = None,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Like :meth:`get_many` (without `panel`), but reads with :meth:`aget`.
+        """
+        symbols = list(symbols)
+        frames = await asyncio.gather(
+            *(self.aget(symbol, freq, columns, start, end, last_n) for symbol in symbols)
+        )
+        return {symbol: df for symbol, df in zip(symbols, frames) if df is not None}
+
+    def cross_section(
+        self,
+        column: str = "Close",
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+        symbols: t.Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Return a DataFrame of trading dates by symbol of the daily `column` values for
+        all (or the given) symbols, read from the memory-mapped dense matrices.
+
+        Missing prices are NaN (and missing volumes are 0).
+        """
+        if self._dense is None:
+            raise RuntimeError("This store was not created with `dense=True`.")
+        return self._dense.get(column, start=start, end=end, symbols=symbols)
 
     def get_company_details(self, symbol: str) -> CompanyDetails | None:
         filepath = self._company_details_path(symbol)
@@ -61,9 +496,24 @@ class Store:
         with open(filepath) as f:
             return CompanyDetailsSerializer().loads(f.read())
 
+    def get_splits(self, symbol: str) -> list[Split]:
+        """
+        Returns the splits which the stored bars of `symbol` were adjusted for with
+        :meth:`apply_split`.
+        """
+        filepath = self._splits_path(symbol)
+        if not os.path.exists(filepath):
+            return []
+
+        with open(filepath) as f:
+            return SplitSerializer(many=True).loads(f.read())
+
     def get_historical_metadata(
         self, symbol: str, freq: Freq
     ) -> HistoricalMetadata | None:
+        if self._catalog is not None:
+            return self._catalog.get(symbol, freq)
+
         filepath = self._historical_metadata_path(symbol, freq)
         if not os.path.exists(filepath):
             return None
@@ -87,12 +537,25 @@ class Store:
         """
         Returns true if we have data for the given symbol and exact frequency.
         """
+        if self._catalog is not None:
+            return self._catalog.has(symbol, freq)
+        if self._read_only:
+            return freq in self._get_listing().get(symbol.upper(), ())
         return os.path.exists(self._path(symbol, freq))
 
     def symbols(self, freq: Freq | None = None) -> list[str]:
         """
         Get a list of all ticker symbols in the store.
         """
+        if self._catalog is not None:
+            return self._catalog.symbols(freq)
+        if self._read_only:
+            return sorted(
+                symbol
+                for symbol, freqs in self._get_listing().items()
+                if freq is None or freq in freqs
+            )
+
         return list(
             sorted(
                 {
@@ -107,70 +570,644 @@ class Store:
             )
         )
 
+    def refresh(self) -> None:
+        """
+        Re-read which symbols and frequencies exist on disk (for read-only stores,
+        which otherwise keep using the snapshot taken on first use).
+        """
+        self._listing = None
+
+    def _get_listing(self) -> dict[str, frozenset[Freq]]:
+        """
+        Returns the (cached) frequencies stored for each symbol directory.
+        """
+        if self._listing is not None:
+            return self._listing
+
+        filenames = {
+            self._freq_filename(freq)
+            if self._is_partitioned(freq)
+            else f"{self._freq_filename(freq)}.{self._backend.extension}": freq
+            for freq in Freq
+        }
+        listing = {}
+        if os.path.isdir(self._root_dir):
+            for dir_entry in os.scandir(self._root_dir):
+                if dir_entry.is_dir() and not dir_entry.name.startswith("."):
+                    listing[dir_entry.name] = frozenset(
+                        filenames[entry.name]
+                        for entry in os.scandir(dir_entry.path)
+                        if entry.name in filenames
+                    )
+        self._listing = listing
+        return listing
+
+    def snapshot(self) -> Store:
+        """
+        Returns a read-only store of the data as of now, which is not affected by (and
+        never blocks) later writes::
+
+            with store.snapshot() as snapshot:
+                data = snapshot.get_many(symbols)
+
+        Files in the store are never modified in place (see
+        :func:`~fin_models.file_utils.atomic_open`), so snapshots hard link them
+        instead of copying them: taking one is proportional to the number of files,
+        and only uses disk space for the files later replaced or deleted in the
+        store. Each symbol is linked while holding its lock, so its data and metadata
+        are consistent, but a snapshot taken during a sync may include the newly
+        written bars for some symbols and not others. The dense matrices are not
+        included.
+
+        Snapshots are deleted by :meth:`gc_snapshots` (which every :meth:`snapshot`
+        runs first) once they are no longer in use: after they are closed, garbage
+        collected, or the process which took them exits.
+        """
+        self._ensure_writable()
+        self.gc_snapshots()
+
+        snapshots_dir = os.path.join(self._root_dir, SNAPSHOTS_DIR)
+        os.makedirs(snapshots_dir, exist_ok=True)
+        name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        lock_fd = hold_shared_lock(os.path.join(snapshots_dir, f"{name}.lock"))
+        try:
+            tmp_dir = os.path.join(snapshots_dir, f".{name}.tmp")
+            self._link_snapshot(tmp_dir)
+            snapshot_dir = os.path.join(snapshots_dir, name)
+            os.rename(tmp_dir, snapshot_dir)
+            snapshot = Store(
+                snapshot_dir,
+                backend=self._backend,
+                layout=self._layout,
+                materialize=self._materialize,
+                catalog=self._catalog is not None,
+                profile=self._profile,
+                read_only=True,
+            )
+        except BaseException:
+            os.close(lock_fd)
+            raise
+        snapshot._snapshot_lock = weakref.finalize(snapshot, os.close, lock_fd)
+        return snapshot
+
+    def _link_snapshot(self, snapshot_dir: str) -> None:
+        os.makedirs(snapshot_dir)
+        settings_path = os.path.join(self._root_dir, SETTINGS_FILENAME)
+        if os.path.exists(settings_path):
+            _link(settings_path, os.path.join(snapshot_dir, SETTINGS_FILENAME))
+
+        metadata = []
+        for dir_entry in os.scandir(self._root_dir):
+            if not dir_entry.is_dir() or dir_entry.name.startswith("."):
+                continue
+            symbol = dir_entry.name
+            with self._locks.shared(symbol):
+                shutil.copytree(
+                    dir_entry.path,
+                    os.path.join(snapshot_dir, symbol),
+                    copy_function=_link,
+                    ignore=shutil.ignore_patterns("*.tmp"),
+                )
+                if self._catalog is not None:
+                    metadata.extend(
+                        (symbol, self._catalog.get(symbol, freq))
+                        for freq in self._catalog.freqs(symbol)
+                    )
+
+        if self._catalog is not None:
+            Catalog(os.path.join(snapshot_dir, "catalog.sqlite")).put_many(metadata)
+
+    def gc_snapshots(self) -> int:
+        """
+        Delete the snapshots which are no longer in use. Returns how many were deleted.
+        """
+        self._ensure_writable()
+        snapshots_dir = os.path.join(self._root_dir, SNAPSHOTS_DIR)
+        if not os.path.isdir(snapshots_dir):
+            return 0
+
+        count = 0
+        for filename in os.listdir(snapshots_dir):
+            if not filename.endswith(".lock"):
+                continue
+            lock_path = os.path.join(snapshots_dir, filename)
+            fd = try_lock_exclusive(lock_path)
+            if fd is None:
+                continue
+            try:
+                name = filename[: -len(".lock")]
+                for dirname in [name, f".{name}.tmp"]:
+                    shutil.rmtree(
+                        os.path.join(snapshots_dir, dirname), ignore_errors=True
+                    )
+                os.remove(lock_path)
+                count += 1
+            finally:
+                os.close(fd)
+        return count
+
+    def rebuild_catalog(self) -> None:
+        """
+        Rebuild the catalog from the data (and any per-symbol metadata JSON) on disk.
+
+        The entries of each symbol are replaced while it is locked, so that the
+        catalog stays usable (and consistent with concurrent writes) meanwhile.
+        """
+        if self._catalog is None:
+            raise RuntimeError("This store was not created with `catalog=True`.")
+        self._ensure_writable()
+
+        symbols = set()
+        for dir_entry in os.scandir(self._root_dir):
+            if not dir_entry.is_dir() or dir_entry.name.startswith("."):
+                continue
+            symbol = dir_entry.name.upper()
+            symbols.add(symbol)
+            with self._locks.exclusive(symbol):
+                self._rebuild_catalog_entries(symbol)
+
+        for symbol in set(self._catalog.symbols()) - symbols:
+            with self._locks.exclusive(symbol):
+                self._catalog.delete(symbol)
+
+    def _rebuild_catalog_entries(self, symbol: str) -> None:
+        """
+        Replace the catalog entries of `symbol` with the metadata of its data on disk.
+        The caller must hold the symbol's lock.
+        """
+        freqs = set()
+        for freq in Freq:
+            filepath = self._path(symbol, freq)
+            if not os.path.exists(filepath):
+                continue
+
+            df = self._read(symbol, freq)
+            if df.empty:
+                continue
+
+            metadata_path = self._historical_metadata_path(symbol, freq)
+            if os.path.exists(metadata_path):
+                with open(metadata_path) as f:
+                    data = HistoricalMetadataSerializer().loads(f.read())
+                first_bar_utc = data.first_bar_utc
+            else:
+                first_bar_utc = df.index[0]
+            self._write_historical_metadata(
+                symbol,
+                freq,
+                df,
+                first_bar_utc,
+                num_rows=len(df),
+                num_bytes=_size(filepath, self._backend.extension),
+            )
+            freqs.add(freq)
+
+        for freq in self._catalog.freqs(symbol) - freqs:
+            self._catalog.delete(symbol, freq)
+
+    def rebuild_dense(self) -> None:
+        """
+        Write the daily bars for all symbols into the dense matrices.
+        """
+        if self._dense is None:
+            raise RuntimeError("This store was not created with `dense=True`.")
+        self._ensure_writable()
+
+        for symbol in self.symbols(Freq.day):
+            self._dense.update(symbol, self._read(symbol, Freq.day))
+
     def write(self, symbol: str, freq: Freq, bars: pd.DataFrame) -> pd.DataFrame:
         """
         Write or append bars to the store for a given symbol and frequency.
+
+        Bars strictly newer than the latest stored bar (per the historical metadata)
+        are appended without merging. Otherwise, overlapping bars are merged by keeping
+        the bar with the higher volume.
+
+        Returns the stored bars from the first to the last timestamp of `bars`, as
+        written (i.e. after merging them with the overlapping stored bars).
+
+        Files are replaced atomically, and the symbol is locked (across threads and
+        processes) while writing, so that concurrent :meth:`get` calls observe either
+        the data and metadata from before the write or from after it.
         """
+        self._ensure_writable()
         if bars.empty:
-            return self.get(symbol, freq)
+            return bars
+
+        with self._locks.exclusive(symbol.upper()):
+            if self._cache is not None:
+                self._cache.invalidate(symbol.upper())
+            if not bars.index.is_monotonic_increasing:
+                bars = bars.sort_index()
+            bars = self._compact(bars)
+
+            appendable = self._appendable_derived(symbol, freq, bars)
+            self._delete_derived(symbol, source_freq=freq, keep=appendable)
+            df = self._write_bars(symbol, freq, bars)
+            df = df.loc[bars.index[0] : bars.index[-1]]
+            self._append_derived(symbol, freq, bars, appendable)
+
+            if self._dense is not None and freq == Freq.day:
+                self._dense.update(symbol, df)
+            for hook in self._write_hooks:
+                hook(symbol, freq, bars)
+            return df
+
+    async def awrite(self, symbol: str, freq: Freq, bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Like :meth:`write`, but writes on the store's I/O threads instead of blocking
+        the event loop (see :meth:`aget`). The write completes even if the awaiting
+        task is cancelled.
+        """
+        self._ensure_writable()
+        return await self._run_in_executor(symbol, self.write, symbol, freq, bars)
+
+    async def awrite_many(
+        self, data: t.Mapping[str, pd.DataFrame], freq: Freq
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Write the bars of many symbols concurrently with :meth:`awrite`. Returns the
+        bars written for each symbol (see :meth:`write`).
+        """
+        frames = await asyncio.gather(
+            *(self.awrite(symbol, freq, bars) for symbol, bars in data.items())
+        )
+        return dict(zip(data, frames))
+
+    def _run_in_executor(
+        self, symbol: str, fn: t.Callable[..., t.Any], *args
+    ) -> asyncio.Future:
+        """
+        Call `fn` on the I/O threads once the calls made before it for the same
+        `symbol` have finished.
+        """
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self._io_workers, thread_name_prefix="store-io"
+            )
+        executor = self._executor
+        key = symbol.upper()
+        previous = self._pending.get(key)
+
+        async def run():
+            if previous is not None and not previous.done():
+                await asyncio.wait([previous])
+            return await loop.run_in_executor(executor, functools.partial(fn, *args))
+
+        def done(task: asyncio.Task) -> None:
+            if self._pending.get(key) is task:
+                del self._pending[key]
+
+        task = loop.create_task(run())
+        self._pending[key] = task
+        task.add_done_callback(done)
+        return asyncio.shield(task)
+
+    def add_write_hook(self, hook: t.Callable[[str, Freq, pd.DataFrame], None]) -> None:
+        """
+        Register a function to call with the symbol, frequency and (sorted) bars of
+        every :meth:`write`, after the bars are written but before the symbol is
+        unlocked (e.g. to keep aggregates of a live feed up to date with an
+        :class:`~fin_models.aggregation.IncrementalAggregator`).
+        """
+        self._write_hooks.append(hook)
+
+    def _appendable_derived(
+        self, symbol: str, freq: Freq, bars: pd.DataFrame
+    ) -> list[Freq]:
+        """
+        Returns the materialized frequencies which are up to date with the bars stored
+        at `freq` and can be updated incrementally, because `bars` are newer.
+        """
+        if not self._materialize or not self.has_freq(symbol, freq):
+            return []
+        if not _is_append(self.get_historical_metadata(symbol, freq), bars):
+            return []
+
+        source_version = [freq.value, *self._version(symbol, freq)]
+        appendable = []
+        for derived_freq in self._materialize:
+            metadata = self._derived_metadata(symbol, derived_freq)
+            if (
+                derived_freq > freq
+                and metadata is not None
+                and metadata["source_version"] == source_version
+                and "origins" in metadata
+            ):
+                appendable.append(derived_freq)
+        return appendable
+
+    def _append_derived(
+        self, symbol: str, freq: Freq, bars: pd.DataFrame, derived_freqs: list[Freq]
+    ) -> None:
+        """
+        Update materialized aggregates with newly appended bars, only aggregating the
+        new bars (and merging them into the latest aggregated bar).
+        """
+        source_version = [freq.value, *self._version(symbol, freq)]
+        for derived_freq in derived_freqs:
+            filepath = self._derived_path(symbol, derived_freq)
+            latest = self._backend.read(filepath, last_n=1)
+            aggregator = IncrementalAggregator(
+                derived_freq,
+                self._derived_metadata(symbol, derived_freq)["origins"],
+                latest,
+            )
+            updated = aggregator.update(bars[list(RESAMPLE_COLUMNS)])
+            if updated.empty:
+                pass
+            elif latest.empty or updated.index[0] > latest.index[-1]:
+                self._backend.append(filepath, self._compact(updated))
+            else:
+                df = self._backend.read(filepath)
+                df = pd.concat([df[df.index < updated.index[0]], updated])
+                self._backend.write(filepath, self._compact(df))
+            self._write_derived_metadata(
+                symbol, derived_freq, source_version, aggregator.origins
+            )
+
+    def _write_bars(self, symbol: str, freq: Freq, bars: pd.DataFrame) -> pd.DataFrame:
+        if self._is_partitioned(freq):
+            return self._write_partitions(symbol, freq, bars)
 
         if not self.has_freq(symbol, freq):
             self._write(symbol, freq, bars)
             return bars
 
-        old = self.get(symbol, freq)
-        index_intersection = old.index.intersection(bars.index, sort=True)
-        if index_intersection.empty:
-            new_df = pd.concat([old, bars])
-        else:
-            # merge overlapping timestamps by highest volume
-            existing = old.iloc[:old.index.get_loc(index_intersection[0])]  # fmt: skip
-            intersection_bars = []
-            for idx in index_intersection:
-                if bars.loc[idx]["Volume"] > old.loc[idx]["Volume"]:
-                    intersection_bars.append(bars.loc[idx])
-                else:
-                    intersection_bars.append(old.loc[idx])
-            intersection = pd.DataFrame(intersection_bars)
-            new = bars.iloc[bars.index.get_loc(index_intersection[-1]) + 1:]  # fmt: skip
-            new_df = pd.concat([existing, intersection, new])
+        historical_metadata = self.get_historical_metadata(symbol, freq)
+        if _is_append(historical_metadata, bars):
+            return self._append(symbol, freq, bars, historical_metadata)
 
+        new_df = self._compact(_merge_bars(self.get(symbol, freq), bars))
         self._write(symbol, freq, new_df)
         return new_df
 
     @staticmethod
-    def agg(df: pd.DataFrame, to_freq: Freq) -> pd.DataFrame:
-        if df.empty:
-            return df
+    def agg(
+        df: pd.DataFrame,
+        to_freq: Freq,
+        start: DateType | str | None = None,
+        end: DateType | str | None = None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Aggregate bars to the `to_freq` frequency.
 
-        # https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#offset-aliases
-        if to_freq < Freq.day:
-            agg_df = pd.concat(
-                [
-                    _agg(_premarket(df), to_freq),
-                    _agg(_openmarket(df), to_freq),
-                    _agg(_aftermarket(df), to_freq),
-                ]
-            ).sort_index()
-        else:
-            agg_df = _agg(df, to_freq)
-            if to_freq == Freq.week:
-                agg_df.index = agg_df.index - pd.Timedelta(days=6)
-        return agg_df
+        Optionally only aggregate the bars between `start` and `end` (inclusive), and/or
+        only return the last `last_n` aggregated bars. For weekly and longer
+        frequencies, only enough of the most recent bars in `df` to produce them are
+        aggregated.
+        """
+        if start is not None or end is not None:
+            df = slice_range(df, *_to_bounds(start, end))
+        _validate_last_n(last_n)
+        if last_n is not None:
+            if _is_suffix_stable(to_freq):
+                return _agg_last_n(lambda n: tail(df, n), None, to_freq, last_n)
+            return tail(Store.agg(df, to_freq), last_n)
+
+        return aggregate(df, to_freq)
+
+    def _compact(self, df: pd.DataFrame) -> pd.DataFrame:
+        return compact(df) if self._profile == "compact" else df
 
     def _write(self, symbol: str, freq: Freq, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty:
             return df
-        self._write_historical_metadata(symbol, freq, df)
-        df.to_pickle(self._path(symbol, freq))
+        filepath = self._path(symbol, freq)
+        _makedirs(filepath)
+        self._backend.write(filepath, df)
+        self._write_historical_metadata(
+            symbol, freq, df, num_rows=len(df), num_bytes=os.path.getsize(filepath)
+        )
         return df
 
+    def _append(
+        self,
+        symbol: str,
+        freq: Freq,
+        bars: pd.DataFrame,
+        historical_metadata: HistoricalMetadata,
+    ) -> pd.DataFrame:
+        filepath = self._path(symbol, freq)
+        bars = self._backend.append(filepath, bars)
+        num_rows = historical_metadata.num_rows
+        self._write_historical_metadata(
+            symbol,
+            freq,
+            bars,
+            historical_metadata.first_bar_utc,
+            num_rows=num_rows + len(bars) if num_rows is not None else None,
+            num_bytes=os.path.getsize(filepath),
+        )
+        return bars
+
+    def _write_partitions(
+        self, symbol: str, freq: Freq, bars: pd.DataFrame
+    ) -> pd.DataFrame:
+        existing_keys = self._partitions(symbol, freq)
+        historical_metadata = (
+            self.get_historical_metadata(symbol, freq) if existing_keys else None
+        )
+        is_append = _is_append(historical_metadata, bars)
+        os.makedirs(self._path(symbol, freq), exist_ok=True)
+
+        # keep running totals of the row count and size, if they are known
+        num_rows, num_bytes = (
+            (historical_metadata.num_rows, historical_metadata.num_bytes)
+            if historical_metadata
+            else (None, None)
+            if existing_keys
+            else (0, 0)
+        )
+
+        written = []
+        for key, partition in _partition_groups(bars):
+            filepath = self._partition_path(symbol, freq, key)
+            old_rows, old_bytes = 0, 0
+            if key not in existing_keys:
+                self._backend.write(filepath, partition)
+            elif is_append:
+                old_bytes = os.path.getsize(filepath)
+                partition = self._backend.append(filepath, partition)
+            else:
+                old_bytes = os.path.getsize(filepath)
+                old = self._backend.read(filepath)
+                old_rows = len(old)
+                partition = self._compact(_merge_bars(old, partition))
+                self._backend.write(filepath, partition)
+            written.append(partition)
+
+            if num_rows is not None:
+                num_rows += len(partition) - old_rows
+            if num_bytes is not None:
+                num_bytes += os.path.getsize(filepath) - old_bytes
+
+        # the latest bar only changes if the latest partition was (re)written
+        latest_key = max(key, existing_keys[-1]) if existing_keys else key
+        latest = (
+            written[-1]
+            if key == latest_key
+            else self._backend.read(self._partition_path(symbol, freq, latest_key))
+        )
+
+        first_bar_utc = written[0].index[0]
+        if historical_metadata and historical_metadata.first_bar_utc < first_bar_utc:
+            first_bar_utc = historical_metadata.first_bar_utc
+        self._write_historical_metadata(
+            symbol,
+            freq,
+            latest,
+            first_bar_utc,
+            num_rows=num_rows,
+            num_bytes=num_bytes,
+        )
+        return pd.concat(written)
+
+    def _read(
+        self,
+        symbol: str,
+        freq: Freq,
+        columns: t.Sequence[str] | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+        last_n: int | None = None,
+    ) -> pd.DataFrame:
+        if not self._is_partitioned(freq):
+            return self._backend.read(
+                self._path(symbol, freq),
+                columns=columns,
+                start=start,
+                end=end,
+                last_n=last_n,
+            )
+
+        start_key = _partition_key(start) if start is not None else None
+        end_key = _partition_key(end) if end is not None else None
+        keys = [
+            key
+            for key in self._partitions(symbol, freq)
+            if (start_key is None or key >= start_key)
+            and (end_key is None or key <= end_key)
+        ]
+
+        # with last_n, read partitions from the latest backwards until we have enough
+        partitions, num_rows = [], 0
+        for key in reversed(keys) if last_n is not None else keys:
+            df = self._backend.read(
+                self._partition_path(symbol, freq, key),
+                columns=columns,
+                start=start,
+                end=end,
+                last_n=None if last_n is None else last_n - num_rows,
+            )
+            partitions.append(df)
+            num_rows += len(df)
+            if last_n is not None and num_rows >= last_n:
+                break
+
+        if not partitions:
+            return pd.DataFrame(columns=list(columns or []))
+        if last_n is not None:
+            partitions.reverse()
+        return pd.concat(partitions)
+
     def write_company_details(self, symbol: str, data: CompanyDetails) -> None:
-        with open(self._company_details_path(symbol), "w") as f:
+        self._ensure_writable()
+        filepath = self._company_details_path(symbol)
+        _makedirs(filepath)
+        with atomic_open(filepath, "w") as f:
             f.write(CompanyDetailsSerializer().dumps(data))
 
+    def apply_split(
+        self, symbol: str, ratio: float, execution_date: DateType | str
+    ) -> bool:
+        """
+        Adjust the stored bars of `symbol` for a stock split, in place, at every
+        frequency: prices of the bars before the `execution_date` are divided by
+        `ratio` (the number of new shares per old share, e.g. 4 for a 4-for-1 split or
+        0.05 for a 1-for-20 reverse split), and their volumes are multiplied by it.
+
+        The split is recorded (see :meth:`get_splits`), so applying the same split
+        again does nothing. Returns whether the bars were adjusted (nothing is recorded
+        for a symbol without bars).
+        """
+        self._ensure_writable()
+        if ratio <= 0:
+            raise ValueError(f"The split ratio must be positive (got {ratio!r})")
+        split = Split(execution_date=pd.Timestamp(execution_date).date(), ratio=ratio)
+        before, _ = _to_bounds(split.execution_date, None)
+
+        with self._locks.exclusive(symbol.upper()):
+            splits = self.get_splits(symbol)
+            if any(s.execution_date == split.execution_date for s in splits):
+                return False
+            if not any(self.has_freq(symbol, freq) for freq in Freq):
+                return False
+
+            if self._cache is not None:
+                self._cache.invalidate(symbol.upper())
+            self._delete_derived(symbol, source_freq=Freq[0])
+            for freq in Freq:
+                if not self.has_freq(symbol, freq):
+                    continue
+                df = self._split_freq(symbol, freq, before, ratio)
+                if self._dense is not None and freq == Freq.day:
+                    self._dense.update(symbol, df)
+
+            filepath = self._splits_path(symbol)
+            _makedirs(filepath)
+            with atomic_open(filepath, "w") as f:
+                f.write(SplitSerializer(many=True).dumps([*splits, split]))
+        return True
+
+    def _split_freq(
+        self, symbol: str, freq: Freq, before: pd.Timestamp, ratio: float
+    ) -> pd.DataFrame:
+        """
+        Adjust the bars of one frequency for a split, rewriting only the files (or
+        partitions) with bars before the split. Returns the adjusted bars.
+        """
+        if not self._is_partitioned(freq):
+            df = self._read(symbol, freq)
+            if df.empty or df.index[0] >= before:
+                return df
+            df = self._compact(_split_adjust(df, before, ratio))
+            self._backend.write(self._path(symbol, freq), df)
+        else:
+            partitions = []
+            for key in self._partitions(symbol, freq):
+                filepath = self._partition_path(symbol, freq, key)
+                partition = self._backend.read(filepath)
+                if not partition.empty and partition.index[0] < before:
+                    partition = self._compact(_split_adjust(partition, before, ratio))
+                    self._backend.write(filepath, partition)
+                partitions.append(partition)
+            if not partitions:
+                return pd.DataFrame()
+            df = pd.concat(partitions)
+
+        historical_metadata = self.get_historical_metadata(symbol, freq)
+        self._write_historical_metadata(
+            symbol,
+            freq,
+            df,
+            historical_metadata.first_bar_utc if historical_metadata else None,
+            num_rows=len(df),
+            num_bytes=_size(self._path(symbol, freq), self._backend.extension),
+        )
+        return df
+
     def _write_historical_metadata(
-        self, symbol: str, freq: Freq, df: pd.DataFrame
+        self,
+        symbol: str,
+        freq: Freq,
+        df: pd.DataFrame,
+        first_bar_utc: pd.Timestamp | None = None,
+        num_rows: int | None = None,
+        num_bytes: int | None = None,
     ) -> HistoricalMetadata | None:
         if df is None or df.empty:
             return
@@ -178,16 +1215,23 @@ class Store:
         bar = df.iloc[-1]
         data = HistoricalMetadata(
             freq=freq,
-            first_bar_utc=df.iloc[0].name,  # type: ignore
+            first_bar_utc=first_bar_utc or df.iloc[0].name,  # type: ignore
             latest_bar_utc=bar.name,  # type: ignore
             Open=bar.Open,
             High=bar.High,
             Low=bar.Low,
             Close=bar.Close,
             Volume=bar.Volume,
+            num_rows=num_rows,
+            num_bytes=num_bytes,
         )
-        with open(self._historical_metadata_path(symbol, freq), "w") as f:
-            f.write(HistoricalMetadataSerializer().dumps(data))
+        if self._catalog is not None:
+            self._catalog.put(symbol, data)
+        else:
+            filepath = self._historical_metadata_path(symbol, freq)
+            _makedirs(filepath)
+            with atomic_open(filepath, "w") as f:
+                f.write(HistoricalMetadataSerializer().dumps(data))
         return data
 
     def _company_details_path(self, symbol: str):
@@ -196,67 +1240,393 @@ class Store:
             symbol.upper(),
             "company-details.json",
         )
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
         return filepath
 
+    def _splits_path(self, symbol: str):
+        return os.path.join(self._root_dir, symbol.upper(), "splits.json")
+
     def _historical_metadata_path(self, symbol: str, freq: Freq):
         filepath = os.path.join(
             self._root_dir,
             symbol.upper(),
             f"{self._freq_filename(freq)}.json",
         )
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
         return filepath
 
     def _get_source_freq(self, symbol: str, freq: Freq) -> Freq | None:
+        return self._find_source_freq(symbol, freq)[0]
+
+    def _find_source_freq(self, symbol: str, freq: Freq) -> tuple[Freq | None, int]:
+        """
+        Returns the stored frequency to aggregate `freq` from (if any), and how many
+        stored frequencies were probed to find it.
+        """
+        if self._catalog is not None:
+            stored_freqs = self._catalog.freqs(symbol)
+            has_freq = stored_freqs.__contains__
+        else:
+            has_freq = functools.partial(self.has_freq, symbol)
+
         if freq == Freq[0]:
-            return freq if self.has_freq(symbol, freq) else None
+            return (freq if has_freq(freq) else None), 1
 
         possible_frequencies = (
             reversed(Freq) if freq == Freq[-1] else reversed(Freq[: freq + 1])
         )
-        for source_freq in possible_frequencies:
-            if self.has_freq(symbol, source_freq):
-                return source_freq
-        return None
+        for probes, source_freq in enumerate(possible_frequencies, 1):
+            if has_freq(source_freq):
+                return source_freq, probes
+        return None, probes
 
     def _freq_filename(self, freq: Freq) -> str:
         return freq.value if freq < Freq.day else freq.name
 
+    def _derived_path(self, symbol: str, freq: Freq) -> str:
+        filepath = os.path.join(
+            self._root_dir,
+            symbol.upper(),
+            ".derived",
+            f"{self._freq_filename(freq)}.{self._backend.extension}",
+        )
+        return filepath
+
+    def _derived_metadata_path(self, symbol: str, freq: Freq) -> str:
+        return f"{os.path.splitext(self._derived_path(symbol, freq))[0]}.json"
+
+    def _derived_source_version(self, symbol: str, freq: Freq) -> list | None:
+        metadata = self._derived_metadata(symbol, freq)
+        return metadata["source_version"] if metadata is not None else None
+
+    def _derived_metadata(self, symbol: str, freq: Freq) -> dict | None:
+        try:
+            with open(self._derived_metadata_path(symbol, freq)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_derived_metadata(
+        self, symbol: str, freq: Freq, source_version: list, origins: list
+    ) -> None:
+        with atomic_open(self._derived_metadata_path(symbol, freq), "w") as f:
+            json.dump(dict(source_version=source_version, origins=origins), f)
+
+    def _delete_derived(
+        self, symbol: str, source_freq: Freq, keep: t.Collection[Freq] = ()
+    ) -> None:
+        """
+        Delete materialized aggregates which could have been derived from `source_freq`
+        (except those in `keep`).
+        """
+        for freq in self._materialize:
+            if freq > source_freq and freq not in keep:
+                filepath = self._derived_metadata_path(symbol, freq)
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                self._backend.delete(self._derived_path(symbol, freq))
+
+    def _is_partitioned(self, freq: Freq) -> bool:
+        return self._layout == "monthly" and freq < Freq.day
+
     def _path(self, symbol: str, freq: Freq) -> str:
+        """
+        Returns the data filepath (or partitions directory) for a symbol and frequency.
+        """
         filepath = os.path.join(
             self._root_dir,
             symbol.upper(),
-            f"{self._freq_filename(freq)}.pickle",
+            self._freq_filename(freq)
+            if self._is_partitioned(freq)
+            else f"{self._freq_filename(freq)}.{self._backend.extension}",
         )
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
         return filepath
 
+    def _partition_path(self, symbol: str, freq: Freq, key: int) -> str:
+        return os.path.join(
+            self._path(symbol, freq),
+            f"{key // 100:04d}-{key % 100:02d}.{self._backend.extension}",
+        )
+
+    def _partitions(self, symbol: str, freq: Freq) -> list[int]:
+        """
+        Returns the sorted partition keys (``year * 100 + month``) stored for a
+        symbol and frequency.
+        """
+        dirpath = self._path(symbol, freq)
+        if not os.path.isdir(dirpath):
+            return []
+
+        suffix = f".{self._backend.extension}"
+        return sorted(
+            int(filename[: -len(suffix)].replace("-", ""))
+            for filename in os.listdir(dirpath)
+            if filename.endswith(suffix)
+        )
+
+    def _version(self, symbol: str, freq: Freq) -> tuple[int | None, int | None]:
+        """
+        Returns the modification times of the data and metadata files for a symbol and
+        frequency. Every write rewrites the metadata file, so this also detects
+        in-place rewrites of monthly partitions.
+        """
+        return (
+            _mtime_ns(self._path(symbol, freq)),
+            self._catalog.version(symbol, freq)
+            if self._catalog is not None
+            else _mtime_ns(self._historical_metadata_path(symbol, freq)),
+        )
+
+    def _ensure_writable(self) -> None:
+        if self._read_only:
+            raise RuntimeError("This store was opened with `read_only=True`.")
+
     def _delete_freq(self, symbol: str, freq: Freq):
-        filepath = self._path(symbol, freq)
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        self._ensure_writable()
+        with self._locks.exclusive(symbol.upper()):
+            if self._cache is not None:
+                self._cache.invalidate(symbol.upper())
+            filepath = self._path(symbol, freq)
+            if os.path.isdir(filepath):
+                shutil.rmtree(filepath)
+            else:
+                self._backend.delete(filepath)
+            self._delete_derived(symbol, source_freq=freq)
+            if self._catalog is not None:
+                self._catalog.delete(symbol, freq)
+            if self._dense is not None and freq == Freq.day:
+                self._dense.clear(symbol)
 
     def _delete_all(self, symbol):
-        shutil.rmtree(os.path.join(self._root_dir, symbol.upper()), ignore_errors=True)
+        self._ensure_writable()
+        with self._locks.exclusive(symbol.upper()):
+            if self._cache is not None:
+                self._cache.invalidate(symbol.upper())
+            if self._catalog is not None:
+                self._catalog.delete(symbol)
+            if self._dense is not None:
+                self._dense.clear(symbol)
+            shutil.rmtree(
+                os.path.join(self._root_dir, symbol.upper()), ignore_errors=True
+            )
+
 
+def read_settings(root_dir: str) -> dict[str, str]:
+    """
+    Returns the settings saved in the store at `root_dir` (or an empty dict).
+    """
+    try:
+        with open(os.path.join(root_dir, SETTINGS_FILENAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_settings(root_dir: str, settings: dict[str, str]) -> None:
+    """
+    Save the on-disk format of the store at `root_dir`, which :class:`Store` then
+    uses by default.
+    """
+    with atomic_open(os.path.join(root_dir, SETTINGS_FILENAME), "w") as f:
+        json.dump(settings, f, indent=2)
+
+
+def _size(path: str, extension: str) -> int:
+    """
+    Returns the size of a file, or the total size of the data files (with the given
+    extension) in a directory.
+    """
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(
+        dir_entry.stat().st_size
+        for dir_entry in os.scandir(path)
+        if dir_entry.name.endswith(f".{extension}")
+    )
+
+
+def _to_panel(data: dict[str, pd.DataFrame], columns: t.Sequence[str]) -> pd.DataFrame:
+    """
+    Concatenate DataFrames by symbol into one with ``(symbol, column)`` columns.
+    """
+    if not data:
+        return pd.DataFrame(
+            columns=pd.MultiIndex.from_product([[], list(columns)]),
+            index=pd.DatetimeIndex([], tz=EASTERN_TZ, name="Epoch"),
+        )
+    return pd.concat(data, axis=1, names=["Symbol", None]).sort_index()
+
+
+def _count_rows(df: pd.DataFrame | None) -> dict[str, int]:
+    return {"rows_returned": len(df) if df is not None else 0}
+
+
+def _link(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:  # e.g. the filesystem does not support hard links
+        shutil.copy2(src, dst)
+
+
+def _makedirs(filepath: str) -> None:
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+
+def _mtime_ns(filepath: str) -> int | None:
+    try:
+        return os.stat(filepath).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _to_bounds(
+    start: DateType | str | None,
+    end: DateType | str | None,
+) -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
+    """
+    Convert `start` and `end` to inclusive, timezone-aware timestamps.
+    """
+
+    def to_ts(dt: DateType | str, end_of_day: bool = False) -> pd.Timestamp:
+        ts = pd.Timestamp(dt)
+        if end_of_day:
+            ts = ts + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")
+        return ts.tz_localize(EASTERN_TZ) if ts.tz is None else ts
+
+    def is_date(dt: DateType | str) -> bool:
+        if isinstance(dt, str):
+            return len(dt.strip()) == len("YYYY-MM-DD")
+        return isinstance(dt, date) and not isinstance(dt, datetime)
+
+    return (
+        to_ts(start) if start is not None else None,
+        to_ts(end, end_of_day=is_date(end)) if end is not None else None,
+    )
+
+
+def _validate_last_n(last_n: int | None) -> None:
+    if last_n is not None and (not isinstance(last_n, int) or last_n < 1):
+        raise ValueError(f"last_n must be a positive integer (got {last_n!r})")
+
+
+def _is_suffix_stable(freq: Freq) -> bool:
+    """
+    Whether aggregating a suffix of some bars to `freq` produces the same (complete)
+    bars as aggregating all of them. Intraday and daily bars are binned from the
+    first bar of each session (``origin="start"``), so they are not.
+    """
+    return freq > Freq.day
+
+
+def _agg_last_n(
+    read: t.Callable[[int], pd.DataFrame],
+    source_freq: Freq | None,
+    freq: Freq,
+    last_n: int,
+) -> pd.DataFrame:
+    """
+    Aggregate the last `last_n` bars at `freq` from the bars returned by
+    ``read(n)`` (the last `n` source bars), reading more source bars until they
+    include `last_n` complete aggregated bars (or all of the source bars). The
+    initial read size is estimated from `source_freq`, if known.
+    """
+    # aggregated bars are contiguous in time, so all but the earliest aggregated bar
+    # of a suffix of the source bars are complete
+    ratio = (
+        max(_FREQ_MINUTES[freq] // _FREQ_MINUTES[source_freq], 1) if source_freq else 1
+    )
+    n = (last_n + 1) * ratio
+    while True:
+        df = read(n)
+        agg_df = Store.agg(df, freq)
+        if len(df) < n or len(agg_df) > last_n:
+            return tail(agg_df, last_n)
+        n *= 2
+
+
+def _split_adjust(df: pd.DataFrame, before: pd.Timestamp, ratio: float) -> pd.DataFrame:
+    """
+    Return `df` with the prices of the bars before `before` divided by `ratio`, and
+    their volumes multiplied by it.
+    """
+    n = df.index.searchsorted(before)
+    columns = {}
+    for column in df.columns:
+        values = df[column].to_numpy(np.float64, copy=True)
+        if column in PRICE_COLUMNS:
+            values[:n] /= ratio
+        elif column == "Volume":
+            values[:n] = np.round(values[:n] * ratio)
+            if df[column].dtype.kind in "iu":
+                values = values.astype(np.int64)
+        else:
+            values = df[column].to_numpy()
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _is_append(
+    historical_metadata: HistoricalMetadata | None,
+    bars: pd.DataFrame,
+) -> bool:
+    """
+    Whether all of (sorted) `bars` are strictly newer than the latest stored bar.
+    """
+    return (
+        historical_metadata is not None
+        and bars.index[0] > historical_metadata.latest_bar_utc
+    )
+
+
+def _merge_bars(old: pd.DataFrame, bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge new `bars` into `old`, keeping the higher-volume bar for overlapping timestamps.
+
+    The result is the `old` bars before the first overlapping timestamp, followed by
+    the merged overlapping bars, followed by the `bars` after the last overlapping
+    timestamp.
+    """
+    index_intersection = old.index.intersection(bars.index, sort=True)
+    if index_intersection.empty:
+        return pd.concat([old, bars])
+
+    # merge overlapping timestamps by highest volume
+    old_idx = old.index.get_indexer(index_intersection)
+    new_idx = bars.index.get_indexer(index_intersection)
+    use_new = bars["Volume"].to_numpy()[new_idx] > old["Volume"].to_numpy()[old_idx]
+    intersection = pd.DataFrame(
+        {
+            column: np.where(
+                use_new,
+                _column_values(bars, column, new_idx),
+                _column_values(old, column, old_idx),
+            )
+            for column in old.columns.union(bars.columns, sort=False)
+        },
+        index=index_intersection,
+    )
 
-def _premarket(df: pd.DataFrame) -> pd.DataFrame:
-    return df.between_time("04:00", "09:30", inclusive="left")
+    existing = old.iloc[: old_idx[0]]
+    new = bars.iloc[new_idx[-1] + 1 :]
+    return pd.concat([existing, intersection, new])
 
 
-def _openmarket(df: pd.DataFrame) -> pd.DataFrame:
-    return df.between_time("09:30", "16:00", inclusive="left")
+def _column_values(df: pd.DataFrame, column: str, idx: np.ndarray) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(idx), np.nan)
+    return df[column].to_numpy()[idx]
 
 
-def _aftermarket(df: pd.DataFrame) -> pd.DataFrame:
-    return df.between_time("16:00", "20:00", inclusive="left")
+def _partition_key(ts: pd.Timestamp) -> int:
+    ts = ts.tz_convert(EASTERN_TZ)
+    return ts.year * 100 + ts.month
 
 
-def _agg(df: pd.DataFrame, freq: Freq, origin="start") -> pd.DataFrame:
-    resample_freq = {
-        Freq.month: "MS",
-        Freq.quarter: "QS",
-        Freq.year: "YS",
-    }.get(freq, freq.value)
-    return df.resample(resample_freq, origin=origin).apply(RESAMPLE_COLUMNS).dropna()
+def _partition_groups(bars: pd.DataFrame) -> t.Iterator[tuple[int, pd.DataFrame]]:
+    """
+    Split sorted `bars` into ``(partition_key, bars)`` groups by calendar month.
+    """
+    index = bars.index.tz_convert(EASTERN_TZ)
+    keys = np.asarray(index.year * 100 + index.month)
+    unique_keys, offsets = np.unique(keys, return_index=True)
+    bounds = [*offsets[1:], len(bars)]
+    for key, lo, hi in zip(unique_keys, offsets, bounds):
+        yield int(key), bars.iloc[lo:hi]
@@ -19,8 +19,15 @@ class StrategyRunner:
         calendar: Calendar | str = "NYSE",
         results_path: str | None = None,
         symbols: list[str] | None = None,
+        snapshot: bool = False,
     ):
+        """
+        :param snapshot: Whether each run reads from a snapshot of the store (see
+            :meth:`Store.snapshot`), so that it sees a consistent view of the data and
+            never waits on concurrent writes (e.g. a sync).
+        """
         self.store = store or Store()
+        self.snapshot = snapshot
         self.calendar = (
             Calendar(exchange=calendar) if isinstance(calendar, str) else calendar
         )
@@ -60,11 +67,16 @@ class StrategyRunner:
         ).isoformat()[:10]
         results = pd.DataFrame(index=symbols, columns=list(self.strategies.keys()))
         errors = []
-        data = {symbol: self.store.get(symbol) for symbol in symbols}
-        for symbol, df in data.items():
+        if self.snapshot:
+            with self.store.snapshot() as store:
+                data = store.get_many(symbols, end=date)
+        else:
+            data = self.store.get_many(symbols, end=date)
+        for symbol in symbols:
+            df = data.get(symbol)
             for strategy_name, strategy_callable in self.strategies.items():
                 try:
-                    result = strategy_callable(df[:date])
+                    result = strategy_callable(df)
                 except Exception as e:
                     errors.append((repr(e), symbol))
                 else:
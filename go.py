@@ -14,7 +14,9 @@ from joblib import Parallel, delayed
 
 from fin_models import analysis_utils as au
 from fin_models.enums import Freq
+from fin_models.server import RemoteStore
 from fin_models.services import store
+from fin_models.shared import SharedUniverse
 
 
 results_dir = os.path.join(
@@ -37,10 +39,10 @@ def json_default(o):
     raise TypeError(f"Unable to convert {o!r} ({type(o)} to JSON.")
 
 
-def signal(symbol: str, end_date: str):
+def signal(symbol: str, end_date: str, universe: SharedUniverse | None = None):
     no_result = dict(symbol=symbol)
 
-    df = store.get(symbol)
+    df = universe.get(symbol) if universe is not None else store.get(symbol)
     if df is None or df.empty:
         return no_result
 
@@ -83,15 +85,21 @@ def cached_results(
     return pd.DataFrame.from_records(results)
 
 
-def calculate_for_date(end_date: str | None = None, fresh: bool = False) -> pd.DataFrame:
+def calculate_for_date(
+    end_date: str | None = None,
+    fresh: bool = False,
+    universe: SharedUniverse | None = None,
+) -> pd.DataFrame:
     end_date = end_date or date.today().isoformat()
     results_filename = os.path.join(results_dir, f"{end_date}_results.json")
 
     df = cached_results(cache_filename=results_filename, fresh=fresh)
     if df.empty:
         fn_calls = [
-            delayed(signal)(symbol=symbol, end_date=end_date)
-            for symbol in store.symbols(freq=Freq.day)
+            delayed(signal)(symbol=symbol, end_date=end_date, universe=universe)
+            for symbol in (
+                universe.symbols if universe is not None else store.symbols(freq=Freq.day)
+            )
         ]
 
         r = Parallel(
@@ -108,9 +116,24 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--date", type=date.isoformat)
     parser.add_argument("--fresh", action="store_true")
+    parser.add_argument(
+        "--socket",
+        help="read bars from the `fin store serve` server listening on this socket",
+    )
+    parser.add_argument(
+        "--shared",
+        action="store_true",
+        help="load the daily bars into shared memory once for all of the workers",
+    )
     args = parser.parse_args()
-
-    df = calculate_for_date(args.date, fresh=args.fresh)
+    if args.socket:
+        store = RemoteStore(args.socket)
+
+    if args.shared:
+        with SharedUniverse.create(store) as universe:
+            df = calculate_for_date(args.date, fresh=args.fresh, universe=universe)
+    else:
+        df = calculate_for_date(args.date, fresh=args.fresh)
     filter1 = df["crossed_sma_100"] & (df["bars_since_prior_high"] > 20)
     filter2 = df["volume_multiple_of_median"] > 3
 
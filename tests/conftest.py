@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os.path
+import tempfile
+import typing as t
+
+import pandas as pd
+import pytest
+
+from fin_models.enums import Freq
+from fin_models.store import Store
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+@pytest.fixture()
+def store() -> t.Generator[Store, None, None]:
+    with tempfile.TemporaryDirectory() as tempdir:
+        yield Store(tempdir)
+
+
+@pytest.fixture()
+def full_store() -> t.Generator[Store, None, None]:
+    with tempfile.TemporaryDirectory() as tempdir:
+        store = Store(tempdir)
+        store.write("AMD", Freq.min_1, load_data("AMD", Freq.min_1))
+        store.write("INTC", Freq.min_1, load_data("INTC", Freq.min_1))
+        store.write("NVDA", Freq.min_1, load_data("NVDA", Freq.min_1))
+        store.write("AMD", Freq.day, load_data("AMD", Freq.day))
+        store.write("INTC", Freq.day, load_data("INTC", Freq.day))
+        store.write("NVDA", Freq.day, load_data("NVDA", Freq.day))
+        yield store
+
+
+def _get_filepath(symbol, freq: Freq) -> str:
+    filename = f"{symbol}.{freq.value if freq < Freq.day else freq.name}.json"
+    filepath = os.path.join(DATA_DIR, filename)
+    return filepath
+
+
+def save_data(symbol, freq: Freq, df: pd.DataFrame):
+    df.to_json(_get_filepath(symbol, freq), orient="split")
+
+
+def load_data(symbol, freq: Freq) -> pd.DataFrame:
+    df = pd.read_json(_get_filepath(symbol, freq), orient="split")
+    df.index = df.index.tz_localize("UTC").tz_convert("America/New_York")  # type: ignore
+    df.index.name = "Epoch"
+    return df[["Open", "High", "Low", "Close", "Volume"]]
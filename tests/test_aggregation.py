@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import load_data
+from pandas.testing import assert_frame_equal
+
+from fin_models.aggregation import (
+    IncrementalAggregator,
+    agg_intraday,
+    aggregate,
+    get_origins,
+    resample_intraday,
+)
+from fin_models.compact import compact
+from fin_models.enums import Freq
+
+
+INTRADAY_FREQS = [freq for freq in Freq if freq < Freq.day]
+
+
+def _dst_bars() -> pd.DataFrame:
+    # every minute around the start of daylight saving time (2023-03-12)
+    index = pd.date_range(
+        "2023-03-09 03:00", "2023-03-14 21:00", freq="min", tz="America/New_York"
+    )
+    index = index[index.dayofweek < 5]
+    rng = np.random.default_rng(0)
+    close = 100 + rng.standard_normal(len(index)).cumsum() * 0.05
+    return pd.DataFrame(
+        {
+            "Open": close + 0.01,
+            "High": close + 0.05,
+            "Low": close - 0.05,
+            "Close": close,
+            "Volume": rng.integers(1, 1000, len(index)),
+        },
+        index=pd.DatetimeIndex(index, name="Epoch"),
+    )
+
+
+@pytest.mark.parametrize("freq", INTRADAY_FREQS)
+@pytest.mark.parametrize(
+    "variant",
+    ["amd", "late_start", "unsorted", "duplicates", "naive", "compact", "dst", "nan"],
+)
+def test_agg_intraday(freq, variant):
+    df = load_data("AMD", Freq.min_1)
+    df = {
+        "amd": df,
+        "late_start": df.iloc[37:],
+        "unsorted": df.sample(frac=1, random_state=0),
+        "duplicates": pd.concat([df, df.iloc[::7]]),
+        "naive": df.tz_localize(None),
+        "compact": compact(df),
+        "dst": _dst_bars(),
+        "nan": df.assign(Open=df["Open"].where(np.arange(len(df)) % 100 != 5)),
+    }[variant]
+    assert_frame_equal(agg_intraday(df, freq), resample_intraday(df, freq))
+
+
+def test_agg_intraday_empty():
+    df = load_data("AMD", Freq.min_1)
+    assert_frame_equal(
+        agg_intraday(df.iloc[:0], Freq.min_5), resample_intraday(df.iloc[:0], Freq.min_5)
+    )
+    outside = df.between_time("20:00", "04:00", inclusive="left")
+    assert_frame_equal(
+        agg_intraday(outside, Freq.hour), resample_intraday(outside, Freq.hour)
+    )
+
+
+@pytest.mark.parametrize(
+    "source_freq,freq",
+    [
+        (source_freq, freq)
+        for source_freq in [Freq.min_1, Freq.day]
+        for freq in Freq
+        if freq > source_freq
+    ],
+)
+def test_incremental_aggregator(source_freq, freq):
+    df = load_data("AMD", source_freq)
+    rng = np.random.default_rng(0)
+    splits = np.sort(rng.choice(np.arange(1, len(df)), size=8, replace=False))
+
+    aggregator = IncrementalAggregator(freq)
+    agg_df = df.iloc[:0]
+    for start, end in zip([0, *splits], [*splits, len(df)]):
+        updated = aggregator.update(df.iloc[start:end])
+        agg_df = pd.concat([agg_df[agg_df.index < updated.index[0]], updated])
+    assert_frame_equal(agg_df, aggregate(df, freq), check_freq=False)
+
+    # resuming from the origins and latest aggregated bar
+    head, rest = df.iloc[: splits[4]], df.iloc[splits[4] :]
+    head_df = aggregate(head, freq)
+    aggregator = IncrementalAggregator(freq, get_origins(head, freq), head_df.iloc[-1:])
+    updated = aggregator.update(rest)
+    agg_df = pd.concat([head_df[head_df.index < updated.index[0]], updated])
+    assert_frame_equal(agg_df, aggregate(df, freq), check_freq=False)
+
+    older = df.iloc[:1].set_axis(df.index[:1] - pd.Timedelta(days=800))
+    with pytest.raises(ValueError):
+        aggregator.update(older)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from conftest import load_data
+
+from fin_models.enums import Freq
+
+
+pytest.importorskip("talib")
+
+from fin_models import analysis_utils  # noqa: E402 (requires talib)
+
+
+def _bars() -> list[pd.DataFrame]:
+    # daily bars, and enough minute bars for the moving averages
+    bars = [load_data(symbol, Freq.day) for symbol in ["AMD", "INTC", "NVDA"]]
+    bars += [load_data(symbol, Freq.min_1).iloc[:400] for symbol in ["AMD", "NVDA"]]
+    # repeated volumes, closes and bodies
+    index = pd.date_range("2023-01-02", periods=8, freq="D", tz="America/New_York")
+    bars.append(
+        pd.DataFrame(
+            {
+                "Open": [1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 2.0, 1.0],
+                "High": [2.0, 2.0, 3.0, 4.0, 5.0, 5.0, 3.0, 2.0],
+                "Low": [1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 1.0, 0.5],
+                "Close": [2.0, 2.0, 3.0, 4.0, 5.0, 5.0, 1.0, 0.5],
+                "Volume": [10, 10, 0, 0, 5, 15, 15, 40],
+            },
+            index=index,
+        )
+    )
+    return bars
+
+
+@pytest.mark.parametrize(
+    "rolling_fn, fn, kwargs",
+    [
+        (
+            analysis_utils.bars_since_previous_high_rolling,
+            analysis_utils.bars_since_previous_high,
+            {},
+        ),
+        (
+            analysis_utils.is_expanding_volume_rolling,
+            analysis_utils.is_expanding_volume,
+            {},
+        ),
+        (
+            analysis_utils.is_expanding_volume_rolling,
+            analysis_utils.is_expanding_volume,
+            dict(num_bars=5),
+        ),
+        (
+            analysis_utils.is_expanding_bodies_rolling,
+            analysis_utils.is_expanding_bodies,
+            {},
+        ),
+        (
+            analysis_utils.is_expanding_bodies_rolling,
+            analysis_utils.is_expanding_bodies,
+            dict(num_bars=2, bullish=False),
+        ),
+        (
+            analysis_utils.volume_sum_of_prior_days_rolling,
+            analysis_utils.volume_sum_of_prior_days,
+            {},
+        ),
+        (
+            analysis_utils.crossed_ma_rolling,
+            analysis_utils.crossed_ma,
+            dict(ma=20, within_bars=3),
+        ),
+        (
+            analysis_utils.crossed_ma_rolling,
+            analysis_utils.crossed_ma,
+            dict(ma=5),
+        ),
+        (analysis_utils.is_crossed_rolling, analysis_utils.is_crossed, dict(value=3.5)),
+    ],
+)
+def test_rolling(rolling_fn, fn, kwargs):
+    for df in _bars():
+        result = rolling_fn(df, **kwargs)
+        assert result.index.equals(df.index)
+        # the value for each bar is the value of the last bar of the bars up to it
+        for i in range(1, len(df)):
+            assert result.iloc[i] == fn(df.iloc[: i + 1], **kwargs), (df.index[i], i)
+
+
+def test_is_crossed_rolling_column():
+    df = load_data("AMD", Freq.min_1).iloc[:400]
+    df["SMA"] = df.Close.rolling(10).mean()
+    result = analysis_utils.is_crossed_rolling(df, column="SMA")
+    assert not result.iloc[0]
+    for i in range(1, len(df)):
+        assert result.iloc[i] == analysis_utils.is_crossed(df.iloc[: i + 1], column="SMA")
+
+    with pytest.raises(TypeError):
+        analysis_utils.is_crossed_rolling(df)
+    with pytest.raises(ValueError):
+        analysis_utils.is_crossed_rolling(df, column="MISSING")
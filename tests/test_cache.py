@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from fin_models.cache import LRUCache
+
+
+def make_df(num_rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"Close": range(num_rows)}, dtype="float64")
+
+
+class TestLRUCache:
+    def test_get_put(self):
+        cache = LRUCache(max_bytes=10_000)
+        df = make_df(10)
+        assert cache.get(("AMD", 1), version=1) is None
+        cache.put(("AMD", 1), 1, df)
+        assert cache.get(("AMD", 1), version=1) is df
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_version_mismatch_is_a_miss(self):
+        cache = LRUCache(max_bytes=10_000)
+        cache.put(("AMD", 1), 1, make_df(10))
+        assert cache.get(("AMD", 1), version=2) is None
+        assert len(cache) == 0
+        assert cache.num_bytes == 0
+
+    def test_evicts_least_recently_used(self):
+        size = int(make_df(100).memory_usage(index=True, deep=True).sum())
+        cache = LRUCache(max_bytes=size * 2)
+        cache.put(("AMD",), 1, make_df(100))
+        cache.put(("INTC",), 1, make_df(100))
+        cache.get(("AMD",), 1)
+        cache.put(("NVDA",), 1, make_df(100))
+
+        assert cache.get(("INTC",), 1) is None
+        assert cache.get(("AMD",), 1) is not None
+        assert cache.get(("NVDA",), 1) is not None
+        assert cache.num_bytes == size * 2
+
+    def test_skips_entries_larger_than_budget(self):
+        cache = LRUCache(max_bytes=10)
+        cache.put(("AMD",), 1, make_df(100))
+        assert len(cache) == 0
+
+    def test_invalidate(self):
+        cache = LRUCache(max_bytes=10_000)
+        cache.put(("AMD", 1), 1, make_df(10))
+        cache.put(("AMD", 2), 1, make_df(10))
+        cache.put(("INTC", 1), 1, make_df(10))
+        cache.invalidate("AMD")
+        assert len(cache) == 1
+        cache.invalidate()
+        assert len(cache) == 0
+        assert cache.num_bytes == 0
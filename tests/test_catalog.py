@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import typing as t
+
+import pandas as pd
+import pytest
+
+from fin_models.catalog import Catalog
+from fin_models.dataclasses import HistoricalMetadata
+from fin_models.enums import Freq
+
+
+@pytest.fixture()
+def catalog() -> t.Generator[Catalog, None, None]:
+    with tempfile.TemporaryDirectory() as tempdir:
+        yield Catalog(os.path.join(tempdir, "catalog.sqlite"))
+
+
+def make_metadata(freq: Freq = Freq.day, **kwargs) -> HistoricalMetadata:
+    return HistoricalMetadata(
+        **{
+            **dict(
+                freq=freq,
+                first_bar_utc=pd.Timestamp("2023-01-03 05:00", tz="UTC"),
+                latest_bar_utc=pd.Timestamp("2023-01-31 05:00", tz="UTC"),
+                Open=1.5,
+                High=2.5,
+                Low=1.25,
+                Close=2,
+                Volume=1_000,
+                num_rows=20,
+                num_bytes=4_096,
+            ),
+            **kwargs,
+        }
+    )
+
+
+class TestCatalog:
+    def test_empty(self, catalog):
+        assert catalog.get("AMD", Freq.day) is None
+        assert catalog.has("AMD", Freq.day) is False
+        assert catalog.freqs("AMD") == set()
+        assert catalog.symbols() == []
+        assert catalog.version("AMD", Freq.day) is None
+
+    def test_put_get(self, catalog):
+        expected = make_metadata()
+        catalog.put("amd", expected)
+        assert catalog.get("AMD", Freq.day) == expected
+        assert catalog.has("AMD", Freq.day)
+        assert not catalog.has("AMD", Freq.min_1)
+        assert catalog.get_all(Freq.day) == {"AMD": expected}
+
+    def test_put_replaces(self, catalog):
+        catalog.put("AMD", make_metadata())
+        version = catalog.version("AMD", Freq.day)
+        expected = make_metadata(Close=3, num_rows=21)
+        catalog.put("AMD", expected)
+        assert catalog.get("AMD", Freq.day) == expected
+        assert catalog.version("AMD", Freq.day) > version
+
+    def test_symbols_and_freqs(self, catalog):
+        catalog.put("NVDA", make_metadata(Freq.day))
+        catalog.put("AMD", make_metadata(Freq.day))
+        catalog.put("AMD", make_metadata(Freq.min_1))
+        assert catalog.symbols() == ["AMD", "NVDA"]
+        assert catalog.symbols(Freq.min_1) == ["AMD"]
+        assert catalog.freqs("AMD") == {Freq.day, Freq.min_1}
+
+    def test_delete(self, catalog):
+        catalog.put("AMD", make_metadata(Freq.day))
+        catalog.put("AMD", make_metadata(Freq.min_1))
+        catalog.delete("AMD", Freq.min_1)
+        assert catalog.freqs("AMD") == {Freq.day}
+        catalog.delete("AMD")
+        assert catalog.symbols() == []
+
+    def test_persists(self, catalog):
+        expected = make_metadata()
+        catalog.put("AMD", expected)
+        assert Catalog(catalog.filepath).get("AMD", Freq.day) == expected
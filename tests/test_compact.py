@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from conftest import load_data
+from pandas.testing import assert_frame_equal
+
+from fin_models.compact import PRICE_DECIMALS, compact
+from fin_models.enums import Freq
+
+
+class TestCompact:
+    def test_dtypes(self):
+        df = compact(load_data("AMD", Freq.min_1))
+        assert list(df.dtypes) == [np.float32] * 4 + [np.uint32]
+        assert df.index.dtype == "datetime64[ns, America/New_York]"
+
+    def test_round_trip(self):
+        expected = load_data("AMD", Freq.min_1)
+        df = compact(expected)
+        assert_frame_equal(
+            df.astype(np.float64).round(PRICE_DECIMALS),
+            expected.astype(np.float64).round(PRICE_DECIMALS),
+        )
+        assert (df["Volume"].to_numpy() == expected["Volume"].to_numpy()).all()
+
+    def test_uses_less_memory(self):
+        df = load_data("AMD", Freq.min_1)
+        assert compact(df).memory_usage().sum() < 0.7 * df.memory_usage().sum()
+
+    def test_imprecise_prices_are_not_narrowed(self):
+        df = pd.DataFrame({"Close": [123_456.0001, 1.5]})
+        assert compact(df)["Close"].dtype == np.float64
+
+    def test_volume_is_widened(self):
+        df = pd.DataFrame({"Volume": [1, 2**32]})
+        assert compact(df)["Volume"].dtype == np.uint64
+
+    def test_fractional_or_missing_volume_is_kept(self):
+        for volume in ([1.5, 2.0], [1.0, np.nan], [-1, 2]):
+            df = pd.DataFrame({"Volume": volume})
+            assert compact(df)["Volume"].dtype == df["Volume"].dtype
+
+    def test_other_columns_are_kept(self):
+        df = pd.DataFrame({"Close": [1.25], "Symbol": ["AMD"]})
+        assert compact(df)["Symbol"].dtype == object
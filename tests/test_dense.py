@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import typing as t
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import load_data
+
+from fin_models.dense import SYMBOLS_CHUNK_SIZE, DenseDailyMatrices
+from fin_models.enums import Freq
+from fin_models.store import Store
+
+
+@pytest.fixture()
+def dense() -> t.Generator[DenseDailyMatrices, None, None]:
+    with tempfile.TemporaryDirectory() as tempdir:
+        yield DenseDailyMatrices(tempdir, start="2022-12-01")
+
+
+class TestDenseDailyMatrices:
+    def test_update_and_get(self, dense):
+        amd = load_data("AMD", Freq.day)
+        nvda = load_data("NVDA", Freq.day)
+        dense.update("AMD", amd)
+        dense.update("NVDA", nvda.iloc[5:])
+
+        assert dense.symbols == ["AMD", "NVDA"]
+        df = dense.get("Close", start="2023-01-03", end="2023-01-31")
+        assert list(df.columns) == ["AMD", "NVDA"]
+        assert len(df) == len(amd)
+        np.testing.assert_array_equal(df["AMD"].to_numpy(), amd.Close.to_numpy())
+        assert df["NVDA"].iloc[:5].isna().all()
+        np.testing.assert_array_equal(
+            df["NVDA"].iloc[5:].to_numpy(), nvda.Close.iloc[5:].to_numpy()
+        )
+
+        volume = dense.get("Volume", start="2023-01-03", end="2023-01-31")
+        assert volume.dtypes.unique().tolist() == [np.dtype("u8")]
+        assert (volume["NVDA"].iloc[:5] == 0).all()
+
+    def test_get_is_a_view(self, dense):
+        dense.update("AMD", load_data("AMD", Freq.day))
+        matrix = dense.matrix("Close")
+        assert isinstance(matrix.base, np.memmap) or isinstance(matrix, np.memmap)
+        df = dense.get("Close")
+        assert np.shares_memory(df.to_numpy(), matrix)
+
+    def test_persists(self, dense):
+        amd = load_data("AMD", Freq.day)
+        dense.update("AMD", amd)
+        reopened = DenseDailyMatrices(dense.root_dir)
+        assert reopened.symbols == ["AMD"]
+        pd.testing.assert_frame_equal(reopened.get("Close"), dense.get("Close"))
+        assert os.path.exists(os.path.join(dense.root_dir, "close.f8"))
+        assert os.path.exists(os.path.join(dense.root_dir, "volume.u8"))
+
+    def test_grows_symbols(self, dense):
+        amd = load_data("AMD", Freq.day)
+        for i in range(SYMBOLS_CHUNK_SIZE + 1):
+            dense._symbol_id(f"SYM{i}")
+        dense.update("AMD", amd)
+        np.testing.assert_array_equal(
+            dense.get("Close", start="2023-01-03", end="2023-01-31")["AMD"].to_numpy(),
+            amd.Close.to_numpy(),
+        )
+        assert np.isnan(dense.matrix("Close")[0]).all()
+
+    def test_extends_dates(self, dense):
+        amd = load_data("AMD", Freq.day)
+        dense.update("AMD", amd)
+        num_days = len(dense.dates)
+
+        next_trading_day = dense._trading_days(
+            dense.dates[-1] + pd.Timedelta(days=1),
+            dense.dates[-1] + pd.Timedelta(days=30),
+        )[0]
+        bars = amd.iloc[-1:].copy()
+        bars.index = pd.DatetimeIndex([next_trading_day], tz="America/New_York")
+        dense.update("AMD", bars)
+
+        assert len(dense.dates) > num_days
+        assert (
+            dense.get("Close", start=bars.index[0]).iloc[0]["AMD"] == bars.Close.iloc[0]
+        )
+        np.testing.assert_array_equal(
+            dense.get("Close", start="2023-01-03", end="2023-01-31")["AMD"].to_numpy(),
+            amd.Close.to_numpy(),
+        )
+
+    def test_extends_dates_backwards(self, dense):
+        amd = load_data("AMD", Freq.day)
+        dense.update("AMD", amd.iloc[10:])
+        num_days = len(dense.dates)
+
+        bars = amd.iloc[:1].copy()
+        bars.index = pd.DatetimeIndex(["1995-03-01"], tz="America/New_York")
+        dense.update("AMD", bars)
+        dense.update("NVDA", load_data("NVDA", Freq.day))
+
+        assert dense.dates[0] == pd.Timestamp("1995-03-01")
+        assert len(dense.dates) > num_days
+        df = dense.get("Close", end=bars.index[0])
+        assert df.loc[df.index[-1], "AMD"] == bars.Close.iloc[0]
+        df = dense.get("Close", start="2023-01-03", end="2023-01-31")
+        np.testing.assert_array_equal(df["AMD"].iloc[10:], amd.Close.iloc[10:])
+        assert df["AMD"].iloc[:10].isna().all()
+        np.testing.assert_array_equal(
+            df["NVDA"], load_data("NVDA", Freq.day).Close.to_numpy()
+        )
+
+    def test_get_maps_while_locked(self, dense, monkeypatch):
+        dense.update("AMD", load_data("AMD", Freq.day))
+        held = dense._locks._held
+        matrix = dense.matrix
+
+        def locked_matrix(column):
+            assert "matrices" in held()
+            return matrix(column)
+
+        monkeypatch.setattr(dense, "matrix", locked_matrix)
+        assert not dense.get("Close").empty
+
+    def test_clear(self, dense):
+        dense.update("AMD", load_data("AMD", Freq.day))
+        dense.clear("AMD")
+        assert dense.get("Close")["AMD"].isna().all()
+
+
+class TestStoreCrossSection:
+    def test_write_updates_dense(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, dense=True)
+            for symbol in ["AMD", "INTC", "NVDA"]:
+                store.write(symbol, Freq.day, load_data(symbol, Freq.day))
+
+            df = store.cross_section("Close", start="2023-01-03", end="2023-01-31")
+            assert list(df.columns) == ["AMD", "INTC", "NVDA"]
+            for symbol in df.columns:
+                np.testing.assert_array_equal(
+                    df[symbol].to_numpy(), load_data(symbol, Freq.day).Close.to_numpy()
+                )
+
+    def test_rebuilds_existing_store(self, full_store):
+        store = Store(full_store._root_dir, dense=True)
+        df = store.cross_section("Volume", start="2023-01-03", end="2023-01-31")
+        assert list(df.columns) == ["AMD", "INTC", "NVDA"]
+        np.testing.assert_array_equal(
+            df["AMD"].to_numpy(), load_data("AMD", Freq.day).Volume.to_numpy()
+        )
+
+    def test_requires_dense(self, store):
+        with pytest.raises(RuntimeError):
+            store.cross_section()
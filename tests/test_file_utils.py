@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import pytest
+
+from fin_models.file_utils import (
+    FileLocks,
+    atomic_open,
+    hold_shared_lock,
+    try_lock_exclusive,
+)
+
+
+class TestAtomicOpen:
+    def test_replaces_file(self, tmp_path):
+        filepath = str(tmp_path / "data.txt")
+        with atomic_open(filepath, "w") as f:
+            f.write("old")
+        with atomic_open(filepath, "w") as f:
+            f.write("new")
+            with open(filepath) as existing:
+                assert existing.read() == "old"
+        with open(filepath) as f:
+            assert f.read() == "new"
+        assert os.listdir(tmp_path) == ["data.txt"]
+
+    def test_error_keeps_original(self, tmp_path):
+        filepath = str(tmp_path / "data.txt")
+        with atomic_open(filepath, "w") as f:
+            f.write("old")
+        with pytest.raises(ZeroDivisionError):
+            with atomic_open(filepath, "w") as f:
+                f.write("new")
+                1 / 0
+        with open(filepath) as f:
+            assert f.read() == "old"
+        assert os.listdir(tmp_path) == ["data.txt"]
+
+
+class TestFileLocks:
+    def test_exclusive_blocks_other_threads(self, tmp_path):
+        locks = FileLocks(str(tmp_path))
+        events = []
+
+        def reader():
+            with locks.shared("AMD"):
+                events.append("read")
+
+        with locks.exclusive("AMD"):
+            thread = threading.Thread(target=reader)
+            thread.start()
+            time.sleep(0.1)
+            events.append("write")
+        thread.join()
+        assert events == ["write", "read"]
+
+    def test_shared_locks_do_not_block(self, tmp_path):
+        locks = FileLocks(str(tmp_path))
+        acquired = threading.Event()
+
+        def reader():
+            with locks.shared("AMD"):
+                acquired.set()
+
+        with locks.shared("AMD"):
+            thread = threading.Thread(target=reader)
+            thread.start()
+            assert acquired.wait(timeout=5)
+        thread.join()
+
+    def test_reentrant(self, tmp_path):
+        locks = FileLocks(str(tmp_path))
+        with locks.exclusive("AMD"):
+            with locks.shared("AMD"):
+                with locks.exclusive("AMD"):
+                    pass
+        with locks.shared("AMD"):
+            with pytest.raises(RuntimeError):
+                with locks.exclusive("AMD"):
+                    pass
+
+
+def test_hold_shared_lock(tmp_path):
+    filepath = str(tmp_path / "snapshot.lock")
+    assert try_lock_exclusive(filepath) is None  # missing
+    fd = hold_shared_lock(filepath)
+    assert try_lock_exclusive(filepath) is None
+    os.close(fd)
+    fd = try_lock_exclusive(filepath)
+    assert fd is not None
+    os.close(fd)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import load_data
+from pandas.testing import assert_frame_equal
+
+from fin_models.backends import PickleBackend
+from fin_models.compact import compact
+from fin_models.enums import Freq
+from fin_models.migrate import (
+    MIGRATION_DIR,
+    _check_state,
+    checksum,
+    dedupe,
+    migrate,
+    migrate_symbol,
+)
+from fin_models.store import Store, read_settings
+
+
+def test_migrate(full_store):
+    root_dir = full_store._root_dir
+    first_bar_utc = pd.Timestamp("2020-01-02", tz="UTC")
+    full_store._write_historical_metadata(
+        "AMD", Freq.day, load_data("AMD", Freq.day), first_bar_utc
+    )
+
+    reports = migrate(
+        root_dir, backend="parquet", layout="monthly", profile="compact", max_workers=2
+    )
+
+    assert [report["symbol"] for report in reports] == ["AMD", "INTC", "NVDA"]
+    assert read_settings(root_dir) == dict(
+        backend="parquet",
+        layout="monthly",
+        profile="compact",
+        compression="default",
+        compression_level=None,
+    )
+    assert not os.path.exists(os.path.join(root_dir, MIGRATION_DIR))
+    assert sorted(os.listdir(os.path.join(root_dir, "AMD"))) == [
+        "1min",
+        "1min.json",
+        "day.json",
+        "day.parquet",
+    ]
+
+    store = Store(root_dir)
+    assert store.settings == read_settings(root_dir)
+    for symbol in ["AMD", "INTC", "NVDA"]:
+        for freq in [Freq.min_1, Freq.day]:
+            expected = compact(load_data(symbol, freq))
+            assert_frame_equal(store.get(symbol, freq), expected, check_freq=False)
+            assert reports[0]["freqs"][freq.name]["rows"] == len(load_data("AMD", freq))
+    assert store.get_historical_metadata("AMD", Freq.day).first_bar_utc == first_bar_utc
+
+
+def test_catalog(full_store, monkeypatch):
+    root_dir = full_store._root_dir
+    Store(root_dir, catalog=True)
+    monkeypatch.setattr(
+        Store, "rebuild_catalog", lambda self: pytest.fail("rebuilt the catalog")
+    )
+
+    migrate(root_dir, profile="compact", max_workers=1)
+
+    store = Store(root_dir)
+    assert store.symbols() == ["AMD", "INTC", "NVDA"]
+    for symbol in ["AMD", "INTC", "NVDA"]:
+        for freq in [Freq.min_1, Freq.day]:
+            historical_metadata = store.get_historical_metadata(symbol, freq)
+            assert historical_metadata.num_rows == len(load_data(symbol, freq))
+            assert historical_metadata.num_bytes == os.path.getsize(
+                store._path(symbol, freq)
+            )
+
+
+def test_compact_dedupes(full_store):
+    root_dir = full_store._root_dir
+    df = load_data("AMD", Freq.day)
+    duplicates = df.iloc[[3, 5]].assign(Volume=df["Volume"].iloc[[3, 5]] + 1)
+    PickleBackend().write(full_store._path("AMD", Freq.day), pd.concat([duplicates, df]))
+
+    reports = migrate(root_dir, symbols=["AMD"], max_workers=1)
+
+    assert len(reports) == 1
+    assert reports[0]["freqs"]["day"]["source_rows"] == len(df) + 2
+    assert reports[0]["freqs"]["day"]["rows"] == len(df)
+    expected = df.copy()
+    expected.iloc[[3, 5]] = duplicates
+    assert_frame_equal(Store(root_dir).get("AMD", Freq.day), expected)
+    # a subset of symbols in the same format does not save settings
+    assert read_settings(root_dir) == {}
+
+
+def test_resume(full_store):
+    root_dir = full_store._root_dir
+    nvda_path = full_store._path("NVDA", Freq.day)
+    with open(nvda_path, "wb") as f:
+        f.write(b"corrupt")
+    with pytest.raises(RuntimeError, match="NVDA"):
+        migrate(root_dir, backend="parquet", max_workers=2)
+
+    # the other symbols were swapped in, and are not migrated again
+    amd_path = Store(root_dir, backend="parquet")._path("AMD", Freq.day)
+    assert not os.path.exists(full_store._path("AMD", Freq.day))
+    mtime_ns = os.stat(amd_path).st_mtime_ns
+    with pytest.raises(RuntimeError, match="in progress"):
+        migrate(root_dir, backend="parquet", profile="compact")
+
+    full_store._backend.write(nvda_path, load_data("NVDA", Freq.day))
+    migrate(root_dir, backend="parquet", max_workers=2)
+
+    assert os.stat(amd_path).st_mtime_ns == mtime_ns
+    store = Store(root_dir)
+    assert store.settings["backend"] == "parquet"
+    assert_frame_equal(store.get("NVDA", Freq.day), load_data("NVDA", Freq.day))
+
+
+def test_resume_interrupted_swap(full_store, monkeypatch):
+    root_dir = full_store._root_dir
+    staged_path = os.path.join(root_dir, MIGRATION_DIR, "staging", "AMD")
+    replace = os.replace
+
+    def crash(src, dst):
+        if src == staged_path:
+            raise KeyboardInterrupt
+        replace(src, dst)
+
+    settings = dict(full_store.settings, backend="parquet")
+    os.makedirs(os.path.join(root_dir, MIGRATION_DIR, "done"))
+    _check_state(os.path.join(root_dir, MIGRATION_DIR), full_store.settings, settings)
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(KeyboardInterrupt):
+        migrate_symbol(root_dir, "AMD", full_store.settings, settings)
+    monkeypatch.undo()
+    assert not os.path.exists(os.path.join(root_dir, "AMD"))
+
+    migrate(root_dir, backend="parquet", max_workers=1)
+    assert_frame_equal(Store(root_dir).get("AMD", Freq.day), load_data("AMD", Freq.day))
+
+
+def test_cannot_convert_some_symbols(full_store):
+    with pytest.raises(ValueError):
+        migrate(full_store._root_dir, backend="parquet", symbols=["AMD"])
+
+
+def test_dedupe_and_checksum():
+    df = load_data("AMD", Freq.day)
+    shuffled = pd.concat([df.iloc[10:], df.iloc[:10], df.iloc[:2].assign(Volume=0)])
+    assert_frame_equal(dedupe(shuffled), df)
+    assert checksum(dedupe(shuffled)) == checksum(df)
+    assert checksum(df) != checksum(df.assign(Close=df["Close"] + 0.01))
+    assert checksum(df) != checksum(df.rename(columns={"Close": "Last"}))
+
+
+def test_store_settings(full_store):
+    root_dir = full_store._root_dir
+    migrate(root_dir, backend="parquet", max_workers=1)
+    assert Store(root_dir).settings["backend"] == "parquet"
+    assert Store(root_dir, backend="pickle").get("AMD") is None
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import typing as t
+
+import pytest
+
+from conftest import load_data
+from pandas.testing import assert_frame_equal
+
+from fin_models.enums import Freq
+from fin_models.server import RemoteStore, StoreServer
+from fin_models.store import Store
+
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture()
+def remote_store(full_store) -> t.Generator[RemoteStore, None, None]:
+    with tempfile.TemporaryDirectory() as tempdir:
+        socket_path = os.path.join(tempdir, "store.sock")
+        server = StoreServer(
+            socket_path, Store(full_store._root_dir, cache_size=50_000_000)
+        )
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        remote_store = RemoteStore(socket_path)
+        yield remote_store
+        remote_store.close()
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_get(remote_store, full_store):
+    for freq in [Freq.min_1, Freq.min_5, Freq.day, Freq.week]:
+        assert_frame_equal(remote_store.get("AMD", freq), full_store.get("AMD", freq))
+    assert_frame_equal(
+        remote_store.get("AMD", Freq.min_1, columns=["Close"], end="2023-01-04"),
+        full_store.get("AMD", Freq.min_1, columns=["Close"], end="2023-01-04"),
+    )
+    assert_frame_equal(
+        remote_store.get("NVDA", Freq.hour, last_n=3),
+        full_store.get("NVDA", Freq.hour, last_n=3),
+    )
+    assert remote_store.get("MISSING") is None
+
+
+def test_get_many(remote_store, full_store):
+    symbols = ["AMD", "MISSING", "NVDA"]
+    data = remote_store.get_many(symbols, Freq.day)
+    assert list(data) == ["AMD", "NVDA"]
+    for symbol, df in data.items():
+        assert_frame_equal(df, load_data(symbol, Freq.day))
+
+    assert_frame_equal(
+        remote_store.get_many(symbols, Freq.min_1, columns=["Close"], panel=True),
+        full_store.get_many(symbols, Freq.min_1, columns=["Close"], panel=True),
+    )
+
+
+def test_metadata(remote_store, full_store):
+    assert remote_store.symbols() == ["AMD", "INTC", "NVDA"]
+    assert remote_store.has("AMD", Freq.week)
+    assert not remote_store.has_freq("AMD", Freq.week)
+    assert remote_store.get_historical_metadata(
+        "AMD", Freq.day
+    ) == full_store.get_historical_metadata("AMD", Freq.day)
+    assert remote_store.get_latest_dt("AMD", Freq.day) == full_store.get_latest_dt(
+        "AMD", Freq.day
+    )
+    assert remote_store.get_company_details("AMD") is None
+    assert remote_store.get_splits("AMD") == []
+
+
+def test_errors(remote_store):
+    with pytest.raises(ValueError):
+        remote_store.get("AMD", last_n=0)
+    # the connection is still usable
+    assert remote_store.has("AMD")
+
+
+def test_zero_copy(remote_store):
+    zero_copy_store = RemoteStore(remote_store.socket_path, zero_copy=True)
+    df = zero_copy_store.get("AMD")
+    assert_frame_equal(df, load_data("AMD", Freq.day))
+    assert not df["Close"].to_numpy().flags.writeable
+    zero_copy_store.close()
+
+
+def test_connection_per_thread(remote_store):
+    results = {}
+
+    def get(symbol):
+        results[symbol] = remote_store.get(symbol, Freq.min_1)
+
+    threads = [threading.Thread(target=get, args=(s,)) for s in ["AMD", "INTC", "NVDA"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for symbol, df in results.items():
+        assert_frame_equal(df, load_data(symbol, Freq.min_1))
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
+
+from conftest import load_data
+from pandas.testing import assert_frame_equal
+
+from fin_models.enums import Freq
+from fin_models.shared import SharedUniverse
+from fin_models.store import Store
+
+
+SYMBOLS = ["AMD", "INTC", "NVDA"]
+
+
+def test_shared_universe(full_store):
+    with SharedUniverse.create(full_store) as universe:
+        assert universe.symbols == SYMBOLS
+        assert "amd" in universe
+        assert universe.get("MISSING") is None
+        for symbol in SYMBOLS:
+            df = universe.get(symbol)
+            assert_frame_equal(df, load_data(symbol, Freq.day))
+            close = df["Close"].to_numpy()
+            assert np.shares_memory(close, universe._blocks[0])
+            assert not close.flags.writeable
+            with pytest.raises(ValueError):
+                df.iloc[0, 0] = 0.0
+        del df, close
+
+        assert pickle.loads(pickle.dumps(universe)) is universe
+
+
+def test_compact_columns(full_store):
+    store = Store(full_store._root_dir, profile="compact")
+    store.write("AMD", Freq.day, load_data("AMD", Freq.day))
+    columns = ["Volume", "Close"]
+    with SharedUniverse.create(
+        store, ["AMD", "NVDA"], Freq.min_1, columns=columns, end="2023-01-04"
+    ) as universe:
+        for symbol in ["AMD", "NVDA"]:
+            assert_frame_equal(
+                universe.get(symbol),
+                store.get(symbol, Freq.min_1, columns=columns, end="2023-01-04"),
+            )
+
+
+def test_empty(store):
+    with SharedUniverse.create(store) as universe:
+        assert len(universe) == 0
+        assert universe.get("AMD") is None
+
+
+def _last_close(universe: SharedUniverse, symbol: str) -> float:
+    return float(universe.get(symbol)["Close"].iloc[-1])
+
+
+def test_workers(full_store):
+    ctx = multiprocessing.get_context("fork")
+    with SharedUniverse.create(full_store) as universe:
+        with ctx.Pool(2) as pool:
+            closes = pool.starmap(_last_close, [(universe, s) for s in SYMBOLS])
+
+    assert closes == [load_data(s, Freq.day)["Close"].iloc[-1] for s in SYMBOLS]
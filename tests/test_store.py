@@ -1,55 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
 import os.path
+import pickle
+import shutil
 import tempfile
+import threading
 import typing as t
+import zlib
 
+import numpy as np
 import pandas as pd
 import pytest
 
+from conftest import load_data
 from pandas.testing import assert_frame_equal, assert_series_equal
 
+from fin_models.backends import (
+    CODECS,
+    Codec,
+    ParquetBackend,
+    PickleBackend,
+    _select_row_groups,
+    get_backend,
+)
+from fin_models.date_utils import EASTERN_TZ
 from fin_models.enums import Freq
-from fin_models.store import Store
-
-
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-
-
-@pytest.fixture()
-def store() -> t.Generator[Store, None, None]:
-    with tempfile.TemporaryDirectory() as tempdir:
-        yield Store(tempdir)
-
-
-@pytest.fixture()
-def full_store() -> t.Generator[Store, None, None]:
-    with tempfile.TemporaryDirectory() as tempdir:
-        store = Store(tempdir)
-        store.write("AMD", Freq.min_1, load_data("AMD", Freq.min_1))
-        store.write("INTC", Freq.min_1, load_data("INTC", Freq.min_1))
-        store.write("NVDA", Freq.min_1, load_data("NVDA", Freq.min_1))
-        store.write("AMD", Freq.day, load_data("AMD", Freq.day))
-        store.write("INTC", Freq.day, load_data("INTC", Freq.day))
-        store.write("NVDA", Freq.day, load_data("NVDA", Freq.day))
-        yield store
-
-
-def _get_filepath(symbol, freq: Freq) -> str:
-    filename = f"{symbol}.{freq.value if freq < Freq.day else freq.name}.json"
-    filepath = os.path.join(DATA_DIR, filename)
-    return filepath
-
-
-def save_data(symbol, freq: Freq, df: pd.DataFrame):
-    df.to_json(_get_filepath(symbol, freq), orient="split")
-
-
-def load_data(symbol, freq: Freq) -> pd.DataFrame:
-    df = pd.read_json(_get_filepath(symbol, freq), orient="split")
-    df.index = df.index.tz_localize("UTC").tz_convert("America/New_York")  # type: ignore
-    df.index.name = "Epoch"
-    return df[["Open", "High", "Low", "Close", "Volume"]]
+from fin_models.store import Store, _merge_bars, _size, read_settings, save_settings
 
 
 class TestEmptyStore:
@@ -168,3 +146,1193 @@ class TestStoreWithData:
                 index="Epoch",
             ),
         )
+
+
+class TestDateRange:
+    def test_get_start_end(self, full_store):
+        expected = load_data("AMD", Freq.day)
+        df = full_store.get("AMD", Freq.day, start="2023-01-10", end="2023-01-20")
+        assert_frame_equal(df, expected.loc["2023-01-10":"2023-01-20"])
+        assert df.index[0].day == 10 and df.index[-1].day == 20
+
+    def test_get_end_date_is_inclusive(self, full_store):
+        expected = load_data("AMD", Freq.min_1)
+        end_date = expected.index[-1].date()
+        df = full_store.get("AMD", Freq.min_1, start=end_date, end=end_date)
+        assert_frame_equal(df, expected.loc[str(end_date)])
+
+    def test_get_empty_range_returns_none(self, full_store):
+        assert full_store.get("AMD", Freq.day, end="1990-01-01") is None
+
+
+class TestLastN:
+    @pytest.mark.parametrize("layout", ["single", "monthly"])
+    def test_get_last_n(self, layout):
+        expected = load_data("AMD", Freq.min_1)
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, backend=PickleBackend(chunk_size=1_000), layout=layout)
+            store.write("AMD", Freq.min_1, expected)
+            assert_frame_equal(
+                store.get("AMD", Freq.min_1, last_n=2_500), expected.iloc[-2_500:]
+            )
+
+            end = expected.index[-3_000]
+            assert_frame_equal(
+                store.get("AMD", Freq.min_1, end=end, last_n=100),
+                expected.loc[:end].iloc[-100:],
+            )
+
+    def test_get_last_n_more_than_stored(self, full_store):
+        expected = load_data("AMD", Freq.day)
+        assert_frame_equal(full_store.get("AMD", Freq.day, last_n=10_000), expected)
+
+    @pytest.mark.parametrize(
+        "freq, source_freq",
+        [
+            (Freq.min_5, Freq.min_1),
+            (Freq.hour, Freq.min_1),
+            (Freq.week, Freq.day),
+            (Freq.month, Freq.day),
+        ],
+    )
+    def test_get_last_n_aggregated(self, full_store, freq, source_freq):
+        expected = Store.agg(load_data("AMD", source_freq), freq)
+        assert_frame_equal(full_store.get("AMD", freq, last_n=3), expected.iloc[-3:])
+
+    @pytest.mark.parametrize("freq", [Freq.week, Freq.month, Freq.quarter, Freq.year])
+    def test_get_last_n_aggregated_reads_recent_bars(self, store, freq, monkeypatch):
+        index = pd.bdate_range("2000-01-03", periods=5_000, tz="America/New_York")
+        close = np.linspace(10, 100, len(index))
+        daily = pd.DataFrame(
+            {
+                "Open": close,
+                "High": close + 1,
+                "Low": close - 1,
+                "Close": close,
+                "Volume": np.arange(len(index)) + 1_000,
+            },
+            index=index.rename("Epoch"),
+        )
+        store.write("AMD", Freq.day, daily)
+
+        read = store._read
+        num_rows = []
+
+        def spy_read(*args, **kwargs):
+            df = read(*args, **kwargs)
+            num_rows.append(len(df))
+            return df
+
+        monkeypatch.setattr(store, "_read", spy_read)
+        assert_frame_equal(
+            store.get("AMD", freq, last_n=2), Store.agg(daily, freq).iloc[-2:]
+        )
+        if freq < Freq.year:
+            assert max(num_rows) < len(daily)
+
+    def test_agg_last_n(self):
+        df = load_data("AMD", Freq.min_1)
+        expected = Store.agg(df, Freq.hour)
+        assert_frame_equal(Store.agg(df, Freq.hour, last_n=20), expected.iloc[-20:])
+
+    def test_agg_start_end(self):
+        df = load_data("AMD", Freq.min_1)
+        expected = Store.agg(df.loc["2023-01-10":"2023-01-12"], Freq.day)
+        assert_frame_equal(
+            Store.agg(df, Freq.day, start="2023-01-10", end="2023-01-12"), expected
+        )
+
+    @pytest.mark.parametrize("last_n", [0, -1, 1.5])
+    def test_invalid_last_n(self, full_store, last_n):
+        with pytest.raises(ValueError):
+            full_store.get("AMD", Freq.day, last_n=last_n)
+
+
+class TestCompactProfile:
+    @pytest.fixture()
+    def compact_store(self) -> t.Generator[Store, None, None]:
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, profile="compact")
+            store.write("AMD", Freq.min_1, load_data("AMD", Freq.min_1))
+            yield store
+
+    def test_write_and_get(self, compact_store):
+        df = compact_store.get("AMD", Freq.min_1)
+        assert list(df.dtypes) == [np.float32] * 4 + [np.uint32]
+        expected = load_data("AMD", Freq.min_1)
+        np.testing.assert_allclose(df.to_numpy(np.float64), expected.to_numpy(), 1e-7)
+
+    def test_agg(self, compact_store):
+        df = compact_store.get("AMD", Freq.hour)
+        assert list(df.dtypes) == [np.float32] * 4 + [np.uint32]
+        expected = Store.agg(load_data("AMD", Freq.min_1), Freq.hour)
+        np.testing.assert_allclose(df.to_numpy(np.float64), expected.to_numpy(), 1e-7)
+
+    def test_append_widens_volume(self, compact_store):
+        bars = load_data("AMD", Freq.min_1).iloc[-1:].copy()
+        bars.index = bars.index + pd.Timedelta(days=1)
+        bars["Volume"] = 2**33
+        compact_store.write("AMD", Freq.min_1, bars)
+        df = compact_store.get("AMD", Freq.min_1)
+        assert df["Volume"].dtype == np.uint64
+        assert df["Volume"].iloc[-1] == 2**33
+
+    def test_unknown_profile(self, store):
+        with pytest.raises(ValueError):
+            Store(store._root_dir, profile="tiny")
+
+
+def _write_shard(root_dir: str, symbol: str) -> None:
+    store = Store(root_dir)
+    store.write(symbol, Freq.min_1, load_data(symbol, Freq.min_1))
+    # every worker also writes (and merges) the same daily bars
+    store.write("AMD", Freq.day, load_data("AMD", Freq.day))
+
+
+class TestConcurrentWrites:
+    def test_sharded_writes_from_processes(self, store):
+        symbols = ["AMD", "INTC", "NVDA"]
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(len(symbols)) as pool:
+            pool.starmap(_write_shard, [(store._root_dir, symbol) for symbol in symbols])
+
+        for symbol in symbols:
+            expected = load_data(symbol, Freq.min_1)
+            assert_frame_equal(store.get(symbol, Freq.min_1), expected)
+            historical_metadata = store.get_historical_metadata(symbol, Freq.min_1)
+            assert historical_metadata.latest_bar_utc == expected.index[-1]
+        assert_frame_equal(store.get("AMD", Freq.day), load_data("AMD", Freq.day))
+
+    def test_reads_during_writes(self, store):
+        expected = load_data("AMD", Freq.min_1)
+        store.write("AMD", Freq.min_1, expected.iloc[:1_000])
+
+        def writer():
+            for lo in range(1_000, len(expected), 1_000):
+                store.write("AMD", Freq.min_1, expected.iloc[lo : lo + 1_000])
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        while thread.is_alive():
+            df = store.get("AMD", Freq.min_1)
+            assert_frame_equal(df, expected.iloc[: len(df)])
+        thread.join()
+        assert_frame_equal(store.get("AMD", Freq.min_1), expected)
+
+
+def _tree(root_dir: str) -> dict[str, int]:
+    return {
+        os.path.join(dirpath, name): os.stat(os.path.join(dirpath, name)).st_mtime_ns
+        for dirpath, dirnames, filenames in os.walk(root_dir)
+        for name in dirnames + filenames
+    }
+
+
+class TestReadOnly:
+    def test_reads_have_no_side_effects(self, full_store):
+        before = _tree(full_store._root_dir)
+        store = Store(full_store._root_dir, read_only=True, materialize=[Freq.hour])
+        assert store.symbols() == ["AMD", "INTC", "NVDA"]
+        assert store.symbols(Freq.min_1) == ["AMD", "INTC", "NVDA"]
+        assert store.has_freq("AMD", Freq.day)
+        assert not store.has_freq("TSLA", Freq.day)
+        assert store.get("TSLA") is None
+        assert store.get_company_details("AMD") is None
+        assert_frame_equal(store.get("AMD", Freq.day), load_data("AMD", Freq.day))
+        assert_frame_equal(
+            store.get("AMD", Freq.hour),
+            Store.agg(load_data("AMD", Freq.min_1), Freq.hour),
+        )
+        assert _tree(full_store._root_dir) == before
+
+    def test_missing_root_dir(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            root_dir = os.path.join(tempdir, "missing")
+            store = Store(root_dir, read_only=True)
+            assert store.symbols() == []
+            assert store.get("AMD") is None
+            assert not os.path.exists(root_dir)
+
+    def test_writes_raise(self, full_store):
+        store = Store(full_store._root_dir, read_only=True)
+        with pytest.raises(RuntimeError):
+            store.write("AMD", Freq.day, load_data("AMD", Freq.day))
+        with pytest.raises(RuntimeError):
+            store._delete_all("AMD")
+
+    def test_listing_is_cached_until_refresh(self, full_store):
+        store = Store(full_store._root_dir, read_only=True)
+        assert not store.has("TSLA")
+        full_store.write("TSLA", Freq.day, load_data("AMD", Freq.day))
+        assert not store.has("TSLA")
+        store.refresh()
+        assert store.has("TSLA")
+        assert "TSLA" in store.symbols(Freq.day)
+
+    def test_catalog_and_dense(self, full_store):
+        Store(full_store._root_dir, catalog=True, dense=True)
+        before = _tree(full_store._root_dir)
+        store = Store(full_store._root_dir, read_only=True, catalog=True, dense=True)
+        assert store.symbols(Freq.day) == ["AMD", "INTC", "NVDA"]
+        close = store.cross_section("Close", end="2023-01-31")
+        assert (
+            close["AMD"].dropna().tolist() == load_data("AMD", Freq.day)["Close"].tolist()
+        )
+        assert _tree(full_store._root_dir) == before
+
+    def test_missing_catalog_raises(self, full_store):
+        with pytest.raises(RuntimeError):
+            Store(full_store._root_dir, read_only=True, catalog=True)
+
+
+class TestPickleBackend:
+    @pytest.fixture()
+    def df(self) -> pd.DataFrame:
+        return load_data("AMD", Freq.min_1)
+
+    def test_round_trip(self, df, tmp_path):
+        backend = PickleBackend(chunk_size=1_000)
+        filepath = str(tmp_path / "bars.pickle")
+        backend.write(filepath, df)
+        assert os.path.exists(f"{filepath}.idx")
+        assert_frame_equal(backend.read(filepath), df)
+
+    def test_single_chunk_is_a_plain_pickle(self, df, tmp_path):
+        filepath = str(tmp_path / "bars.pickle")
+        PickleBackend().write(filepath, df)
+        assert_frame_equal(pd.read_pickle(filepath), df)
+
+    def test_only_reads_overlapping_chunks(self, df, tmp_path, monkeypatch):
+        backend = PickleBackend(chunk_size=1_000)
+        filepath = str(tmp_path / "bars.pickle")
+        backend.write(filepath, df)
+
+        num_loads = 0
+        loads = pickle.loads
+
+        def counting_loads(data):
+            nonlocal num_loads
+            num_loads += 1
+            return loads(data)
+
+        monkeypatch.setattr("fin_models.backends.pickle.loads", counting_loads)
+        start, end = df.index[2_500], df.index[3_500]
+        assert_frame_equal(
+            backend.read(filepath, start=start, end=end), df.loc[start:end]
+        )
+        assert num_loads == 2
+
+        num_loads = 0
+        assert_frame_equal(backend.read(filepath, last_n=10), df.iloc[-10:])
+        assert num_loads == 1
+
+    def test_legacy_file_without_index(self, df, tmp_path):
+        filepath = str(tmp_path / "bars.pickle")
+        df.to_pickle(filepath)
+        start, end = df.index[100], df.index[200]
+        assert_frame_equal(
+            PickleBackend().read(filepath, start=start, end=end), df.loc[start:end]
+        )
+
+    def test_stale_index_is_ignored(self, df, tmp_path):
+        backend = PickleBackend(chunk_size=1_000)
+        filepath = str(tmp_path / "bars.pickle")
+        backend.write(filepath, df)
+        df.iloc[:10].to_pickle(filepath)
+        assert_frame_equal(backend.read(filepath), df.iloc[:10])
+
+    def test_empty_range(self, df, tmp_path):
+        backend = PickleBackend(chunk_size=1_000)
+        filepath = str(tmp_path / "bars.pickle")
+        backend.write(filepath, df)
+        empty = backend.read(filepath, end=pd.Timestamp("2000-01-01", tz="UTC"))
+        assert empty.empty and list(empty.columns) == list(df.columns)
+
+    def test_append_with_equivalent_timezone(self, df, tmp_path):
+        backend = PickleBackend()
+        filepath = str(tmp_path / "bars.pickle")
+        backend.write(filepath, df.iloc[:100])
+        bars = df.iloc[100:]
+        bars.index = bars.index.tz_convert(EASTERN_TZ)  # zoneinfo rather than pytz
+        result = backend.append(filepath, bars)
+        assert result.index.dtype == df.index.dtype
+        assert_frame_equal(backend.read(filepath), df)
+
+    def test_append(self, df, tmp_path, monkeypatch):
+        backend = PickleBackend(chunk_size=1_000)
+        filepath = str(tmp_path / "bars.pickle")
+        backend.write(filepath, df.iloc[:2_500])
+        with open(filepath, "rb") as f:
+            full_chunks = f.read(backend._read_index(filepath)[1, 3])
+
+        num_loads = 0
+        loads = pickle.loads
+
+        def counting_loads(data):
+            nonlocal num_loads
+            num_loads += 1
+            return loads(data)
+
+        monkeypatch.setattr("fin_models.backends.pickle.loads", counting_loads)
+        monkeypatch.setattr(backend, "write", lambda *args: pytest.fail("rewritten"))
+        # fills the last chunk, then adds one
+        for lo, hi in [(2_500, 3_000), (3_000, 3_100)]:
+            num_loads = 0
+            assert_frame_equal(backend.append(filepath, df.iloc[lo:hi]), df.iloc[lo:hi])
+            assert num_loads == 1
+
+        monkeypatch.undo()
+        assert_frame_equal(backend.read(filepath), df.iloc[:3_100])
+        assert_frame_equal(backend.read(filepath, last_n=150), df.iloc[2_950:3_100])
+        assert len(backend._read_index(filepath)) == 4
+        with open(filepath, "rb") as f:
+            assert f.read(len(full_chunks)) == full_chunks
+
+    def test_interrupted_append(self, df, tmp_path, monkeypatch):
+        backend = PickleBackend(chunk_size=100)
+        filepath = str(tmp_path / "bars.pickle")
+        backend.write(filepath, df.iloc[:250])
+        write_chunks = backend._write_chunks
+
+        def interrupted_write_chunks(f, bars):
+            write_chunks(f, bars.iloc[:100])
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(backend, "_write_chunks", interrupted_write_chunks)
+        with pytest.raises(KeyboardInterrupt):
+            backend.append(filepath, df.iloc[250:350])
+        monkeypatch.undo()
+
+        assert_frame_equal(backend.read(filepath), df.iloc[:250])
+        assert_frame_equal(backend.read(filepath, last_n=10), df.iloc[240:250])
+        assert sorted(os.listdir(tmp_path)) == ["bars.pickle", "bars.pickle.idx"]
+        backend.append(filepath, df.iloc[250:350])
+        assert_frame_equal(backend.read(filepath), df.iloc[:350])
+
+    def test_delete_removes_index(self, full_store):
+        filepath = full_store._path("AMD", Freq.day)
+        full_store._delete_freq("AMD", Freq.day)
+        assert not os.path.exists(filepath)
+        assert not os.path.exists(f"{filepath}.idx")
+
+
+class _ZlibCodec(Codec):
+    name = "zlib"
+    id = b"Z"
+    module = "zlib"
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        return zlib.compress(data, -1 if level is None else level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class TestCompression:
+    @pytest.fixture()
+    def df(self) -> pd.DataFrame:
+        return load_data("AMD", Freq.min_1)
+
+    @pytest.fixture(autouse=True)
+    def zlib_codec(self, monkeypatch):
+        monkeypatch.setitem(CODECS, "zlib", _ZlibCodec())
+
+    def test_round_trip(self, df, tmp_path):
+        backend = PickleBackend(chunk_size=1_000, compression="zlib")
+        filepath = str(tmp_path / "bars.pickle")
+        backend.write(filepath, df)
+        assert_frame_equal(backend.read(filepath), df)
+        start, end = df.index[2_500], df.index[3_500]
+        assert_frame_equal(backend.read(filepath, start=start, end=end), df[start:end])
+        assert_frame_equal(backend.read(filepath, last_n=10), df.iloc[-10:])
+
+        # without the index
+        os.remove(f"{filepath}.idx")
+        assert_frame_equal(backend.read(filepath), df)
+
+        uncompressed = str(tmp_path / "uncompressed.pickle")
+        PickleBackend(chunk_size=1_000).write(uncompressed, df)
+        assert os.path.getsize(filepath) < os.path.getsize(uncompressed) / 2
+
+    @pytest.mark.parametrize("compression", ["lz4", "zstd"])
+    def test_codecs(self, df, tmp_path, compression):
+        pytest.importorskip(CODECS[compression].module)
+        filepath = str(tmp_path / "bars.pickle")
+        PickleBackend(chunk_size=1_000, compression=compression).write(filepath, df)
+        assert_frame_equal(PickleBackend().read(filepath), df)
+
+    def test_errors(self, tmp_path):
+        with pytest.raises(ValueError):
+            PickleBackend(compression="gzip")
+        with pytest.raises(ValueError):
+            ParquetBackend(compression="gzip")
+        for compression in ["default", "none"]:
+            with pytest.raises(ValueError):
+                get_backend("parquet", compression, compression_level=3)
+            with pytest.raises(ValueError):
+                Store(str(tmp_path), compression=compression, compression_level=3)
+
+    def test_store_setting(self, df):
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir)
+            store.write("AMD", Freq.min_1, df)
+            save_settings(tempdir, dict(compression="zlib", compression_level=9))
+
+            compressed = Store(tempdir)
+            assert compressed.settings["compression"] == "zlib"
+            assert compressed.settings["compression_level"] == 9
+            compressed.write("AMD", Freq.day, load_data("AMD", Freq.day))
+            with open(compressed._path("AMD", Freq.day), "rb") as f:
+                assert f.read(4) == b"FMZZ"
+            # both compressed and uncompressed files are readable
+            assert_frame_equal(compressed.get("AMD", Freq.min_1), df)
+            assert_frame_equal(compressed.get("AMD"), load_data("AMD", Freq.day))
+            assert (
+                Store(tempdir, compression="none").settings["compression_level"] is None
+            )
+            assert Store(tempdir, compression_level=5).settings["compression_level"] == 5
+
+    def test_instrumented_store_setting(self, tmp_path):
+        store = Store(str(tmp_path), compression="zlib", compression_level=5, stats=True)
+        assert store.settings["compression"] == "zlib"
+        assert store.settings["compression_level"] == 5
+
+    @pytest.mark.parametrize("compression", ["none", "lz4", "zstd"])
+    def test_parquet(self, df, tmp_path, compression):
+        pq = pytest.importorskip("pyarrow.parquet")
+        filepath = str(tmp_path / "bars.parquet")
+        ParquetBackend(compression=compression).write(filepath, df)
+        assert_frame_equal(ParquetBackend().read(filepath), df)
+        codec = pq.ParquetFile(filepath).metadata.row_group(0).column(0).compression
+        assert codec == {"none": "UNCOMPRESSED"}.get(compression, compression.upper())
+
+
+class TestParquetBackend:
+    @pytest.fixture()
+    def parquet_store(self) -> t.Generator[Store, None, None]:
+        pytest.importorskip("pyarrow")
+        with tempfile.TemporaryDirectory() as tempdir:
+            yield Store(tempdir, backend=ParquetBackend(row_group_size=1_000))
+
+    def test_write_and_get(self, parquet_store):
+        for freq in [Freq.min_1, Freq.day]:
+            expected = load_data("AMD", freq)
+            parquet_store.write("AMD", freq, expected)
+            filepath = parquet_store._path("AMD", freq)
+            assert filepath.endswith(".parquet") and os.path.exists(filepath)
+            assert_frame_equal(parquet_store.get("AMD", freq), expected)
+
+    def test_get_columns_and_range(self, parquet_store):
+        expected = load_data("AMD", Freq.min_1)
+        parquet_store.write("AMD", Freq.min_1, expected)
+
+        start, end = expected.index[2_500], expected.index[3_500]
+        df = parquet_store.get("AMD", Freq.min_1, columns=["Close"], start=start, end=end)
+        assert_frame_equal(df, expected.loc[start:end, ["Close"]])
+
+    def test_row_groups_are_pruned(self, parquet_store):
+        import pyarrow.parquet as pq
+
+        expected = load_data("AMD", Freq.min_1)
+        parquet_store.write("AMD", Freq.min_1, expected)
+
+        pf = pq.ParquetFile(parquet_store._path("AMD", Freq.min_1))
+        start, end = expected.index[2_500], expected.index[3_500]
+        assert _select_row_groups(pf, "Epoch", start, end) == [2, 3]
+
+    def test_last_n(self, parquet_store):
+        expected = load_data("AMD", Freq.min_1)
+        parquet_store.write("AMD", Freq.min_1, expected)
+        df = parquet_store.get("AMD", Freq.min_1, columns=["Close"], last_n=1_500)
+        assert_frame_equal(df, expected[["Close"]].iloc[-1_500:])
+
+    def test_agg(self, parquet_store):
+        parquet_store.write("AMD", Freq.min_1, load_data("AMD", Freq.min_1))
+        expected = Store.agg(load_data("AMD", Freq.min_1), Freq.hour)
+        assert_frame_equal(parquet_store.get("AMD", Freq.hour), expected)
+
+
+class TestMonthlyLayout:
+    @pytest.fixture()
+    def monthly_store(self) -> t.Generator[Store, None, None]:
+        with tempfile.TemporaryDirectory() as tempdir:
+            yield Store(tempdir, layout="monthly")
+
+    @pytest.fixture()
+    def two_months(self) -> pd.DataFrame:
+        january = load_data("AMD", Freq.min_1)
+        february = january.copy()
+        february.index = february.index + pd.Timedelta(days=31)
+        return pd.concat([january, february])
+
+    def test_write_and_get(self, monthly_store, two_months):
+        monthly_store.write("AMD", Freq.min_1, two_months)
+
+        assert monthly_store._partitions("AMD", Freq.min_1) == [202301, 202302, 202303]
+        assert monthly_store.has_freq("AMD", Freq.min_1)
+        assert monthly_store.symbols(Freq.min_1) == ["AMD"]
+        assert_frame_equal(monthly_store.get("AMD", Freq.min_1), two_months)
+
+        historical_metadata = monthly_store.get_historical_metadata("AMD", Freq.min_1)
+        assert historical_metadata.first_bar_dt == two_months.index[0]
+        assert historical_metadata.latest_bar_dt == two_months.index[-1]
+
+    def test_daily_bars_are_not_partitioned(self, monthly_store):
+        expected = load_data("AMD", Freq.day)
+        monthly_store.write("AMD", Freq.day, expected)
+        assert os.path.isfile(monthly_store._path("AMD", Freq.day))
+        assert_frame_equal(monthly_store.get("AMD", Freq.day), expected)
+
+    def test_append_only_rewrites_touched_partitions(self, monthly_store, two_months):
+        january = two_months.loc[:"2023-01-31"]
+        monthly_store.write("AMD", Freq.min_1, two_months.iloc[:-100])
+        january_mtime = os.stat(
+            monthly_store._partition_path("AMD", Freq.min_1, 202301)
+        ).st_mtime_ns
+
+        written = monthly_store.write("AMD", Freq.min_1, two_months.iloc[-100:])
+        assert written.index[0] >= pd.Timestamp("2023-03-01", tz="America/New_York")
+        assert january_mtime == (
+            os.stat(monthly_store._partition_path("AMD", Freq.min_1, 202301)).st_mtime_ns
+        )
+        assert_frame_equal(monthly_store.get("AMD", Freq.min_1), two_months)
+        assert_frame_equal(
+            monthly_store.get("AMD", Freq.min_1, end="2023-01-31"), january
+        )
+
+    def test_get_only_reads_overlapping_partitions(
+        self, monthly_store, two_months, monkeypatch
+    ):
+        monthly_store.write("AMD", Freq.min_1, two_months)
+
+        read_paths = []
+        read = monthly_store._backend.read
+
+        def spy(filepath, **kwargs):
+            read_paths.append(filepath)
+            return read(filepath, **kwargs)
+
+        monkeypatch.setattr(monthly_store._backend, "read", spy)
+        df = monthly_store.get("AMD", Freq.min_1, start="2023-03-01")
+        assert_frame_equal(df, two_months.loc["2023-03-01":])
+        assert read_paths == [monthly_store._partition_path("AMD", Freq.min_1, 202303)]
+
+    def test_delete_freq(self, monthly_store, two_months):
+        monthly_store.write("AMD", Freq.min_1, two_months)
+        monthly_store._delete_freq("AMD", Freq.min_1)
+        assert not monthly_store.has_freq("AMD", Freq.min_1)
+
+
+class TestMergeBars:
+    def test_keeps_higher_volume_bars(self):
+        old = load_data("AMD", Freq.min_1).iloc[:1_000]
+        bars = old.iloc[500:].copy()
+        bars["Close"] += 1
+        bars["Volume"] = np.where(np.arange(len(bars)) % 2, bars["Volume"] + 1, 0)
+        bars = pd.concat([bars, load_data("AMD", Freq.min_1).iloc[1_000:1_100]])
+
+        merged = _merge_bars(old, bars)
+
+        overlap = old.index[500:]
+        use_new = bars.loc[overlap, "Volume"] > old.loc[overlap, "Volume"]
+        expected = pd.concat(
+            [
+                old.iloc[:500],
+                bars.loc[overlap].where(use_new, old.loc[overlap]),
+                bars.iloc[500:],
+            ]
+        )
+        assert_frame_equal(merged, expected)
+
+    def test_write_overlap_preserves_dtypes(self, store):
+        df = load_data("AMD", Freq.min_1)
+        store.write("AMD", Freq.min_1, df.iloc[:1_000])
+        store.write("AMD", Freq.min_1, df.iloc[500:])
+        assert_frame_equal(store.get("AMD", Freq.min_1), df)
+
+
+class TestAppend:
+    @pytest.mark.parametrize("layout", ["single", "monthly"])
+    def test_append_skips_merge(self, layout, monkeypatch):
+        df = load_data("AMD", Freq.min_1)
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, layout=layout)
+            store.write("AMD", Freq.min_1, df.iloc[:10_000])
+
+            def fail(*args, **kwargs):
+                raise AssertionError("append should not merge")
+
+            monkeypatch.setattr("fin_models.store._merge_bars", fail)
+            monkeypatch.setattr(store, "get", fail)
+            store.write("AMD", Freq.min_1, df.iloc[10_000:])
+            monkeypatch.undo()
+
+            assert_frame_equal(store.get("AMD", Freq.min_1), df)
+            historical_metadata = store.get_historical_metadata("AMD", Freq.min_1)
+            assert historical_metadata.first_bar_dt == df.index[0]
+            assert historical_metadata.latest_bar_dt == df.index[-1]
+            assert historical_metadata.Close == df.Close.iloc[-1]
+
+    def test_overlap_is_not_an_append(self, store, monkeypatch):
+        df = load_data("AMD", Freq.day)
+        store.write("AMD", Freq.day, df.iloc[:10])
+        monkeypatch.setattr(
+            store, "_append", lambda *a: pytest.fail("overlap should be merged")
+        )
+        store.write("AMD", Freq.day, df.iloc[9:])
+        assert_frame_equal(store.get("AMD", Freq.day), df)
+
+    @pytest.mark.parametrize("layout", ["single", "monthly"])
+    def test_returns_bars_as_written(self, layout):
+        df = load_data("AMD", Freq.min_1)
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, layout=layout)
+            # new, appended, then merged (with higher volume) bars
+            assert_frame_equal(
+                store.write("AMD", Freq.min_1, df.iloc[:1_000]), df.iloc[:1_000]
+            )
+            assert_frame_equal(
+                store.write("AMD", Freq.min_1, df.iloc[1_000:2_000]),
+                df.iloc[1_000:2_000],
+            )
+            bars = df.iloc[500:600].copy()
+            bars.loc[bars.index[::2], "Volume"] += 1
+            expected = store.get("AMD", Freq.min_1).iloc[500:600]
+            expected.loc[expected.index[::2]] = bars.loc[bars.index[::2]]
+            assert_frame_equal(store.write("AMD", Freq.min_1, bars), expected)
+            assert store.write("AMD", Freq.min_1, df.iloc[:0]).empty
+
+
+class TestGetMany:
+    def test_get_many(self, full_store):
+        data = full_store.get_many(["AMD", "MISSING", "NVDA"], Freq.day)
+        assert list(data) == ["AMD", "NVDA"]
+        for symbol, df in data.items():
+            assert_frame_equal(df, load_data(symbol, Freq.day))
+
+    def test_get_many_panel(self, full_store):
+        symbols = ["AMD", "INTC", "NVDA"]
+        panel = full_store.get_many(
+            symbols, Freq.min_1, columns=["Close", "Volume"], panel=True
+        )
+        assert list(panel.columns.get_level_values(0).unique()) == symbols
+        assert panel.index.is_monotonic_increasing
+        for symbol in symbols:
+            expected = load_data(symbol, Freq.min_1)[["Close", "Volume"]]
+            assert_frame_equal(
+                panel[symbol].dropna(how="all"),
+                expected,
+                check_dtype=False,
+                check_freq=False,
+            )
+
+    def test_get_many_panel_empty(self, store):
+        panel = store.get_many(["AMD"], panel=True)
+        assert panel.empty
+
+
+class TestAsync:
+    def test_awrite_many_and_aget_many(self, store):
+        symbols = ["AMD", "INTC", "NVDA"]
+        data = {symbol: load_data(symbol, Freq.day) for symbol in symbols}
+
+        async def main():
+            written = await store.awrite_many(data, Freq.day)
+            return written, await store.aget_many([*symbols, "MISSING"], Freq.day)
+
+        written, frames = asyncio.run(main())
+        assert list(frames) == symbols
+        for symbol in symbols:
+            assert_frame_equal(written[symbol], data[symbol])
+            assert_frame_equal(frames[symbol], data[symbol])
+
+    def test_per_symbol_order(self, store):
+        expected = load_data("AMD", Freq.min_1)
+        chunks = [expected.iloc[lo : lo + 500] for lo in range(0, 3_000, 500)]
+        written = []
+        store.add_write_hook(
+            lambda symbol, freq, bars: written.append(bars.index[0])
+            if symbol == "AMD"
+            else None
+        )
+
+        async def main():
+            return await asyncio.gather(
+                *(store.awrite("AMD", Freq.min_1, chunk) for chunk in chunks[:3]),
+                store.aget("AMD", Freq.min_1),
+                *(store.awrite("AMD", Freq.min_1, chunk) for chunk in chunks[3:]),
+                store.awrite("NVDA", Freq.day, load_data("NVDA", Freq.day)),
+            )
+
+        results = asyncio.run(main())
+        assert written == [chunk.index[0] for chunk in chunks]
+        assert_frame_equal(results[3], expected.iloc[:1_500])
+        assert_frame_equal(store.get("AMD", Freq.min_1), expected.iloc[:3_000])
+
+    def test_cancelled_write_completes(self, store):
+        df = load_data("AMD", Freq.day)
+
+        async def main():
+            task = asyncio.create_task(store.awrite("AMD", Freq.day, df))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await store.aget("AMD", Freq.day)
+
+        assert_frame_equal(asyncio.run(main()), df)
+        store.close()
+
+    def test_aclose_waits_for_pending(self, store):
+        df = load_data("AMD", Freq.day)
+
+        async def main():
+            tasks = [
+                asyncio.ensure_future(store.awrite("AMD", Freq.day, bars))
+                for bars in [df.iloc[:100], df.iloc[100:]]
+            ]
+            await asyncio.sleep(0)
+            await store.aclose()
+            return await asyncio.gather(*tasks)
+
+        written = asyncio.run(main())
+        assert_frame_equal(written[1], df.iloc[100:])
+        assert store._executor is None
+        assert_frame_equal(store.get("AMD", Freq.day), df)
+
+
+class TestStats:
+    def test_disabled(self, store):
+        assert store.get.__func__ is Store.get
+        assert type(store._backend) is PickleBackend
+        with pytest.raises(RuntimeError):
+            store.stats()
+
+    def test_stats(self):
+        events = []
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(
+                tempdir,
+                cache_size=50_000_000,
+                observer=lambda *event: events.append(event),
+            )
+            store.write("AMD", Freq.min_1, load_data("AMD", Freq.min_1))
+            df = store.get("AMD", Freq.hour)
+            store.get("AMD", Freq.hour)
+            assert store.get("MISSING") is None
+            stats = store.stats(reset=True)
+
+        assert stats["calls"] == {
+            "write": 1,
+            "write_file": 1,
+            "write_metadata": 1,
+            "get": 3,
+            "source_freq": 3,
+            "read_file": 1,
+            "agg": 1,
+        }
+        assert set(stats["seconds"]) == set(stats["calls"])
+        assert stats["rows_returned"] == 2 * len(df)
+        assert stats["bytes_read"] > 0
+        assert stats["bytes_written"] > 0
+        # from the hour down to the minute twice, then from the day for MISSING
+        assert stats["source_freq_probes"] == 2 * 7 + 8
+        assert (stats["cache_hits"], stats["cache_misses"]) == (1, 1)
+        assert [event[0] for event in events].count("get") == 3
+        assert ("get", events[-1][1], {"rows_returned": 0}) == events[-1]
+        assert store.stats()["calls"] == {}
+
+    def test_append_bytes_written(self):
+        df = load_data("AMD", Freq.min_1)
+        events = []
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, observer=lambda *event: events.append(event))
+            store.write("AMD", Freq.min_1, df.iloc[:-1])
+            size = os.path.getsize(store._path("AMD", Freq.min_1))
+            store.write("AMD", Freq.min_1, df.iloc[-1:])
+            growth = os.path.getsize(store._path("AMD", Freq.min_1)) - size
+
+        counters = [event[2] for event in events if event[0] == "append_file"]
+        assert counters == [{"bytes_written": growth}]
+        assert 0 < growth < size
+
+
+class TestCache:
+    @pytest.fixture()
+    def cached_store(self) -> t.Generator[Store, None, None]:
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, cache_size=50_000_000)
+            store.write("AMD", Freq.min_1, load_data("AMD", Freq.min_1))
+            yield store
+
+    def test_cache_hit(self, cached_store, monkeypatch):
+        expected = cached_store.get("AMD", Freq.hour)
+        monkeypatch.setattr(
+            cached_store, "_read", lambda *a, **kw: pytest.fail("expected a cache hit")
+        )
+        df = cached_store.get("AMD", Freq.hour)
+        assert_frame_equal(df, expected)
+        assert df is not expected
+        assert cached_store._cache.hits == 1
+
+    def test_key_includes_columns_and_freq(self, cached_store):
+        cached_store.get("AMD", Freq.min_1)
+        cached_store.get("AMD", Freq.min_1, columns=["Close"])
+        cached_store.get("AMD", Freq.min_5)
+        assert cached_store._cache.hits == 0
+        assert len(cached_store._cache) == 3
+
+    def test_write_invalidates(self, cached_store):
+        df = load_data("AMD", Freq.min_1)
+        cached_store.get("AMD", Freq.min_1)
+        bars = df.iloc[-1:].copy()
+        bars.index = bars.index + pd.Timedelta(minutes=1)
+        cached_store.write("AMD", Freq.min_1, bars)
+        assert_frame_equal(cached_store.get("AMD", Freq.min_1), pd.concat([df, bars]))
+
+    def test_mtime_change_invalidates(self, cached_store):
+        df = load_data("AMD", Freq.min_1)
+        cached_store.get("AMD", Freq.min_1)
+
+        # another process writes to the same store
+        bars = df.iloc[-1:].copy()
+        bars.index = bars.index + pd.Timedelta(minutes=1)
+        Store(cached_store._root_dir).write("AMD", Freq.min_1, bars)
+
+        assert_frame_equal(cached_store.get("AMD", Freq.min_1), pd.concat([df, bars]))
+        assert cached_store._cache.hits == 0
+
+
+class TestMaterialize:
+    @pytest.fixture()
+    def materialized_store(self) -> t.Generator[Store, None, None]:
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, materialize=[Freq.min_5, Freq.week])
+            store.write("AMD", Freq.min_1, load_data("AMD", Freq.min_1))
+            yield store
+
+    def test_materializes_on_first_request(self, materialized_store):
+        expected = Store.agg(load_data("AMD", Freq.min_1), Freq.min_5)
+        assert not os.path.exists(materialized_store._derived_path("AMD", Freq.min_5))
+
+        assert_frame_equal(materialized_store.get("AMD", Freq.min_5), expected)
+        assert os.path.exists(materialized_store._derived_path("AMD", Freq.min_5))
+        assert not materialized_store.has_freq("AMD", Freq.min_5)
+
+    def test_served_from_disk(self, materialized_store, monkeypatch):
+        expected = materialized_store.get("AMD", Freq.week)
+        monkeypatch.setattr(Store, "agg", lambda *a: pytest.fail("expected no agg"))
+        assert_frame_equal(materialized_store.get("AMD", Freq.week), expected)
+
+        start, end = expected.index[1], expected.index[2]
+        assert_frame_equal(
+            materialized_store.get(
+                "AMD", Freq.week, columns=["Close"], start=start, end=end
+            ),
+            expected.loc[start:end, ["Close"]],
+        )
+
+    def test_not_materialized(self, materialized_store):
+        materialized_store.get("AMD", Freq.hour)
+        assert not os.path.exists(materialized_store._derived_path("AMD", Freq.hour))
+
+    def test_write_invalidates(self, materialized_store):
+        df = load_data("AMD", Freq.min_1)
+        materialized_store.get("AMD", Freq.min_5)
+
+        bars = df.iloc[-10:].assign(Volume=df["Volume"].iloc[-10:] + 1)
+        materialized_store.write("AMD", Freq.min_1, bars)
+        assert not os.path.exists(materialized_store._derived_path("AMD", Freq.min_5))
+        assert_frame_equal(
+            materialized_store.get("AMD", Freq.min_5),
+            Store.agg(_merge_bars(df, bars), Freq.min_5),
+        )
+
+    @pytest.mark.parametrize("days", [0, 1, 4])
+    def test_append_updates_incrementally(self, materialized_store, days):
+        df = load_data("AMD", Freq.min_1)
+        materialized_store.get("AMD", Freq.min_5)
+        materialized_store.get("AMD", Freq.week)
+        derived_path = materialized_store._derived_path("AMD", Freq.min_5)
+
+        # extends the latest 5 minute bin (or starts a new day)
+        bars = df.iloc[-3:].copy()
+        bars.index = bars.index + pd.Timedelta(days=days, minutes=3)
+        materialized_store.write("AMD", Freq.min_1, bars)
+
+        assert os.path.exists(derived_path)  # updated instead of deleted
+        expected = pd.concat([df, bars])
+        for freq in [Freq.min_5, Freq.week]:
+            assert_frame_equal(
+                materialized_store.get("AMD", freq),
+                Store.agg(expected, freq),
+                check_freq=False,
+            )
+
+    def test_write_hook(self, materialized_store):
+        writes = []
+        materialized_store.add_write_hook(
+            lambda symbol, freq, bars: writes.append((symbol, freq, len(bars)))
+        )
+        materialized_store.write("NVDA", Freq.day, load_data("NVDA", Freq.day))
+        assert writes == [("NVDA", Freq.day, len(load_data("NVDA", Freq.day)))]
+
+    def test_source_change_from_another_process_invalidates(self, materialized_store):
+        df = load_data("AMD", Freq.min_1)
+        materialized_store.get("AMD", Freq.min_5)
+
+        bars = df.iloc[-10:].copy()
+        bars.index = bars.index + pd.Timedelta(days=1)
+        Store(materialized_store._root_dir).write("AMD", Freq.min_1, bars)
+        assert_frame_equal(
+            materialized_store.get("AMD", Freq.min_5),
+            Store.agg(pd.concat([df, bars]), Freq.min_5),
+        )
+
+
+class TestCatalogStore:
+    @pytest.fixture()
+    def catalog_store(self) -> t.Generator[Store, None, None]:
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, catalog=True)
+            for symbol in ["AMD", "INTC", "NVDA"]:
+                store.write(symbol, Freq.min_1, load_data(symbol, Freq.min_1))
+                store.write(symbol, Freq.day, load_data(symbol, Freq.day))
+            yield store
+
+    def test_answers_from_catalog(self, catalog_store, monkeypatch):
+        monkeypatch.setattr(
+            catalog_store, "_path", lambda *a: pytest.fail("expected no file access")
+        )
+        monkeypatch.setattr(
+            catalog_store,
+            "_historical_metadata_path",
+            lambda *a: pytest.fail("expected no file access"),
+        )
+        assert catalog_store.symbols() == ["AMD", "INTC", "NVDA"]
+        assert catalog_store.symbols(Freq.min_1) == ["AMD", "INTC", "NVDA"]
+        assert catalog_store.symbols(Freq.hour) == []
+        assert catalog_store.has_freq("AMD", Freq.day)
+        assert not catalog_store.has_freq("AMD", Freq.hour)
+        assert catalog_store.has("AMD", Freq.hour)
+        assert catalog_store._get_source_freq("AMD", Freq.week) == Freq.day
+        assert (
+            catalog_store.get_latest_dt("AMD", Freq.day)
+            == (load_data("AMD", Freq.day).index[-1])
+        )
+
+    def test_no_json_metadata(self, catalog_store):
+        assert not os.path.exists(
+            catalog_store._historical_metadata_path("AMD", Freq.day)
+        )
+
+    def test_row_count_and_size(self, catalog_store):
+        df = load_data("AMD", Freq.min_1)
+        historical_metadata = catalog_store.get_historical_metadata("AMD", Freq.min_1)
+        assert historical_metadata.num_rows == len(df)
+        assert historical_metadata.num_bytes == os.path.getsize(
+            catalog_store._path("AMD", Freq.min_1)
+        )
+
+        bars = df.iloc[-10:].copy()
+        bars.index = bars.index + pd.Timedelta(days=1)
+        catalog_store.write("AMD", Freq.min_1, bars)
+        historical_metadata = catalog_store.get_historical_metadata("AMD", Freq.min_1)
+        assert historical_metadata.num_rows == len(df) + 10
+        assert historical_metadata.latest_bar_dt == bars.index[-1]
+
+    def test_row_count_and_size_monthly(self):
+        df = load_data("AMD", Freq.min_1)
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, layout="monthly", catalog=True)
+            store.write("AMD", Freq.min_1, df.iloc[:5_000])
+            store.write("AMD", Freq.min_1, df.iloc[5_000:])
+            store.write("AMD", Freq.min_1, df.iloc[100:200])
+            historical_metadata = store.get_historical_metadata("AMD", Freq.min_1)
+            assert historical_metadata.num_rows == len(store.get("AMD", Freq.min_1))
+            assert historical_metadata.num_bytes == _size(
+                store._path("AMD", Freq.min_1), "pickle"
+            )
+
+    def test_delete(self, catalog_store):
+        catalog_store._delete_freq("AMD", Freq.min_1)
+        assert catalog_store.symbols(Freq.min_1) == ["INTC", "NVDA"]
+        catalog_store._delete_all("INTC")
+        assert catalog_store.symbols() == ["AMD", "NVDA"]
+
+    def test_rebuild(self, catalog_store, monkeypatch):
+        expected = catalog_store.get_historical_metadata("AMD", Freq.day)
+        catalog_store._backend.delete(catalog_store._path("AMD", Freq.min_1))
+        shutil.rmtree(os.path.join(catalog_store._root_dir, "INTC"))
+        # entries are replaced symbol by symbol, never all at once
+        monkeypatch.setattr(
+            catalog_store._catalog, "clear", lambda: pytest.fail("cleared")
+        )
+
+        catalog_store.rebuild_catalog()
+        assert catalog_store.symbols() == ["AMD", "NVDA"]
+        assert catalog_store.symbols(Freq.min_1) == ["NVDA"]
+        historical_metadata = catalog_store.get_historical_metadata("AMD", Freq.day)
+        assert historical_metadata.latest_bar_utc == expected.latest_bar_utc
+        assert historical_metadata.num_rows == expected.num_rows
+
+    def test_catalogs_existing_store(self, full_store):
+        expected = full_store.get_historical_metadata("AMD", Freq.day)
+        store = Store(full_store._root_dir, catalog=True)
+        assert store.symbols(Freq.min_1) == ["AMD", "INTC", "NVDA"]
+
+        historical_metadata = store.get_historical_metadata("AMD", Freq.day)
+        assert historical_metadata.latest_bar_utc == expected.latest_bar_utc
+        assert historical_metadata.first_bar_utc == expected.first_bar_utc
+        assert historical_metadata.Close == expected.Close
+        assert historical_metadata.num_rows == len(load_data("AMD", Freq.day))
+
+    def test_saved_in_settings(self, store):
+        df = load_data("AMD", Freq.day)
+        store.write("AMD", Freq.day, df.iloc[:10])
+        Store(store._root_dir, catalog=True).write("AMD", Freq.day, df.iloc[10:15])
+        assert read_settings(store._root_dir)["catalog"]
+
+        # stores opened without `catalog` use it too
+        store = Store(store._root_dir)
+        store.write("AMD", Freq.day, df.iloc[12:])
+        assert_frame_equal(store.get("AMD", Freq.day), df)
+        assert store.get_latest_dt("AMD", Freq.day) == df.index[-1]
+
+        with pytest.raises(ValueError):
+            Store(store._root_dir, catalog=False)
+
+
+class TestApplySplit:
+    def _adjusted(self, df: pd.DataFrame, ratio: float) -> pd.DataFrame:
+        df = df.copy()
+        before = df.index < pd.Timestamp("2023-01-17", tz=EASTERN_TZ)
+        df.loc[before, ["Open", "High", "Low", "Close"]] /= ratio
+        df.loc[before, "Volume"] = (df.loc[before, "Volume"] * ratio).round()
+        return df
+
+    @pytest.mark.parametrize("layout", ["single", "monthly"])
+    def test_apply_split(self, layout):
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, layout=layout, materialize=[Freq.week])
+            for freq in [Freq.min_1, Freq.day]:
+                store.write("AMD", freq, load_data("AMD", freq))
+            store.get("AMD", Freq.week)
+            first_bar_utc = pd.Timestamp("2020-01-02", tz="UTC")
+            store._write_historical_metadata(
+                "AMD", Freq.day, load_data("AMD", Freq.day), first_bar_utc
+            )
+
+            assert store.apply_split("AMD", 4, "2023-01-17")
+
+            for freq in [Freq.min_1, Freq.day]:
+                expected = self._adjusted(load_data("AMD", freq), 4)
+                assert_frame_equal(store.get("AMD", freq), expected, check_freq=False)
+                metadata = store.get_historical_metadata("AMD", freq)
+                assert metadata.num_rows == len(expected)
+            assert_frame_equal(
+                store.get("AMD", Freq.week),
+                Store.agg(self._adjusted(load_data("AMD", Freq.day), 4), Freq.week),
+            )
+            metadata = store.get_historical_metadata("AMD", Freq.day)
+            assert metadata.first_bar_utc == first_bar_utc
+            splits = store.get_splits("AMD")
+            assert [(s.execution_date.isoformat(), s.ratio) for s in splits] == [
+                ("2023-01-17", 4)
+            ]
+
+            # applying the same split again does nothing
+            assert not store.apply_split("AMD", 4, "2023-01-17")
+            expected = self._adjusted(load_data("AMD", Freq.day), 4)
+            assert_frame_equal(store.get("AMD", Freq.day), expected)
+
+    def test_reverse_split_compact(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, profile="compact", cache_size=2**20)
+            store.write("AMD", Freq.day, load_data("AMD", Freq.day))
+            store.get("AMD", Freq.day)
+
+            assert store.apply_split("AMD", 0.05, "2023-01-17")
+
+            df = store.get("AMD", Freq.day)
+            expected = self._adjusted(load_data("AMD", Freq.day), 0.05)
+            np.testing.assert_allclose(df.to_numpy(np.float64), expected.to_numpy())
+
+    def test_split_after_latest_bar(self, full_store):
+        assert full_store.apply_split("AMD", 2, "2023-02-01")
+        expected = load_data("AMD", Freq.day)
+        expected[["Open", "High", "Low", "Close"]] /= 2
+        expected["Volume"] *= 2
+        assert_frame_equal(full_store.get("AMD", Freq.day), expected)
+        assert full_store.get_latest_dt("AMD", Freq.day) == expected.index[-1]
+        assert (
+            full_store.get_historical_metadata("AMD", Freq.day).Close
+            == (expected["Close"].iloc[-1])
+        )
+        assert full_store.get("INTC", Freq.day) is not None
+        assert full_store.get_splits("INTC") == []
+
+    def test_invalid_ratio(self, full_store):
+        with pytest.raises(ValueError):
+            full_store.apply_split("AMD", 0, "2023-01-17")
+
+    def test_symbol_without_bars(self, store):
+        assert not store.apply_split("ZZZZ", 2, "2024-01-05")
+        assert store.get_splits("ZZZZ") == []
+        assert store.symbols() == []
+
+
+class TestSnapshot:
+    def test_snapshot_is_isolated(self, full_store):
+        amd_day = load_data("AMD", Freq.day)
+        with full_store.snapshot() as snapshot:
+            bars = amd_day.iloc[-1:].copy()
+            bars.index = bars.index + pd.Timedelta(days=1)
+            full_store.write("AMD", Freq.day, bars)
+            full_store.apply_split("INTC", 2, "2023-01-17")
+            full_store._delete_all("NVDA")
+            full_store.write("TSLA", Freq.day, amd_day)
+
+            assert snapshot.symbols() == ["AMD", "INTC", "NVDA"]
+            assert_frame_equal(snapshot.get("AMD", Freq.day), amd_day)
+            assert snapshot.get_latest_dt("AMD", Freq.day) == amd_day.index[-1]
+            assert_frame_equal(
+                snapshot.get("INTC", Freq.day), load_data("INTC", Freq.day)
+            )
+            assert_frame_equal(
+                snapshot.get("NVDA", Freq.min_1), load_data("NVDA", Freq.min_1)
+            )
+            assert len(full_store.get("AMD", Freq.day)) == len(amd_day) + 1
+            with pytest.raises(RuntimeError):
+                snapshot.write("AMD", Freq.day, bars)
+
+    def test_gc_snapshots(self, full_store):
+        snapshots_dir = os.path.join(full_store._root_dir, ".snapshots")
+        snapshot = full_store.snapshot()
+        with full_store.snapshot():
+            assert full_store.gc_snapshots() == 0
+            assert len(os.listdir(snapshots_dir)) == 4  # 2 snapshots and their locks
+        assert full_store.gc_snapshots() == 1
+        assert snapshot.get("AMD") is not None
+
+        del snapshot  # released once garbage collected
+        assert full_store.gc_snapshots() == 1
+        assert os.listdir(snapshots_dir) == []
+        assert full_store.symbols() == ["AMD", "INTC", "NVDA"]
+
+    def test_catalog_snapshot(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            store = Store(tempdir, catalog=True, layout="monthly")
+            store.write("AMD", Freq.min_1, load_data("AMD", Freq.min_1))
+            store.write("AMD", Freq.day, load_data("AMD", Freq.day))
+            metadata = store.get_historical_metadata("AMD", Freq.min_1)
+            with store.snapshot() as snapshot:
+                store._delete_freq("AMD", Freq.min_1)
+                assert snapshot.get_historical_metadata("AMD", Freq.min_1) == metadata
+                assert snapshot.has_freq("AMD", Freq.min_1)
+                assert_frame_equal(
+                    snapshot.get("AMD", Freq.min_1),
+                    load_data("AMD", Freq.min_1),
+                    check_freq=False,
+                )
+                assert not store.has_freq("AMD", Freq.min_1)